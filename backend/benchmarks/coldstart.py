@@ -0,0 +1,238 @@
+"""
+Cold-start benchmark comparing startup profiles.
+
+Measures what a scale-to-zero instance pays before serving traffic, for
+the full site (task_analyzer.settings, the Procfile ``web`` command) and
+the API-only profile (task_analyzer.settings_api via gunicorn_api.conf.py),
+with and without the boot-time warm-up:
+- In-process: time to import the WSGI module, the number of modules and
+  peak RSS after it, and the latency of the first and second requests
+- Under gunicorn: time from spawning the server to the first successful
+  response, and the latency of that response itself
+
+Every measurement uses a fresh interpreter, and profiles take turns
+within each repetition so drift affects them equally. Results are
+appended to a JSON Lines file, like benchmarks/loadtest.py.
+
+Usage (from the backend directory):
+    python benchmarks/coldstart.py
+    python benchmarks/coldstart.py --profiles full,api --repeat 10
+"""
+import argparse
+import http.client
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loadtest import BACKEND_DIR, free_port, git_revision, procfile_web_command
+
+DEFAULT_OUTPUT = Path(__file__).resolve().parent / 'results' / 'coldstart.jsonl'
+FIRST_REQUEST_PATH = '/api/tasks/suggest/'
+
+PROFILES = {
+    'full': {
+        'settings': 'task_analyzer.settings',
+        'wsgi_module': 'task_analyzer.wsgi',
+        'command': lambda: procfile_web_command(BACKEND_DIR / 'Procfile'),
+        'env': {},
+    },
+    'api-cold': {
+        'settings': 'task_analyzer.settings_api',
+        'wsgi_module': 'task_analyzer.wsgi_api',
+        'command': lambda: ['gunicorn', 'task_analyzer.wsgi_api:application'],
+        'env': {'API_WARM_UP': '0'},
+    },
+    'api': {
+        'settings': 'task_analyzer.settings_api',
+        'wsgi_module': 'task_analyzer.wsgi_api',
+        'command': lambda: ['gunicorn', '-c', 'gunicorn_api.conf.py'],
+        'env': {},
+    },
+}
+
+# Runs in a fresh interpreter; prints one JSON line
+IN_PROCESS_SCRIPT = '''
+import io, json, resource, sys, time
+started = time.perf_counter()
+module = __import__(sys.argv[1], fromlist=['application'])
+imported = time.perf_counter()
+modules = len(sys.modules)
+
+def request():
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': sys.argv[2], 'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+        'wsgi.input': io.BytesIO(), 'wsgi.errors': io.StringIO(), 'wsgi.url_scheme': 'http',
+    }
+    statuses = []
+    begun = time.perf_counter()
+    b''.join(module.application(environ, lambda status, headers: statuses.append(status)))
+    assert statuses[0].startswith('200'), statuses[0]
+    return (time.perf_counter() - begun) * 1000
+
+first = request()
+second = request()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'modules': modules,
+    'first_request_ms': first,
+    'second_request_ms': second,
+    'max_rss_mib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+'''
+
+
+def profile_env(profile: Dict[str, Any]) -> Dict[str, str]:
+    return {**os.environ, 'DJANGO_SETTINGS_MODULE': profile['settings'], **profile['env']}
+
+
+def measure_in_process(profile: Dict[str, Any]) -> Dict[str, float]:
+    """Import the profile's WSGI module in a fresh interpreter and time two requests."""
+    output = subprocess.check_output(
+        [sys.executable, '-c', IN_PROCESS_SCRIPT, profile['wsgi_module'], FIRST_REQUEST_PATH],
+        cwd=BACKEND_DIR,
+        env=profile_env(profile),
+        stderr=subprocess.DEVNULL,
+    )
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def measure_first_response(profile: Dict[str, Any], workers: int, timeout: float = 60.0) -> Dict[str, float]:
+    """
+    Spawn gunicorn and time until the first successful response.
+
+    Connections are retried every few milliseconds until the socket is
+    bound; the request that first succeeds may have queued while the
+    worker was still loading the application.
+    """
+    port = free_port()
+    command = profile['command']() + ['--bind', f'127.0.0.1:{port}', '--workers', str(workers)]
+    spawned = time.perf_counter()
+    process = subprocess.Popen(
+        command,
+        cwd=BACKEND_DIR,
+        env=profile_env(profile),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f'Server exited during startup: {" ".join(command)}')
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+                requested = time.perf_counter()
+                conn.request('GET', FIRST_REQUEST_PATH)
+                response = conn.getresponse()
+                response.read()
+                conn.close()
+            except OSError:
+                time.sleep(0.005)
+                continue
+            if response.status == 200:
+                finished = time.perf_counter()
+                return {
+                    'first_response_ms': (finished - spawned) * 1000,
+                    'first_response_latency_ms': (finished - requested) * 1000,
+                }
+            time.sleep(0.005)
+        raise RuntimeError('Server did not respond in time')
+    finally:
+        stop_process_group(process)
+
+
+def stop_process_group(process: subprocess.Popen, timeout: float = 15.0) -> None:
+    """
+    Stop gunicorn and wait for its workers too.
+
+    Workers still shutting down would otherwise compete for CPU with the
+    next measurement.
+    """
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        process.poll()
+        try:
+            os.killpg(process.pid, 0)
+        except ProcessLookupError:
+            return
+        time.sleep(0.05)
+    os.killpg(process.pid, signal.SIGKILL)
+    process.wait()
+
+
+def medians(samples: List[Dict[str, float]]) -> Dict[str, float]:
+    return {key: round(statistics.median(sample[key] for sample in samples), 2) for key in samples[0]}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', default=','.join(PROFILES), help='Comma-separated profiles to compare')
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh starts per profile and measurement')
+    parser.add_argument('--workers', type=int, default=1, help='Gunicorn workers')
+    parser.add_argument('--skip-server', action='store_true', help='Only run the in-process measurements')
+    parser.add_argument('--output', type=Path, default=DEFAULT_OUTPUT, help='JSON Lines results file')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    names = args.profiles.split(',')
+    unknown = set(names) - set(PROFILES)
+    if unknown:
+        print(f'Unknown profiles: {", ".join(sorted(unknown))}', file=sys.stderr)
+        return 2
+
+    run = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': sys.version.split()[0],
+        'cpu_count': os.cpu_count(),
+        'config': {'repeat': args.repeat, 'workers': args.workers, 'path': FIRST_REQUEST_PATH},
+        'profiles': {},
+    }
+
+    print(
+        f'{"profile":<10}{"import ms":>11}{"modules":>9}{"RSS MiB":>9}{"1st req ms":>12}{"2nd req ms":>12}'
+        f'{"spawn->200 ms":>15}{"1st latency ms":>16}'
+    )
+    in_process = {name: [] for name in names}
+    server = {name: [] for name in names}
+    for _ in range(args.repeat):
+        for name in names:
+            in_process[name].append(measure_in_process(PROFILES[name]))
+            if not args.skip_server:
+                server[name].append(measure_first_response(PROFILES[name], args.workers))
+
+    for name in names:
+        result = medians(in_process[name])
+        if server[name]:
+            result.update(medians(server[name]))
+        run['profiles'][name] = result
+        print(
+            f'{name:<10}{result["import_ms"]:>11}{int(result["modules"]):>9}{result["max_rss_mib"]:>9}'
+            f'{result["first_request_ms"]:>12}{result["second_request_ms"]:>12}'
+            f'{result.get("first_response_ms", "-"):>15}{result.get("first_response_latency_ms", "-"):>16}'
+        )
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with args.output.open('a') as f:
+        f.write(json.dumps(run) + '\n')
+    print(f'Results appended to {args.output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,343 @@
+"""
+Local load-testing harness for the task analysis API.
+
+Starts the app with the ``web`` command from the Procfile, replays a mix
+of analyze and suggest traffic against it and reports throughput and
+latency percentiles. Each combination of gunicorn worker class and
+worker count is measured separately so deployment sizing can be
+compared, and results are appended to a JSON Lines file for tracking
+over time.
+
+Usage (from the backend directory):
+    python benchmarks/loadtest.py
+    python benchmarks/loadtest.py --worker-classes sync,gthread,gevent \\
+        --workers 1,2,4 --concurrency 16 --sizes 10,100,1000 --duration 30
+
+The async worker classes (gevent, eventlet) are skipped if their package
+is not installed.
+"""
+import argparse
+import http.client
+import importlib.util
+import json
+import os
+import random
+import shlex
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_OUTPUT = Path(__file__).resolve().parent / 'results' / 'loadtest.jsonl'
+
+# Worker classes that need an extra package to be importable
+ASYNC_WORKER_PACKAGES = {
+    'gevent': 'gevent',
+    'eventlet': 'eventlet',
+}
+
+
+def procfile_web_command(procfile: Path) -> List[str]:
+    """Read the ``web`` process command from the Procfile."""
+    for line in procfile.read_text().splitlines():
+        name, _, command = line.partition(':')
+        if name.strip() == 'web':
+            return shlex.split(command.strip())
+    raise RuntimeError(f'No web process in {procfile}')
+
+
+def build_tasks(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """Generate a random task list with some dependencies between tasks."""
+    today = date.today()
+    tasks = []
+    for i in range(count):
+        due = today + timedelta(days=rng.randint(-10, 60)) if rng.random() < 0.8 else None
+        deps = [f'task_{j}' for j in rng.sample(range(i), min(i, rng.randint(0, 2)))]
+        tasks.append({
+            'id': f'task_{i}',
+            'title': f'Task {i}',
+            'due_date': str(due) if due else None,
+            'estimated_hours': round(rng.uniform(0.5, 16), 1),
+            'importance': rng.randint(1, 10),
+            'dependencies': deps,
+        })
+    return tasks
+
+
+def build_requests(sizes: List[int], seed: int) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Pre-encode request bodies so client-side JSON work is not measured.
+
+    Returns a mapping of request kind to a list of prepared requests.
+    """
+    rng = random.Random(seed)
+    strategies = ['smart_balance', 'fastest_wins', 'high_impact', 'deadline_driven']
+    analyze = []
+    suggest = [
+        {'method': 'GET', 'path': f'/api/tasks/suggest/?strategy={strategy}', 'body': None, 'size': 0}
+        for strategy in strategies
+    ]
+    for size in sizes:
+        body = json.dumps({'tasks': build_tasks(size, rng), 'strategy': rng.choice(strategies)})
+        analyze.append({'method': 'POST', 'path': '/api/tasks/analyze/', 'body': body.encode(), 'size': size})
+        suggest.append({'method': 'POST', 'path': '/api/tasks/suggest/', 'body': body.encode(), 'size': size})
+    return {'analyze': analyze, 'suggest': suggest}
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse ``analyze=0.6,suggest=0.4`` into normalized weights."""
+    weights = {}
+    for part in mix.split(','):
+        kind, _, weight = part.partition('=')
+        weights[kind.strip()] = float(weight)
+    total = sum(weights.values())
+    return {kind: weight / total for kind, weight in weights.items()}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Server:
+    """
+    A gunicorn process started from the Procfile command.
+    """
+
+    def __init__(self, worker_class: str, workers: int, threads: int, port: int):
+        self.port = port
+        command = procfile_web_command(BACKEND_DIR / 'Procfile') + [
+            '--bind', f'127.0.0.1:{port}',
+            '--workers', str(workers),
+            '--worker-class', worker_class,
+            '--timeout', '120',
+        ]
+        if worker_class == 'gthread':
+            command += ['--threads', str(threads)]
+        self.command = command
+        self.process = None
+
+    def __enter__(self):
+        env = {**os.environ}
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'task_analyzer.settings')
+        self.process = subprocess.Popen(
+            self.command,
+            cwd=BACKEND_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        self._wait_until_ready()
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            os.killpg(self.process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        try:
+            self.process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            os.killpg(self.process.pid, signal.SIGKILL)
+            self.process.wait()
+
+    def _wait_until_ready(self, timeout: float = 30.0) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f'Server exited during startup: {" ".join(self.command)}')
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=2)
+                conn.request('GET', '/api/tasks/suggest/')
+                if conn.getresponse().status == 200:
+                    conn.close()
+                    return
+            except OSError:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError('Server did not become ready in time')
+
+
+def run_clients(
+    port: int,
+    requests: Dict[str, List[Dict[str, Any]]],
+    mix: Dict[str, float],
+    concurrency: int,
+    duration: float,
+    seed: int
+) -> Dict[str, Any]:
+    """
+    Replay traffic from ``concurrency`` client threads for ``duration`` seconds.
+
+    Each client keeps one persistent connection and picks the next request
+    kind by the mix weights.
+    """
+    latencies = {kind: [] for kind in requests}
+    statuses = Counter()
+    errors = Counter()
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+
+    def client(client_seed: int) -> None:
+        rng = random.Random(client_seed)
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+        local_latencies = {kind: [] for kind in requests}
+        local_statuses = Counter()
+        local_errors = Counter()
+        while time.monotonic() < stop_at:
+            kind = rng.choices(kinds, weights)[0]
+            req = rng.choice(requests[kind])
+            headers = {'Content-Type': 'application/json'} if req['body'] else {}
+            started = time.perf_counter()
+            try:
+                conn.request(req['method'], req['path'], body=req['body'], headers=headers)
+                response = conn.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException) as e:
+                local_errors[type(e).__name__] += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+                continue
+            local_latencies[kind].append(time.perf_counter() - started)
+            local_statuses[response.status] += 1
+        conn.close()
+        with lock:
+            for kind, values in local_latencies.items():
+                latencies[kind].extend(values)
+            statuses.update(local_statuses)
+            errors.update(local_errors)
+
+    threads = [threading.Thread(target=client, args=(seed + i,)) for i in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        'elapsed_seconds': round(elapsed, 3),
+        'requests': len(all_latencies),
+        'throughput_rps': round(len(all_latencies) / elapsed, 2),
+        'latency_ms': summarize(all_latencies),
+        'latency_ms_by_kind': {kind: summarize(values) for kind, values in latencies.items()},
+        'status_codes': {str(code): count for code, count in sorted(statuses.items())},
+        'errors': dict(errors),
+    }
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Summarize latencies in milliseconds."""
+    values = sorted(latency * 1000 for latency in latencies)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'mean': round(statistics.fmean(values), 2),
+        'p50': round(percentile(values, 50), 2),
+        'p95': round(percentile(values, 95), 2),
+        'p99': round(percentile(values, 99), 2),
+        'max': round(values[-1], 2),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--worker-classes', default='sync,gthread,gevent',
+                        help='Comma-separated gunicorn worker classes to compare')
+    parser.add_argument('--workers', default='1,2', help='Comma-separated worker counts to compare')
+    parser.add_argument('--threads', type=int, default=4, help='Threads per worker for gthread')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent client connections')
+    parser.add_argument('--duration', type=float, default=15.0, help='Seconds to run each scenario')
+    parser.add_argument('--sizes', default='10,100,1000', help='Comma-separated task counts per payload')
+    parser.add_argument('--mix', default='analyze=0.5,suggest=0.5', help='Traffic mix weights')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for payloads and traffic')
+    parser.add_argument('--output', type=Path, default=DEFAULT_OUTPUT, help='JSON Lines results file')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(',')]
+    mix = parse_mix(args.mix)
+    requests = build_requests(sizes, args.seed)
+    unknown = set(mix) - set(requests)
+    if unknown:
+        print(f'Unknown request kinds in --mix: {", ".join(sorted(unknown))}', file=sys.stderr)
+        return 2
+
+    run = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': sys.version.split()[0],
+        'cpu_count': os.cpu_count(),
+        'config': {
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'sizes': sizes,
+            'mix': mix,
+            'threads': args.threads,
+            'seed': args.seed,
+        },
+        'scenarios': [],
+    }
+
+    print(f'{"worker class":<14}{"workers":>8}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}  statuses')
+    for worker_class in args.worker_classes.split(','):
+        package = ASYNC_WORKER_PACKAGES.get(worker_class)
+        if package and importlib.util.find_spec(package) is None:
+            print(f'{worker_class:<14}skipped ({package} not installed)')
+            continue
+
+        for workers in (int(count) for count in args.workers.split(',')):
+            with Server(worker_class, workers, args.threads, free_port()) as server:
+                result = run_clients(
+                    server.port, requests, mix, args.concurrency, args.duration, args.seed
+                )
+            run['scenarios'].append({'worker_class': worker_class, 'workers': workers, **result})
+            latency = result['latency_ms']
+            print(
+                f'{worker_class:<14}{workers:>8}{result["throughput_rps"]:>10}'
+                f'{latency.get("p50", 0):>10}{latency.get("p95", 0):>10}{latency.get("p99", 0):>10}'
+                f'  {result["status_codes"]}'
+            )
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with args.output.open('a') as f:
+        f.write(json.dumps(run) + '\n')
+    print(f'Results appended to {args.output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,18 @@
+"""
+Gunicorn configuration for the full site.
+
+    gunicorn -c gunicorn.conf.py
+
+The suggestion stream (/api/tasks/suggest/stream/) holds its connection
+open for minutes. Sync workers would be tied up by one stream each and
+killed at their 30 s timeout, so workers are threaded: a stream holds a
+thread, and the worker keeps serving other requests and heartbeats.
+Size GUNICORN_THREADS for the expected number of open streams per worker.
+"""
+import os
+
+wsgi_app = 'task_analyzer.wsgi:application'
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
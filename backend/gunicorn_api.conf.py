@@ -0,0 +1,17 @@
+"""
+Gunicorn configuration for the API-only profile.
+
+    gunicorn -c gunicorn_api.conf.py
+
+Preloading imports and warms the app once in the master (see
+tasks/warmup.py); workers are forked with everything already loaded.
+"""
+import os
+
+wsgi_app = 'task_analyzer.wsgi_api:application'
+preload_app = True
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+# Suggestion streams hold a thread each; see gunicorn.conf.py
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
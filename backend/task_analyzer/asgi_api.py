@@ -0,0 +1,18 @@
+"""
+ASGI entry point for the API-only settings profile.
+"""
+
+import os
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_analyzer.settings_api')
+
+application = get_asgi_application()
+
+if getattr(settings, 'API_WARM_UP', False):
+    from tasks.warmup import warm_up
+
+    # Warms the same URLconf, views and scoring code the ASGI handler uses
+    warm_up()
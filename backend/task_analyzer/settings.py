@@ -142,3 +142,60 @@ REST_FRAMEWORK = {
 # CORS settings for development
 CORS_ALLOW_ALL_ORIGINS = True
 
+
+# Admission control for heavy analyses (see tasks/admission.py)
+ADMISSION_CONTROL = {
+    'HEAVY_TASK_THRESHOLD': int(os.environ.get('HEAVY_TASK_THRESHOLD', 1000)),
+    'MAX_HEAVY_PER_PROCESS': int(os.environ.get('MAX_HEAVY_PER_PROCESS', 1)),
+    'MAX_HEAVY_PER_HOST': int(os.environ.get('MAX_HEAVY_PER_HOST', 2)),
+    # Capped at DATA_UPLOAD_MAX_MEMORY_SIZE (2.5 MiB unless overridden)
+    'MAX_BODY_BYTES': int(os.environ.get('MAX_ANALYSIS_BODY_BYTES', 2621440)),
+    'RETRY_AFTER_SECONDS': int(os.environ.get('HEAVY_RETRY_AFTER_SECONDS', 5)),
+}
+
+# Asynchronous analysis jobs (see tasks/jobs.py)
+ANALYSIS_JOBS = {
+    'WORKERS': int(os.environ.get('ANALYSIS_JOB_WORKERS', 2)),
+    'POLL_INTERVAL_SECONDS': 1.0,
+    'RESULT_TTL_SECONDS': int(os.environ.get('ANALYSIS_JOB_TTL_SECONDS', 3600)),
+    'RUNNING_TIMEOUT_SECONDS': int(os.environ.get('ANALYSIS_JOB_TIMEOUT_SECONDS', 900)),
+}
+
+# Shared-memory backlog snapshot (see tasks/snapshot.py). Segment names
+# default to a hash of the database name.
+SHARED_SNAPSHOT = {
+    'NAME': os.environ.get('SHARED_SNAPSHOT_NAME', ''),
+}
+
+# Opt-in request capture for deterministic replay (see tasks/capture.py)
+REQUEST_CAPTURE = {
+    'ENABLED': os.environ.get('REQUEST_CAPTURE_ENABLED', '').lower() in ('1', 'true', 'yes'),
+    'PATH': os.environ.get('REQUEST_CAPTURE_PATH', 'captures/requests.jsonl.gz'),
+    'SAMPLE_RATE': float(os.environ.get('REQUEST_CAPTURE_SAMPLE_RATE', 0.01)),
+    'MIN_SCORING_MS': float(os.environ.get('REQUEST_CAPTURE_MIN_SCORING_MS', 0)),
+}
+
+# Scoring backend used when a request does not pick one (see tasks/backends.py)
+SCORING = {
+    'BACKEND': os.environ.get('SCORING_BACKEND', 'reference'),
+}
+
+# Opt-in tracemalloc profiling of analyze requests (see tasks/memprofile.py)
+MEMORY_PROFILING = {
+    'ENABLED': os.environ.get('MEMORY_PROFILING_ENABLED', '').lower() in ('1', 'true', 'yes'),
+    'TOP_SITES': int(os.environ.get('MEMORY_PROFILING_TOP_SITES', 5)),
+}
+
+# Server-Sent Events push of backlog suggestions (see tasks/push.py)
+SUGGESTION_STREAM = {
+    'POLL_INTERVAL_SECONDS': float(os.environ.get('SUGGESTION_STREAM_POLL_SECONDS', 0.5)),
+    'COALESCE_SECONDS': float(os.environ.get('SUGGESTION_STREAM_COALESCE_SECONDS', 0.5)),
+    'MAX_STREAM_SECONDS': float(os.environ.get('SUGGESTION_STREAM_MAX_SECONDS', 300)),
+}
+
+# Daily score history and trend queries (see tasks/history.py)
+SCORE_HISTORY = {
+    'ENABLED': os.environ.get('SCORE_HISTORY_ENABLED', '1').lower() in ('1', 'true', 'yes'),
+    'STRATEGY': os.environ.get('SCORE_HISTORY_STRATEGY', 'smart_balance'),
+    'RETENTION_DAYS': int(os.environ.get('SCORE_HISTORY_RETENTION_DAYS', 180)),
+}
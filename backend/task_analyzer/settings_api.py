@@ -0,0 +1,47 @@
+"""
+API-only settings profile for task_analyzer.
+
+Serves /api/ and nothing else. No admin, auth, sessions, messages,
+templates or static files, so startup imports only what the tasks app
+needs. Use it with the task_analyzer.wsgi_api or task_analyzer.asgi_api
+entry point, e.g. ``gunicorn -c gunicorn_api.conf.py``, when the
+frontend is hosted separately.
+
+Compare startup against the full profile with
+``python benchmarks/coldstart.py``.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import REST_FRAMEWORK
+import os
+
+INSTALLED_APPS = [
+    'rest_framework',
+    'tasks',
+]
+
+# The API uses no cookies or sessions, and every write view is csrf_exempt
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'task_analyzer.urls_api'
+
+TEMPLATES = []
+
+AUTH_PASSWORD_VALIDATORS = []
+
+# USE_I18N stays on: ?explain=text&lang= renders explanations through gettext
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    # The defaults import django.contrib.auth's models, which need the auth app
+    'UNAUTHENTICATED_USER': None,
+    'UNAUTHENTICATED_TOKEN': None,
+}
+
+# Send a request through the app at boot so the URLconf, views, DRF and
+# the scoring code are loaded before the first real request. With
+# gunicorn's preload_app this runs once in the master, before forking.
+API_WARM_UP = os.environ.get('API_WARM_UP', '1').lower() in ('1', 'true', 'yes')
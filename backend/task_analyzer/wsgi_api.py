@@ -0,0 +1,20 @@
+"""
+WSGI entry point for the API-only settings profile.
+
+Serve it with ``gunicorn -c gunicorn_api.conf.py``, which preloads the
+application so the boot-time warm-up runs once in the master.
+"""
+
+import os
+
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_analyzer.settings_api')
+
+application = get_wsgi_application()
+
+if getattr(settings, 'API_WARM_UP', False):
+    from tasks.warmup import warm_up
+
+    warm_up(application)
@@ -2,12 +2,67 @@
 Admin configuration for tasks app.
 """
 from django.contrib import admin
-from .models import Task
+from .models import Task, TaskDependency, AnalysisJob, DailyBacklogSummary, Workspace
+from .search import prefix_capped, search_ids
+
+
+class TaskDependencyInline(admin.TabularInline):
+    model = TaskDependency
+    fk_name = 'task'
+    extra = 0
+    raw_id_fields = ['depends_on']
+    verbose_name = 'dependency'
+    verbose_name_plural = 'dependencies'
+
+
+@admin.register(Workspace)
+class WorkspaceAdmin(admin.ModelAdmin):
+    list_display = ['name', 'slug', 'created_at']
+    prepopulated_fields = {'slug': ['name']}
 
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
-    list_display = ['title', 'due_date', 'importance', 'estimated_hours', 'created_at']
-    list_filter = ['importance', 'due_date', 'created_at']
+    list_display = ['title', 'workspace', 'status', 'due_date', 'importance', 'estimated_hours', 'created_at']
+    list_filter = ['workspace', 'status', 'importance', 'due_date', 'created_at']
     search_fields = ['title']
+    inlines = [TaskDependencyInline]
+    search_result_limit = 1000
+    
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Match titles through the search index instead of an icontains scan.
+        
+        The index only matches words and word prefixes, returns at most
+        search_result_limit tasks and expands a prefix to at most
+        search.MAX_PREFIX_EXPANSIONS words. When a search hits either cap,
+        or finds nothing (the term may only occur inside words), the
+        default icontains search runs instead, so matches are never dropped.
+        """
+        if not search_term.strip():
+            return queryset, False
+        hits = search_ids(search_term, prefix=True, limit=self.search_result_limit)
+        if not hits or len(hits) >= self.search_result_limit or prefix_capped(search_term):
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk__in=[task_id for task_id, _ in hits]), False
+
+
+
+@admin.register(AnalysisJob)
+class AnalysisJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'status', 'progress', 'created_at', 'expires_at']
+    list_filter = ['kind', 'status']
+    readonly_fields = ['fingerprint', 'result', 'error', 'started_at', 'finished_at']
+
 
+@admin.register(DailyBacklogSummary)
+class DailyBacklogSummaryAdmin(admin.ModelAdmin):
+    list_display = ['day', 'workspace', 'open_tasks', 'overdue', 'due_today', 'median_score', 'p90_score']
+    list_filter = ['workspace']
+    date_hierarchy = 'day'
+    
+    def has_add_permission(self, request):
+        return False  # Recorded from snapshots (see tasks/history.py)
+    
+    def has_change_permission(self, request, obj=None):
+        return False
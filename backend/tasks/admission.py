@@ -0,0 +1,215 @@
+"""
+Admission control for analysis requests.
+
+Large analyses can tie up every worker, leaving small requests queued
+behind them. This module:
+- Classifies analyses as light or heavy by task count, before validation
+- Bounds concurrent heavy analyses per process and per host
+- Rejects oversized request bodies before they are parsed
+- Counts how often each limit triggers
+"""
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows development machines
+    fcntl = None
+
+
+DEFAULT_CONFIG = {
+    'HEAVY_TASK_THRESHOLD': 1000,      # Analyses with more tasks than this are heavy
+    'MAX_HEAVY_PER_PROCESS': 1,        # Concurrent heavy analyses per worker process
+    'MAX_HEAVY_PER_HOST': 2,           # Concurrent heavy analyses across all workers
+    'MAX_BODY_BYTES': 2621440,         # Capped at DATA_UPLOAD_MAX_MEMORY_SIZE
+    'RETRY_AFTER_SECONDS': 5,
+    'LOCK_DIR': None,                  # Defaults to the system temp directory
+}
+
+LIGHT = 'light'
+HEAVY = 'heavy'
+
+_lock = threading.Lock()
+_heavy_in_flight = 0
+_counters = {
+    'admitted_light': 0,
+    'admitted_heavy': 0,
+    'rejected_body_too_large': 0,
+    'rejected_process_budget': 0,
+    'rejected_host_budget': 0,
+}
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a heavy analysis exceeds its concurrency budget.
+    """
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class BodyTooLarge(Exception):
+    """
+    Raised when a request body read from its stream exceeds MAX_BODY_BYTES.
+    """
+
+
+def get_config() -> Dict[str, object]:
+    """
+    Return admission settings merged over the defaults.
+
+    MAX_BODY_BYTES never exceeds DATA_UPLOAD_MAX_MEMORY_SIZE: Django
+    refuses to read larger bodies, which would fail with a 500 instead
+    of the 413 this limit promises.
+    """
+    config = {**DEFAULT_CONFIG, **getattr(settings, 'ADMISSION_CONTROL', {})}
+    if settings.DATA_UPLOAD_MAX_MEMORY_SIZE is not None:
+        config['MAX_BODY_BYTES'] = min(config['MAX_BODY_BYTES'], settings.DATA_UPLOAD_MAX_MEMORY_SIZE)
+    return config
+
+
+def classify(task_count: int) -> str:
+    """Classify an analysis as light or heavy by its task count."""
+    if task_count > get_config()['HEAVY_TASK_THRESHOLD']:
+        return HEAVY
+    return LIGHT
+
+
+def task_count(data) -> int:
+    """
+    Count the tasks in a parsed but unvalidated request body.
+
+    Validating thousands of tasks is itself heavy work, so analyses are
+    admitted on this count before their serializer runs. Malformed
+    bodies count as zero and are left for validation to reject.
+    """
+    tasks = data.get('tasks') if isinstance(data, dict) else None
+    return len(tasks) if isinstance(tasks, list) else 0
+
+
+def _increment(counter: str) -> None:
+    with _lock:
+        _counters[counter] += 1
+
+
+def body_too_large(request) -> bool:
+    """
+    Check the declared request size against the configured limit.
+
+    Only reads the Content-Length header, so it must be called before
+    ``request.data`` to avoid parsing oversized bodies.
+    """
+    try:
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except (TypeError, ValueError):
+        return False
+
+    if length > get_config()['MAX_BODY_BYTES']:
+        _increment('rejected_body_too_large')
+        return True
+    return False
+
+
+def read_body(request) -> bytes:
+    """
+    Read a request's raw body from its stream, at most MAX_BODY_BYTES of it.
+
+    Unlike ``request.body``, this cannot raise RequestDataTooBig, and the
+    limit applies to the bytes actually read rather than the declared
+    Content-Length.
+
+    Raises:
+        BodyTooLarge: If the body is longer than the limit
+    """
+    limit = get_config()['MAX_BODY_BYTES']
+    body = request.read(limit + 1)
+    if len(body) > limit:
+        _increment('rejected_body_too_large')
+        raise BodyTooLarge(f'Request body exceeds {limit} bytes')
+    return body
+
+
+def _acquire_host_slot(config: Dict[str, object]) -> Optional[int]:
+    """
+    Take one of the host-wide heavy slots using non-blocking file locks.
+
+    Returns the open file descriptor holding the slot, or None if every
+    slot is taken. The lock is released when the descriptor is closed,
+    including when the worker process dies.
+    """
+    lock_dir = config['LOCK_DIR'] or tempfile.gettempdir()
+    for slot in range(config['MAX_HEAVY_PER_HOST']):
+        path = os.path.join(lock_dir, f'smart-task-heavy-{slot}.lock')
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return fd
+        except OSError:
+            os.close(fd)
+    return None
+
+
+@contextmanager
+def admit(task_count: int):
+    """
+    Admit an analysis of ``task_count`` tasks or raise AdmissionRejected.
+
+    Light analyses are always admitted. Heavy analyses must fit both the
+    per-process and the per-host budget; the slots are held for the
+    duration of the ``with`` block.
+    """
+    global _heavy_in_flight
+
+    if classify(task_count) == LIGHT:
+        _increment('admitted_light')
+        yield LIGHT
+        return
+
+    config = get_config()
+
+    with _lock:
+        if _heavy_in_flight >= config['MAX_HEAVY_PER_PROCESS']:
+            _counters['rejected_process_budget'] += 1
+            raise AdmissionRejected('process_budget', config['RETRY_AFTER_SECONDS'])
+        _heavy_in_flight += 1
+
+    host_fd = None
+    try:
+        if fcntl is not None:
+            host_fd = _acquire_host_slot(config)
+            if host_fd is None:
+                _increment('rejected_host_budget')
+                raise AdmissionRejected('host_budget', config['RETRY_AFTER_SECONDS'])
+
+        _increment('admitted_heavy')
+        yield HEAVY
+    finally:
+        if host_fd is not None:
+            os.close(host_fd)
+        with _lock:
+            _heavy_in_flight -= 1
+
+
+def get_stats() -> Dict[str, object]:
+    """Return a snapshot of the admission counters for this process."""
+    with _lock:
+        return {
+            'pid': os.getpid(),
+            'heavy_in_flight': _heavy_in_flight,
+            'counters': dict(_counters),
+        }
+
+
+def reset_stats() -> None:
+    """Reset all counters (used by tests)."""
+    with _lock:
+        for key in _counters:
+            _counters[key] = 0
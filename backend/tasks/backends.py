@@ -0,0 +1,223 @@
+"""
+Pluggable implementations of PriorityScorer.analyze_and_sort_tasks.
+
+Every backend must return exactly what the reference backend returns:
+the same scores, the same ordering (ties keep input order) and the same
+circular dependencies. tasks/conformance.py checks this on random and
+edge-case task sets; run ``python manage.py check_backends`` after
+changing or adding a backend.
+
+Backends are picked per call (``backend=`` on analyze_and_sort_tasks,
+or ``"backend"`` in analyze/suggest/job requests), falling back to
+``SCORING['BACKEND']`` in settings.
+"""
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+
+from .scoring import PriorityScorer
+
+DEFAULT_CONFIG = {
+    'BACKEND': 'reference',
+}
+
+
+class ScoringBackend(ABC):
+    """
+    Interface for analyze_and_sort_tasks implementations.
+    """
+
+    name = ''
+
+    @abstractmethod
+    def analyze(
+        self,
+        tasks: List[Dict[str, Any]],
+        strategy: str = 'smart_balance',
+        weights: Optional[Dict[str, float]] = None,
+        current_date: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """Score and sort ``tasks``, returning the analyze_and_sort_tasks result."""
+
+    @staticmethod
+    def _result(scored_tasks: List[Dict[str, Any]], circular_deps: List[List[Any]], strategy: str) -> Dict[str, Any]:
+        return {
+            'tasks': scored_tasks,
+            'circular_dependencies': circular_deps,
+            'strategy': strategy,
+            'total_tasks': len(scored_tasks),
+            'message': f'Analyzed {len(scored_tasks)} tasks using {strategy} strategy'
+        }
+
+    @staticmethod
+    def _empty_result(strategy: str) -> Dict[str, Any]:
+        return {
+            'tasks': [],
+            'circular_dependencies': [],
+            'strategy': strategy,
+            'message': 'No tasks provided'
+        }
+
+
+class ReferenceBackend(ScoringBackend):
+    """
+    The original algorithm, which defines correct behaviour.
+
+    Counts dependents by scanning the whole list for every task, so it is
+    O(n^2) in the number of tasks.
+    """
+
+    name = 'reference'
+
+    def analyze(self, tasks, strategy='smart_balance', weights=None, current_date=None):
+        if not tasks:
+            return self._empty_result(strategy)
+
+        # Validate and clean tasks
+        validated_tasks = PriorityScorer._validate_tasks(tasks)
+
+        # Detect circular dependencies
+        circular_deps = PriorityScorer.detect_circular_dependencies(validated_tasks)
+
+        # Calculate scores for all tasks
+        scored_tasks = []
+        for task in validated_tasks:
+            scored_task = PriorityScorer.calculate_priority_score(
+                task, validated_tasks, strategy, weights, current_date
+            )
+            scored_tasks.append(scored_task)
+
+        # Sort by priority score (descending)
+        scored_tasks.sort(key=lambda x: x['priority_score'], reverse=True)
+
+        return self._result(scored_tasks, circular_deps, strategy)
+
+
+class IndexedBackend(ScoringBackend):
+    """
+    Linear-time backend using a dependents index.
+
+    - Dependents are counted in one pass over the edges instead of one
+      pass over the task list per task
+    - Cycle detection is an iterative DFS with set/dict membership tests,
+      visiting nodes in the same order as the reference so it reports
+      the same cycles (and does not hit the recursion limit on long chains)
+    - Scores come from the shared PriorityScorer._score_task, with the
+      reference date resolved once per call
+
+    Unhashable IDs or dependencies fall back to the reference backend.
+    """
+
+    name = 'indexed'
+
+    def analyze(self, tasks, strategy='smart_balance', weights=None, current_date=None):
+        if not tasks:
+            return self._empty_result(strategy)
+
+        validated_tasks = PriorityScorer._validate_tasks(tasks)
+        try:
+            circular_deps = self.detect_circular_dependencies(validated_tasks)
+            dependents = self.dependents_counts(validated_tasks)
+            counts = [dependents.get(task.get('id') or task.get('title'), 0) for task in validated_tasks]
+        except TypeError:
+            return get_backend(ReferenceBackend.name).analyze(tasks, strategy, weights, current_date)
+
+        if current_date is None:
+            current_date = date.today()
+        scored_tasks = [
+            PriorityScorer._score_task(
+                task, PriorityScorer._dependency_score_for_count(count), strategy, weights, current_date
+            )
+            for task, count in zip(validated_tasks, counts)
+        ]
+
+        scored_tasks.sort(key=lambda x: x['priority_score'], reverse=True)
+        return self._result(scored_tasks, circular_deps, strategy)
+
+    @staticmethod
+    def dependents_counts(tasks: List[Dict[str, Any]]) -> Dict[Any, int]:
+        """Number of tasks listing each ID as a dependency (duplicates count once)."""
+        counts: Dict[Any, int] = {}
+        for task in tasks:
+            deps = task.get('dependencies', [])
+            if isinstance(deps, list):
+                for dep in set(deps):
+                    counts[dep] = counts.get(dep, 0) + 1
+        return counts
+
+    @staticmethod
+    def detect_circular_dependencies(tasks: List[Dict[str, Any]]) -> List[List[Any]]:
+        """Same cycles, in the same order, as PriorityScorer.detect_circular_dependencies."""
+        graph: Dict[Any, List[Any]] = {}
+        task_ids = []
+        for task in tasks:
+            task_id = task.get('id') or task.get('title')
+            if task_id:
+                task_ids.append(task_id)
+                deps = task.get('dependencies', [])
+                if isinstance(deps, list):
+                    graph[task_id] = deps
+        known = set(task_ids)
+
+        cycles = []
+        visited = set()
+        for root in task_ids:
+            if root in visited:
+                continue
+            visited.add(root)
+            path = [root]
+            position = {root: 0}  # Nodes on the current DFS path -> index in path
+            frames = [iter(graph.get(root, []))]
+            while frames:
+                for neighbor in frames[-1]:
+                    if neighbor not in known:
+                        continue
+                    if neighbor in position:
+                        cycles.append(path[position[neighbor]:] + [neighbor])
+                    elif neighbor not in visited:
+                        visited.add(neighbor)
+                        position[neighbor] = len(path)
+                        path.append(neighbor)
+                        frames.append(iter(graph.get(neighbor, [])))
+                        break
+                else:
+                    frames.pop()
+                    del position[path.pop()]
+        return cycles
+
+
+_backends: Dict[str, ScoringBackend] = {}
+
+
+def register_backend(backend: ScoringBackend) -> None:
+    """Make a backend selectable by its name."""
+    _backends[backend.name] = backend
+
+
+def backend_names() -> List[str]:
+    return list(_backends)
+
+
+def get_config() -> Dict[str, Any]:
+    """Return scoring settings merged over the defaults."""
+    return {**DEFAULT_CONFIG, **getattr(settings, 'SCORING', {})}
+
+
+def get_backend(name: Optional[str] = None) -> ScoringBackend:
+    """
+    Look up a backend by name, defaulting to SCORING['BACKEND'].
+
+    Raises:
+        ValueError: If no backend with that name is registered
+    """
+    name = name or get_config()['BACKEND']
+    try:
+        return _backends[name]
+    except KeyError:
+        raise ValueError(f'Unknown scoring backend: {name}')
+
+
+register_backend(ReferenceBackend())
+register_backend(IndexedBackend())
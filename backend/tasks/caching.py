@@ -0,0 +1,74 @@
+"""
+HTTP caching helpers for scoring endpoints.
+
+Suggestions only change when their inputs, the strategy or the reference
+date change, so responses carry a strong ETag derived from exactly those
+values. Clients and CDNs can revalidate with If-None-Match and get a 304
+without the tasks being rescored.
+"""
+import hashlib
+import json
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.http import parse_etags, quote_etag
+
+
+def compute_etag(inputs: Any, strategy: str, reference_date: date) -> str:
+    """
+    Build a strong, quoted ETag from the scoring inputs.
+
+    Args:
+        inputs: Input tasks before scoring, or a fingerprint standing in
+            for them (e.g. a backlog snapshot version)
+        strategy: Strategy name used for scoring
+        reference_date: Date urgency is scored against
+
+    Returns:
+        Quoted ETag value suitable for the ETag header
+    """
+    canonical = json.dumps(
+        {'tasks': inputs, 'strategy': strategy, 'date': reference_date},
+        sort_keys=True,
+        separators=(',', ':'),
+        cls=DjangoJSONEncoder
+    )
+    return quote_etag(hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32])
+
+
+def etag_matches(request, etag: str) -> bool:
+    """
+    Check the request's If-None-Match header against an ETag.
+
+    Uses the weak comparison RFC 9110 requires for If-None-Match.
+    """
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+
+    candidates = parse_etags(header)
+    if '*' in candidates:
+        return True
+    bare = etag[2:] if etag.startswith('W/') else etag
+    return any((c[2:] if c.startswith('W/') else c) == bare for c in candidates)
+
+
+def seconds_until_midnight(now: Optional[datetime] = None) -> int:
+    """Seconds until the reference date rolls over (server local time)."""
+    now = now or datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), time.min)
+    return max(1, int((midnight - now).total_seconds()))
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    """
+    Headers for a cacheable scoring response.
+
+    Responses may be reused until the reference date rolls over, after
+    which caches must revalidate.
+    """
+    return {
+        'ETag': etag,
+        'Cache-Control': f'public, max-age={seconds_until_midnight()}, must-revalidate',
+    }
@@ -0,0 +1,189 @@
+"""
+Opt-in capture of scoring requests for deterministic replay.
+
+Slow production requests are hard to reproduce later, because both the
+payload and "today" have changed by then. When enabled, sampled
+analyze/suggest requests are appended to a gzipped JSON Lines file with
+everything scoring depends on:
+- The tasks exactly as handed to the scorer, and the strategy
+- The reference date the request was scored against
+- The scoring time and the resulting ranking and scores
+
+``python manage.py replay_captures`` re-runs them against the current
+PriorityScorer with the captured date pinned, then reports timing and
+ranking differences.
+
+Each record is written as its own gzip member under an exclusive file
+lock, so several worker processes can append to one file; gzip readers
+treat the concatenated members as a single stream.
+"""
+import gzip
+import json
+import logging
+import os
+import random
+import statistics
+import time
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .backends import get_backend
+from .scoring import PriorityScorer
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows development machines
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    'ENABLED': False,
+    'PATH': 'captures/requests.jsonl.gz',  # Relative paths are under BASE_DIR
+    'SAMPLE_RATE': 0.01,                   # Fraction of requests considered for capture
+    'MIN_SCORING_MS': 0.0,                 # Only keep sampled requests at least this slow
+}
+
+
+def get_config() -> Dict[str, Any]:
+    """Return capture settings merged over the defaults."""
+    return {**DEFAULT_CONFIG, **getattr(settings, 'REQUEST_CAPTURE', {})}
+
+
+def capture_path(config: Optional[Dict[str, Any]] = None) -> str:
+    path = str((config or get_config())['PATH'])
+    if os.path.isabs(path):
+        return path
+    return os.path.join(settings.BASE_DIR, path)
+
+
+def should_sample() -> bool:
+    """Decide up front whether to time this request for capture."""
+    config = get_config()
+    return bool(config['ENABLED']) and random.random() < config['SAMPLE_RATE']
+
+
+def _ranking(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {'id': task.get('id', task.get('title')), 'score': task['priority_score']}
+        for task in result['tasks']
+    ]
+
+
+def record(
+    endpoint: str,
+    tasks: List[Dict[str, Any]],
+    strategy: str,
+    reference_date: date,
+    result: Dict[str, Any],
+    scoring_seconds: float,
+    backend: Optional[str] = None
+) -> bool:
+    """
+    Append one captured request, if it is slow enough to keep.
+
+    Call only for requests where should_sample() returned True. Write
+    failures are logged and never affect the request.
+
+    Returns:
+        True if the request was written
+    """
+    config = get_config()
+    scoring_ms = scoring_seconds * 1000
+    if scoring_ms < config['MIN_SCORING_MS']:
+        return False
+
+    line = json.dumps({
+        'endpoint': endpoint,
+        'captured_at': timezone.now(),
+        'reference_date': reference_date,
+        'strategy': strategy,
+        'backend': backend,
+        'task_count': len(tasks),
+        'scoring_ms': round(scoring_ms, 3),
+        'tasks': tasks,
+        'ranking': _ranking(result),
+    }, cls=DjangoJSONEncoder, separators=(',', ':')) + '\n'
+
+    path = capture_path(config)
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'ab') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                with gzip.GzipFile(fileobj=f, mode='wb') as member:
+                    member.write(line.encode('utf-8'))
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+    except OSError:
+        logger.warning('Could not write request capture to %s', path, exc_info=True)
+        return False
+    return True
+
+
+def read_captures(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield captured records from a capture file."""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def replay(capture: Dict[str, Any], repeat: int = 3, backend: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Re-score one captured request with its reference date pinned.
+
+    Args:
+        capture: Record from read_captures()
+        repeat: Number of timed runs; the median is reported
+        backend: Scoring backend to replay with (defaults to the SCORING
+            setting, not the backend that served the request)
+
+    Returns:
+        Timing comparison and the first ranking/score differences
+    """
+    reference_date = date.fromisoformat(capture['reference_date'])
+    timings = []
+    for _ in range(max(1, repeat)):
+        # The scorer fills defaults in place, so give each run fresh copies
+        tasks = [dict(task) for task in capture['tasks']]
+        started = time.perf_counter()
+        result = PriorityScorer.analyze_and_sort_tasks(
+            tasks, strategy=capture['strategy'], current_date=reference_date, backend=backend
+        )
+        timings.append(time.perf_counter() - started)
+
+    captured = capture['ranking']
+    replayed = _ranking(result)
+    first_difference = next(
+        (rank for rank, (old, new) in enumerate(zip(captured, replayed)) if old['id'] != new['id']),
+        None if len(captured) == len(replayed) else min(len(captured), len(replayed))
+    )
+    replayed_scores = {entry['id']: entry['score'] for entry in replayed}
+    score_changes = [
+        {'id': entry['id'], 'captured': entry['score'], 'replayed': replayed_scores.get(entry['id'])}
+        for entry in captured
+        if replayed_scores.get(entry['id']) != entry['score']
+    ]
+
+    replay_ms = statistics.median(timings) * 1000
+    return {
+        'endpoint': capture['endpoint'],
+        'reference_date': capture['reference_date'],
+        'strategy': capture['strategy'],
+        'captured_backend': capture.get('backend'),
+        'replay_backend': backend or get_backend().name,
+        'task_count': capture['task_count'],
+        'captured_ms': capture['scoring_ms'],
+        'replay_ms': round(replay_ms, 3),
+        'speedup': round(capture['scoring_ms'] / replay_ms, 2) if replay_ms else None,
+        'ranking_changed': first_difference is not None,
+        'first_difference': first_difference,
+        'score_changes': score_changes,
+    }
@@ -0,0 +1,209 @@
+"""
+Conformance and differential checks for scoring backends.
+
+Every backend is run on the same inputs as the reference backend and must
+return an identical result: task order, scores, component scores,
+reason codes and circular dependencies. Inputs are:
+- Hand-written edge cases mirroring PriorityScoringTests in tests.py
+  (overdue/today/future/missing dates, out-of-range fields, cycles,
+  missing IDs and titles, ties)
+- Seeded random task sets with random dependency graphs, including
+  unknown dependencies, duplicate edges and cycles
+
+``python manage.py check_backends`` runs the checks and benchmarks each
+backend; the test suite runs a smaller configuration.
+"""
+import copy
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .backends import ReferenceBackend, ScoringBackend, backend_names, get_backend
+from .scoring import PriorityScorer
+
+TaskSet = List[Dict[str, Any]]
+
+STRATEGIES = list(PriorityScorer.STRATEGY_WEIGHTS)
+REFERENCE_DATE = date(2026, 1, 15)  # Fixed so runs are reproducible
+
+
+def _on(offset: Optional[int], current_date: date) -> Optional[str]:
+    return None if offset is None else str(current_date + timedelta(days=offset))
+
+
+def edge_cases(current_date: date = REFERENCE_DATE) -> Dict[str, TaskSet]:
+    """Named task sets covering the boundaries the scorer has to handle."""
+    def task(task_id, offset=0, hours=2, importance=5, deps=None, **extra):
+        return {
+            'id': task_id, 'title': f'Task {task_id}', 'due_date': _on(offset, current_date),
+            'estimated_hours': hours, 'importance': importance, 'dependencies': deps or [], **extra
+        }
+
+    return {
+        'empty': [],
+        'minimal_task': [{'id': 'minimal_task', 'title': 'Minimal Task'}],
+        'urgency_boundaries': [
+            task(f'd{offset}', offset=offset)
+            for offset in (-30, -7, -1, 0, 1, 7, 8, 30, 31, 400)
+        ] + [task('no_date', offset=None), {**task('bad_date'), 'due_date': 'not-a-date'}],
+        'importance_range': [
+            task(f'i{value}', importance=value) for value in (1, 5, 10, 0, 11, -3, 7.9, 'high', None)
+        ],
+        'effort_range': [
+            task(f'h{value}', hours=value) for value in (0.1, 1, 2.5, 4, 6, 8, 16, 40, 0, -2, 'long', None)
+        ],
+        'blocking_tasks': [
+            task('root'), task('one'), task('two'),
+            task('a', deps=['root', 'one']), task('b', deps=['root', 'two']),
+            task('c', deps=['root', 'two']), task('d', deps=['root', 'root']),
+        ],
+        'two_cycle': [task('task_1', deps=['task_2']), task('task_2', deps=['task_1'])],
+        'self_dependency': [task('loop', deps=['loop'])],
+        'nested_cycles': [
+            task('a', deps=['b']), task('b', deps=['c', 'a']), task('c', deps=['a', 'd']),
+            task('d', deps=['e']), task('e', deps=['d', 'missing']),
+        ],
+        'unknown_dependencies': [task('a', deps=['ghost', 'ghost']), task('b', deps=['a', 'nobody'])],
+        'missing_ids_and_titles': [
+            {'title': 'Uses title as ID', 'due_date': _on(1, current_date)},
+            {'id': None, 'title': 'Null ID', 'dependencies': ['Uses title as ID']},
+            {'id': 'untitled', 'importance': 9},
+            {'id': '', 'title': 'Empty ID'},
+        ],
+        'duplicate_ids': [task('dup', offset=1), task('dup', offset=5, deps=['other']), task('other', deps=['dup'])],
+        'non_list_dependencies': [task('a'), {**task('b'), 'dependencies': 'a'}, {**task('c'), 'dependencies': None}],
+        'integer_ids': [task(1, deps=[2]), task(2, deps=[3]), task(3), task(4, deps=[1, 2, 3])],
+        'ties': [task(f't{i}') for i in range(8)],
+    }
+
+
+def random_task_set(rng: random.Random, size: int, current_date: date = REFERENCE_DATE) -> TaskSet:
+    """
+    A random task set with a random dependency graph.
+
+    Field values come from small pools so that equal scores (and hence
+    tie ordering) are common.
+    """
+    ids = [f't{i}' for i in range(size)]
+    cyclic = rng.random() < 0.5
+    tasks = []
+    for i, task_id in enumerate(ids):
+        roll = rng.random()
+        if roll < 0.1:
+            due_date = None
+        elif roll < 0.12:
+            due_date = 'someday'
+        else:
+            due_date = _on(rng.choice([-20, -3, -1, 0, 1, 2, 5, 7, 10, 20, 30, 45, 120]), current_date)
+
+        # Mostly edges to earlier tasks (a DAG); cyclic sets also point forward
+        targets = ids[:i] if not cyclic else ids
+        deps = [rng.choice(targets) for _ in range(rng.choice([0, 0, 1, 1, 2, 3]))] if targets else []
+        if rng.random() < 0.05:
+            deps.append('unknown')
+
+        task = {
+            'id': task_id,
+            'title': f'Task {i}',
+            'due_date': due_date,
+            'estimated_hours': rng.choice([0.5, 1, 2, 3, 4, 6, 8, 12, 24]),
+            'importance': rng.randint(1, 10),
+            'dependencies': deps,
+        }
+        if rng.random() < 0.03:
+            del task['id']
+        if rng.random() < 0.02:
+            del task['title']
+        tasks.append(task)
+    return tasks
+
+
+def diff_results(expected: Dict[str, Any], actual: Dict[str, Any]) -> Optional[str]:
+    """Describe the first difference between two results, or None if identical."""
+    if expected.get('circular_dependencies') != actual.get('circular_dependencies'):
+        return (
+            f"circular dependencies differ: {expected.get('circular_dependencies')!r} "
+            f"!= {actual.get('circular_dependencies')!r}"
+        )
+    expected_tasks, actual_tasks = expected['tasks'], actual['tasks']
+    for rank, (want, got) in enumerate(zip(expected_tasks, actual_tasks)):
+        if want != got:
+            keys = sorted(key for key in set(want) | set(got) if want.get(key) != got.get(key))
+            return f'rank {rank}: {", ".join(keys)} differ ({want.get("id")!r} vs {got.get("id")!r})'
+    if len(expected_tasks) != len(actual_tasks):
+        return f'{len(expected_tasks)} tasks expected, got {len(actual_tasks)}'
+    if expected != actual:
+        return 'result metadata differs'
+    return None
+
+
+def _timed(backend: ScoringBackend, tasks: TaskSet, strategy: str, current_date: date) -> Tuple[Dict[str, Any], float]:
+    # Backends fill in defaults in place, so each run gets its own copy
+    tasks = copy.deepcopy(tasks)
+    started = time.perf_counter()
+    result = backend.analyze(tasks, strategy, None, current_date)
+    return result, time.perf_counter() - started
+
+
+def check_backends(
+    names: Optional[Iterable[str]] = None,
+    seeds: Iterable[int] = range(25),
+    sizes: Iterable[int] = (0, 1, 2, 5, 20, 100),
+    current_date: date = REFERENCE_DATE
+) -> Dict[str, Any]:
+    """
+    Compare backends against the reference on edge cases and random sets.
+
+    Returns:
+        Number of cases run and, per backend, a list of mismatches and
+        the total scoring time
+    """
+    names = [name for name in (names or backend_names()) if name != ReferenceBackend.name]
+    reference = get_backend(ReferenceBackend.name)
+
+    cases: List[Tuple[str, TaskSet]] = list(edge_cases(current_date).items())
+    for seed in seeds:
+        rng = random.Random(seed)
+        cases.extend((f'random seed={seed} size={size}', random_task_set(rng, size, current_date)) for size in sizes)
+
+    report = {'cases': len(cases) * len(STRATEGIES), 'backends': {}}
+    for name in [ReferenceBackend.name] + names:
+        report['backends'][name] = {'mismatches': [], 'seconds': 0.0}
+
+    for label, tasks in cases:
+        for strategy in STRATEGIES:
+            expected, elapsed = _timed(reference, tasks, strategy, current_date)
+            report['backends'][ReferenceBackend.name]['seconds'] += elapsed
+            for name in names:
+                actual, elapsed = _timed(get_backend(name), tasks, strategy, current_date)
+                entry = report['backends'][name]
+                entry['seconds'] += elapsed
+                difference = diff_results(expected, actual)
+                if difference:
+                    entry['mismatches'].append(f'{label} [{strategy}]: {difference}')
+    return report
+
+
+def benchmark(
+    names: Optional[Iterable[str]] = None,
+    sizes: Iterable[int] = (100, 1000, 3000),
+    repeat: int = 3,
+    seed: int = 0,
+    current_date: date = REFERENCE_DATE,
+    progress: Optional[Callable[[str, int, float], None]] = None
+) -> Dict[str, Dict[int, float]]:
+    """
+    Median analyze time in milliseconds for each backend and task count.
+    """
+    names = list(names or backend_names())
+    timings: Dict[str, Dict[int, float]] = {name: {} for name in names}
+    for size in sizes:
+        tasks = random_task_set(random.Random(seed), size, current_date)
+        for name in names:
+            runs = [_timed(get_backend(name), tasks, 'smart_balance', current_date)[1] for _ in range(max(1, repeat))]
+            timings[name][size] = round(statistics.median(runs) * 1000, 3)
+            if progress:
+                progress(name, size, timings[name][size])
+    return timings
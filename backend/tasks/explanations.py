@@ -0,0 +1,108 @@
+"""
+Structured priority explanations: reason codes, parameters and templates.
+
+Scoring used to build an explanation string for every task, re-parsing
+the due date and calling date.today() on the way. Scored tasks now carry
+``reasons`` instead, a list of codes with the parameters their text
+needs, derived only from values scoring has already computed:
+
+    [{'code': 'overdue', 'days': 3}, {'code': 'high_importance', 'rating': 8}]
+
+Text is rendered only when a client asks for it (``?explain=text``),
+from per-language templates that are translated once and cached. The
+templates are gettext messages, so adding a locale's catalog is all a
+new language needs.
+"""
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.utils import translation
+from django.utils.translation import gettext_noop
+
+OVERDUE = 'overdue'
+DUE_SOON = 'due_soon'
+HIGH_IMPORTANCE = 'high_importance'
+QUICK_WIN = 'quick_win'
+BLOCKS_OTHERS = 'blocks_others'
+STANDARD = 'standard'
+
+# Placeholders are the reason's parameter names
+TEMPLATES = {
+    OVERDUE: gettext_noop('Overdue by {days} day(s)'),
+    DUE_SOON: gettext_noop('Due very soon'),
+    HIGH_IMPORTANCE: gettext_noop('High importance ({rating}/10)'),
+    QUICK_WIN: gettext_noop('Quick win ({hours}h estimated)'),
+    BLOCKS_OTHERS: gettext_noop('Blocks other tasks'),
+    STANDARD: gettext_noop('Standard priority task'),
+}
+SEPARATOR = '; '
+
+
+def reasons(
+    urgency: float,
+    importance: float,
+    effort: float,
+    dependency: float,
+    importance_rating: Any,
+    estimated_hours: Any
+) -> List[Dict[str, Any]]:
+    """
+    Reasons for a task's priority, from its component scores.
+
+    Args:
+        urgency, importance, effort, dependency: Component scores
+        importance_rating: The task's importance as given
+        estimated_hours: The task's estimate as given
+
+    Returns:
+        Reason dicts, each with a ``code`` and its template's parameters
+    """
+    result = []
+    if urgency > 1.0:
+        # Inverse of PriorityScorer._urgency_for_days for overdue tasks
+        result.append({'code': OVERDUE, 'days': round((urgency - 1.0) * 10)})
+    elif urgency >= 0.8:
+        result.append({'code': DUE_SOON})
+    if importance >= 0.7:
+        result.append({'code': HIGH_IMPORTANCE, 'rating': importance_rating})
+    if effort >= 0.7:
+        result.append({'code': QUICK_WIN, 'hours': estimated_hours})
+    if dependency >= 0.5:
+        result.append({'code': BLOCKS_OTHERS})
+    return result or [{'code': STANDARD}]
+
+
+def get_language(requested: Optional[str] = None) -> str:
+    """The supported language closest to ``requested``, else the site default."""
+    if requested:
+        try:
+            return translation.get_supported_language_variant(requested)
+        except LookupError:
+            pass
+    return settings.LANGUAGE_CODE
+
+
+@lru_cache(maxsize=None)
+def templates(language: str) -> Dict[str, str]:
+    """Templates translated into ``language``; computed once per language."""
+    with translation.override(language):
+        return {code: translation.gettext(message) for code, message in TEMPLATES.items()}
+
+
+def render(task_reasons: Iterable[Dict[str, Any]], language: Optional[str] = None) -> str:
+    """Render reasons as one explanation string."""
+    compiled = templates(language or settings.LANGUAGE_CODE)
+    return SEPARATOR.join(compiled[reason['code']].format_map(reason) for reason in task_reasons)
+
+
+def with_text(tasks: Iterable[Dict[str, Any]], language: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Copies of scored tasks with an ``explanation`` rendered from their reasons.
+
+    Copies, because tasks may be shared state such as a queue's scored tasks.
+    """
+    return [
+        {**task, 'explanation': render(task['reasons'], language)} if 'reasons' in task else task
+        for task in tasks
+    ]
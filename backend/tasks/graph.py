@@ -0,0 +1,203 @@
+"""
+Dependency graph queries over persisted tasks.
+
+Dependencies live in the TaskDependency edge table, which is indexed in
+both directions. Everything here runs as indexed queries that touch only
+the tasks involved, rather than loading and decoding every task:
+- Dependents counts for a set of tasks
+- The neighbourhood of a task set, for incremental rescoring
+- Reachability checks that reject cycles at write time, reporting the
+  cycle an edge would close
+- Conversion of persisted tasks to the dicts PriorityScorer expects
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Task, TaskDependency, Workspace
+
+
+def dependents_counts(task_ids: Iterable[int]) -> Dict[int, int]:
+    """
+    Count how many tasks depend on each of ``task_ids``.
+
+    Tasks with no dependents are omitted from the result.
+    """
+    rows = (
+        TaskDependency.objects
+        .filter(depends_on_id__in=list(task_ids))
+        .values('depends_on_id')
+        .annotate(count=Count('id'))
+    )
+    return {row['depends_on_id']: row['count'] for row in rows}
+
+
+def load_neighbourhood(task_ids: Iterable[int]) -> Dict[str, Any]:
+    """
+    Load the direct dependencies and dependents of a set of tasks.
+
+    This is what incremental rescoring needs after ``task_ids`` change:
+    their dependents' eligibility and their dependencies' dependents
+    counts may have changed, but nothing further out.
+
+    Returns:
+        Dictionary with the edges touching ``task_ids`` and the IDs of
+        every task at either end of them
+    """
+    task_ids = set(task_ids)
+    forward = list(
+        TaskDependency.objects
+        .filter(task_id__in=task_ids)
+        .values_list('task_id', 'depends_on_id')
+    )
+    reverse = list(
+        TaskDependency.objects
+        .filter(depends_on_id__in=task_ids)
+        .values_list('task_id', 'depends_on_id')
+    )
+    edges = set(forward) | set(reverse)
+
+    neighbours = set(task_ids)
+    for task_id, depends_on_id in edges:
+        neighbours.add(task_id)
+        neighbours.add(depends_on_id)
+
+    return {'task_ids': neighbours, 'edges': sorted(edges)}
+
+
+def find_cycle(task_id: int, depends_on_id: int) -> Optional[List[int]]:
+    """
+    Find the cycle that adding the edge ``task_id -> depends_on_id`` would close.
+
+    A cycle appears exactly when ``task_id`` is already reachable from
+    ``depends_on_id`` by following dependencies. The search runs from both
+    ends at once, upstream from ``depends_on_id`` along dependencies and
+    downstream from ``task_id`` along dependents, one level per query and
+    always on the smaller frontier. It stops as soon as either side runs
+    out, so its cost depends on the smaller of the two regions rather than
+    on the size of the backlog; a task with no dependents is checked in at
+    most two queries. Edges never cross workspaces, so the search stays inside
+    one workspace.
+
+    Returns:
+        The cycle as task IDs, ``[task_id, depends_on_id, ..., task_id]``,
+        or None if the edge is safe to add
+    """
+    if task_id == depends_on_id:
+        return [task_id, task_id]
+
+    # Each node's neighbour one step closer to where its search started
+    upstream: Dict[int, Optional[int]] = {depends_on_id: None}
+    downstream: Dict[int, Optional[int]] = {task_id: None}
+    up_frontier, down_frontier = {depends_on_id}, {task_id}
+    meeting = None
+    go_up = False
+    while up_frontier and down_frontier and meeting is None:
+        # Take turns on ties, so a side with nothing left is found early
+        go_up = len(up_frontier) < len(down_frontier) or (len(up_frontier) == len(down_frontier) and not go_up)
+        if go_up:
+            edges = TaskDependency.objects.filter(task_id__in=up_frontier).values_list('task_id', 'depends_on_id')
+            visited, other, frontier = upstream, downstream, set()
+        else:
+            edges = TaskDependency.objects.filter(depends_on_id__in=down_frontier).values_list(
+                'depends_on_id', 'task_id'
+            )
+            visited, other, frontier = downstream, upstream, set()
+        for source, target in edges:
+            if target not in visited:
+                visited[target] = source
+                frontier.add(target)
+                if target in other:
+                    meeting = target
+                    break
+        if go_up:
+            up_frontier = frontier
+        else:
+            down_frontier = frontier
+
+    if meeting is None:
+        return None
+
+    path = []
+    node = meeting
+    while node is not None:
+        path.append(node)
+        node = upstream[node]
+    path.reverse()
+    node = downstream[meeting]
+    while node is not None:
+        path.append(node)
+        node = downstream[node]
+    return [task_id] + path
+
+
+def would_create_cycle(task_id: int, depends_on_id: int) -> bool:
+    """Check whether adding the edge ``task_id -> depends_on_id`` closes a cycle."""
+    return find_cycle(task_id, depends_on_id) is not None
+
+
+def describe_cycle(cycle: List[int]) -> str:
+    """Render a cycle from find_cycle() with task titles, e.g. "a -> c -> b -> a"."""
+    titles = dict(Task.objects.filter(pk__in=cycle).values_list('pk', 'title'))
+    return ' -> '.join(titles.get(task_id, str(task_id)) for task_id in cycle)
+
+
+def check_acyclic(task_id: int, depends_on_id: int) -> None:
+    """
+    Raise ValidationError if adding the edge ``task_id -> depends_on_id`` closes a cycle.
+
+    The error's code is ``circular_dependency``; its params hold the
+    cycle's description (``cycle``) and task IDs (``path``).
+    """
+    cycle = find_cycle(task_id, depends_on_id)
+    if cycle:
+        raise ValidationError(
+            'This dependency would create a circular dependency: %(cycle)s',
+            code='circular_dependency',
+            params={'cycle': describe_cycle(cycle), 'path': cycle},
+        )
+
+
+def lock_workspace_graph(workspace_id: int) -> None:
+    """
+    Serialize dependency writes within a workspace until the transaction ends.
+
+    Two transactions could otherwise each add half of a cycle, with each
+    check passing because it cannot see the other's edge. Locks the
+    workspace row where the database supports it; a no-op outside a
+    transaction.
+    """
+    if transaction.get_connection().in_atomic_block:
+        list(Workspace.objects.select_for_update().filter(pk=workspace_id).values_list('pk', flat=True))
+
+
+def to_scoring_dicts(tasks: Iterable[Task]) -> List[Dict[str, Any]]:
+    """
+    Convert persisted tasks to the dictionaries PriorityScorer expects.
+
+    Dependencies are loaded with a single indexed query for all tasks and
+    IDs are stringified, matching the API's task format.
+    """
+    tasks = list(tasks)
+    dependencies: Dict[int, List[str]] = {task.pk: [] for task in tasks}
+    edges = (
+        TaskDependency.objects
+        .filter(task_id__in=list(dependencies))
+        .values_list('task_id', 'depends_on_id')
+    )
+    for task_id, depends_on_id in edges:
+        dependencies[task_id].append(str(depends_on_id))
+
+    return [
+        {
+            'id': str(task.pk),
+            'title': task.title,
+            'due_date': task.due_date,
+            'estimated_hours': task.estimated_hours,
+            'importance': task.importance,
+            'dependencies': dependencies[task.pk],
+        }
+        for task in tasks
+    ]
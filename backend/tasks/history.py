@@ -0,0 +1,261 @@
+"""
+Append-only history of backlog scores, one sample per open task per day.
+
+Scores were only ever computed for a response and thrown away, so there
+was no way to see which tasks keep slipping or how the backlog's urgency
+evolves. Each workspace's snapshot (see snapshot.py) is now recorded
+once a day:
+- A ScoreSample row per open task: its rank, score and due date
+- A DailyBacklogSummary row: due-date bands and score percentiles
+
+Both are written in one transaction with batched bulk inserts, and the
+summary's unique (workspace, day) constraint makes sure only one worker
+records a day. Samples older than the retention window are deleted at
+the same time; summaries are one row a day and are kept.
+
+Recording writes a row per open task, so it never runs on the request
+path: the job workers call record_pending() periodically, and the
+record_score_history command covers deployments without job workers.
+
+Trend queries never scan the full history:
+- daily_summaries() reads one summary row per day in the window
+- rank_changes() reads the samples of two days through the unique
+  (workspace, day, task_id) index
+- task_history() reads one task's samples through the
+  (workspace, task_id, day) index
+"""
+import logging
+import statistics
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .models import DailyBacklogSummary, ScoreSample, Task, Workspace
+from .snapshot import get_snapshot
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    'ENABLED': True,
+    'STRATEGY': 'smart_balance',  # Strategy whose ranks and scores are recorded
+    'BATCH_SIZE': 1000,           # Rows per bulk INSERT
+    'RETENTION_DAYS': 180,        # Samples older than this are deleted
+}
+
+# (workspace ID, day) pairs this process knows are recorded
+_recorded: Set[Tuple[int, date]] = set()
+
+
+def get_config() -> Dict[str, Any]:
+    """Return score history settings merged over the defaults."""
+    return {**DEFAULT_CONFIG, **getattr(settings, 'SCORE_HISTORY', {})}
+
+
+def reset_recorded() -> None:
+    """Forget which days this process has recorded (used by tests)."""
+    _recorded.clear()
+
+
+def _percentile(ordered: List[float], fraction: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 3)
+
+
+def _summarize(
+    workspace_id: int, day: date, strategy: str, rows: List[Tuple[int, float, Optional[date]]]
+) -> DailyBacklogSummary:
+    bands = {'overdue': 0, 'due_today': 0, 'due_this_week': 0, 'due_later': 0, 'no_due_date': 0}
+    for _, _, due_date in rows:
+        if due_date is None:
+            bands['no_due_date'] += 1
+        elif due_date < day:
+            bands['overdue'] += 1
+        elif due_date == day:
+            bands['due_today'] += 1
+        elif due_date <= day + timedelta(days=7):
+            bands['due_this_week'] += 1
+        else:
+            bands['due_later'] += 1
+
+    scores = sorted(score for _, score, _ in rows)
+    return DailyBacklogSummary(
+        workspace_id=workspace_id,
+        day=day,
+        strategy=strategy,
+        open_tasks=len(rows),
+        mean_score=round(statistics.fmean(scores), 3) if scores else None,
+        median_score=round(statistics.median(scores), 3) if scores else None,
+        p90_score=_percentile(scores, 0.9),
+        **bands
+    )
+
+
+def is_recorded(workspace_id: int, day: date) -> bool:
+    """Check whether a workspace's history for ``day`` is recorded."""
+    if (workspace_id, day) in _recorded:
+        return True
+    if DailyBacklogSummary.objects.filter(workspace_id=workspace_id, day=day).exists():
+        _recorded.add((workspace_id, day))
+        return True
+    return False
+
+
+def record_day(workspace_id: int, snapshot) -> bool:
+    """
+    Record a workspace's snapshot as its history for the snapshot's day.
+
+    A no-op if the day is already recorded or history is disabled, so it
+    is safe to call repeatedly. Errors are logged, not raised: history
+    must never stop the job workers.
+
+    Returns:
+        True if this call recorded the day
+    """
+    config = get_config()
+    day = snapshot.reference_date
+    if not config['ENABLED']:
+        return False
+
+    try:
+        if is_recorded(workspace_id, day):
+            return False
+
+        strategy = config['STRATEGY']
+        rows = list(snapshot.ranked(strategy))
+        samples = [
+            ScoreSample(
+                workspace_id=workspace_id, day=day, task_id=task_id,
+                rank=rank, score=round(score, 3), due_date=due_date
+            )
+            for rank, (task_id, score, due_date) in enumerate(rows, 1)
+        ]
+        cutoff = day - timedelta(days=config['RETENTION_DAYS'])
+        with transaction.atomic():
+            # Claims the day; a concurrent recorder fails here and backs off
+            _summarize(workspace_id, day, strategy, rows).save()
+            ScoreSample.objects.bulk_create(samples, batch_size=config['BATCH_SIZE'])
+            ScoreSample.objects.filter(workspace_id=workspace_id, day__lt=cutoff).delete()
+    except IntegrityError:
+        _recorded.add((workspace_id, day))
+        return False
+    except Exception:
+        logger.exception('Could not record score history for workspace %s on %s', workspace_id, day)
+        return False
+
+    _recorded.add((workspace_id, day))
+    return True
+
+
+def record_pending() -> int:
+    """
+    Record today's history for every workspace that has none yet.
+
+    Cheap once a day is recorded (a set lookup per workspace), so the job
+    workers call it every housekeeping pass.
+
+    Returns:
+        Number of workspaces recorded by this call
+    """
+    if not get_config()['ENABLED']:
+        return 0
+    today = date.today()
+    recorded = 0
+    for workspace_id in Workspace.objects.order_by('pk').values_list('pk', flat=True):
+        if not is_recorded(workspace_id, today):
+            recorded += record_day(workspace_id, get_snapshot(workspace_id))
+    return recorded
+
+
+def daily_summaries(workspace_id: int, start: date, end: date) -> List[Dict[str, Any]]:
+    """Recorded summaries from ``start`` to ``end`` inclusive, oldest first."""
+    return list(
+        DailyBacklogSummary.objects.filter(workspace_id=workspace_id, day__range=(start, end))
+        .order_by('day')
+        .values(
+            'day', 'strategy', 'open_tasks', 'overdue', 'due_today', 'due_this_week',
+            'due_later', 'no_due_date', 'mean_score', 'median_score', 'p90_score'
+        )
+    )
+
+
+def _titles(task_ids: List[int]) -> Dict[int, str]:
+    return dict(Task.objects.filter(pk__in=task_ids).values_list('pk', 'title'))
+
+
+def rank_changes(workspace_id: int, start: date, end: date, limit: int = 10) -> Dict[str, Any]:
+    """
+    Compare ranks on the first and last recorded days between ``start`` and ``end``.
+
+    Only tasks open on both days are compared. ``slipping`` holds the
+    largest rank drops and ``climbing`` the largest rises; a task's
+    ``change`` is positive when it moved up. Deleted tasks have no title.
+    """
+    days = list(
+        DailyBacklogSummary.objects.filter(workspace_id=workspace_id, day__range=(start, end))
+        .order_by('day')
+        .values_list('day', flat=True)
+    )
+    result = {'from': None, 'to': None, 'compared': 0, 'opened': 0, 'closed': 0, 'slipping': [], 'climbing': []}
+    if not days:
+        return result
+    first, last = days[0], days[-1]
+    result['from'], result['to'] = first, last
+
+    def ranks(day):
+        return dict(
+            ScoreSample.objects.filter(workspace_id=workspace_id, day=day).values_list('task_id', 'rank')
+        )
+
+    before, after = ranks(first), ranks(last)
+    moves = [
+        (task_id, before[task_id], rank)
+        for task_id, rank in after.items()
+        if task_id in before and before[task_id] != rank
+    ]
+    result['compared'] = len(set(before) & set(after))
+    result['opened'] = len(set(after) - set(before))
+    result['closed'] = len(set(before) - set(after))
+
+    slipping = sorted((m for m in moves if m[2] > m[1]), key=lambda m: (m[1] - m[2], m[0]))[:limit]
+    climbing = sorted((m for m in moves if m[2] < m[1]), key=lambda m: (m[2] - m[1], m[0]))[:limit]
+    titles = _titles([m[0] for m in slipping + climbing])
+
+    def entry(move):
+        task_id, from_rank, to_rank = move
+        return {
+            'id': task_id,
+            'title': titles.get(task_id),
+            'from_rank': from_rank,
+            'to_rank': to_rank,
+            'change': from_rank - to_rank,
+        }
+
+    result['slipping'] = [entry(m) for m in slipping]
+    result['climbing'] = [entry(m) for m in climbing]
+    return result
+
+
+def task_history(workspace_id: int, task_id: int, start: date, end: date) -> Dict[str, Any]:
+    """
+    One task's daily rank, score and due date from ``start`` to ``end``.
+
+    ``due_date_slips`` counts the days its due date moved later than the
+    previous sample's.
+    """
+    samples = list(
+        ScoreSample.objects.filter(workspace_id=workspace_id, task_id=task_id, day__range=(start, end))
+        .order_by('day')
+        .values('day', 'rank', 'score', 'due_date')
+    )
+    slips = 0
+    previous_due = None
+    for sample in samples:
+        due_date = sample['due_date']
+        sample['overdue'] = due_date is not None and due_date < sample['day']
+        if previous_due is not None and (due_date is None or due_date > previous_due):
+            slips += 1
+        previous_due = due_date
+    return {'samples': samples, 'due_date_slips': slips}
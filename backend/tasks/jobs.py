@@ -0,0 +1,286 @@
+"""
+Asynchronous analysis jobs.
+
+Jobs are rows in the AnalysisJob table. The ``run_job_workers`` management
+command polls for queued jobs and executes them in a local process pool,
+so no external broker is needed:
+- Submissions with an identical kind and payload are deduplicated
+- Workers report progress while a job runs
+- Finished jobs expire after a configurable time to live
+- Between polls the dispatcher purges expired jobs and records the
+  day's score history (see history.py), keeping both off the request path
+- A running job's ``started_at`` is its lease: jobs still running after
+  the configured timeout are assumed lost with their worker and failed
+  by the same housekeeping pass
+"""
+import hashlib
+import json
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, connections
+from django.db.models import Q
+from django.utils import timezone
+
+from . import history
+from .models import AnalysisJob
+from .scoring import PriorityScorer
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CONFIG = {
+    'WORKERS': 2,
+    'POLL_INTERVAL_SECONDS': 1.0,
+    'RESULT_TTL_SECONDS': 3600,
+    'RUNNING_TIMEOUT_SECONDS': 900,  # Lease on a running job; must exceed the longest job
+}
+
+ProgressCallback = Callable[[float], None]
+
+
+def get_config() -> Dict[str, Any]:
+    """Return job settings merged over the defaults."""
+    return {**DEFAULT_CONFIG, **getattr(settings, 'ANALYSIS_JOBS', {})}
+
+
+def compute_fingerprint(kind: str, payload: Dict[str, Any]) -> str:
+    """Hash a job's kind and payload into a stable deduplication key."""
+    canonical = json.dumps(
+        {'kind': kind, 'payload': payload},
+        sort_keys=True,
+        separators=(',', ':'),
+        cls=DjangoJSONEncoder
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def submit_job(kind: str, payload: Dict[str, Any]) -> Tuple[AnalysisJob, bool]:
+    """
+    Queue a job, reusing an identical live job if one exists.
+
+    A job is reused while it is queued, running or succeeded and not yet
+    expired. Failed jobs and running jobs past their lease are never
+    reused so clients can retry.
+
+    Returns:
+        Tuple of (job, created)
+    """
+    fingerprint = compute_fingerprint(kind, payload)
+    now = timezone.now()
+
+    existing = AnalysisJob.objects.filter(
+        fingerprint=fingerprint,
+        status__in=[
+            AnalysisJob.STATUS_QUEUED,
+            AnalysisJob.STATUS_RUNNING,
+            AnalysisJob.STATUS_SUCCEEDED,
+        ]
+    ).filter(
+        Q(expires_at__isnull=True) | Q(expires_at__gt=now)
+    ).exclude(
+        status=AnalysisJob.STATUS_RUNNING, started_at__lt=_lease_cutoff(now)
+    ).first()
+    if existing is not None:
+        return existing, False
+
+    job = AnalysisJob.objects.create(kind=kind, payload=payload, fingerprint=fingerprint)
+    return job, True
+
+
+def _lease_cutoff(now):
+    """Running jobs started before this have outlived their lease."""
+    return now - timedelta(seconds=get_config()['RUNNING_TIMEOUT_SECONDS'])
+
+
+def fail_stale_jobs() -> int:
+    """
+    Fail running jobs whose lease has run out. Returns the number failed.
+
+    Their worker most likely died with them, so they would otherwise stay
+    running forever. They get a TTL like any failed job, and clients
+    resubmitting get a fresh job.
+    """
+    now = timezone.now()
+    timeout = get_config()['RUNNING_TIMEOUT_SECONDS']
+    stale = AnalysisJob.objects.filter(
+        status=AnalysisJob.STATUS_RUNNING, started_at__lt=_lease_cutoff(now)
+    ).update(
+        status=AnalysisJob.STATUS_FAILED,
+        error=f'Job did not finish within {timeout} seconds',
+        finished_at=now,
+        expires_at=now + timedelta(seconds=get_config()['RESULT_TTL_SECONDS'])
+    )
+    if stale:
+        logger.warning('Failed %s analysis job(s) that outlived their lease', stale)
+    return stale
+
+
+def is_expired(job: AnalysisJob) -> bool:
+    """Check whether a finished job's result has expired."""
+    return job.expires_at is not None and job.expires_at <= timezone.now()
+
+
+def _run_analyze(payload: Dict[str, Any], report: ProgressCallback) -> Dict[str, Any]:
+    """Analyze one task list with a single strategy."""
+    report(0.1)
+    return PriorityScorer.analyze_and_sort_tasks(
+        payload['tasks'], strategy=payload.get('strategy', 'smart_balance'), backend=payload.get('backend')
+    )
+
+
+def _run_sweep(payload: Dict[str, Any], report: ProgressCallback) -> Dict[str, Any]:
+    """Analyze one task list with every requested strategy."""
+    strategies = payload.get('strategies') or list(PriorityScorer.STRATEGY_WEIGHTS)
+    results = {}
+    for i, strategy in enumerate(strategies):
+        # Scoring fills in defaults on the dicts, so give each pass its own copy
+        tasks = [dict(task) for task in payload['tasks']]
+        results[strategy] = PriorityScorer.analyze_and_sort_tasks(tasks, strategy=strategy, backend=payload.get('backend'))
+        report((i + 1) / len(strategies))
+    return {'strategies': results}
+
+
+JOB_RUNNERS = {
+    AnalysisJob.KIND_ANALYZE: _run_analyze,
+    AnalysisJob.KIND_SWEEP: _run_sweep,
+}
+
+
+def claim_next_job() -> Optional[AnalysisJob]:
+    """
+    Atomically move the oldest queued job to running.
+
+    The conditional update makes claiming safe when several worker
+    processes or hosts poll the same table.
+    """
+    candidates = AnalysisJob.objects.filter(
+        status=AnalysisJob.STATUS_QUEUED
+    ).order_by('created_at').values_list('id', flat=True)[:5]
+
+    for job_id in candidates:
+        claimed = AnalysisJob.objects.filter(
+            id=job_id, status=AnalysisJob.STATUS_QUEUED
+        ).update(status=AnalysisJob.STATUS_RUNNING, started_at=timezone.now())
+        if claimed:
+            return AnalysisJob.objects.get(id=job_id)
+    return None
+
+
+def execute_job(job_id) -> None:
+    """
+    Run a claimed job to completion and store its result or error.
+
+    This is the function executed inside the worker pool processes. The
+    result is only stored while the job is still running, so a job that
+    was failed for outliving its lease stays failed.
+    """
+    close_old_connections()
+    job = AnalysisJob.objects.get(id=job_id)
+
+    def report(progress: float) -> None:
+        AnalysisJob.objects.filter(id=job_id).update(progress=round(progress, 3))
+
+    ttl = timedelta(seconds=get_config()['RESULT_TTL_SECONDS'])
+    running = AnalysisJob.objects.filter(id=job_id, status=AnalysisJob.STATUS_RUNNING)
+    try:
+        result = JOB_RUNNERS[job.kind](job.payload, report)
+    except Exception as e:
+        logger.exception('Analysis job %s failed', job_id)
+        running.update(
+            status=AnalysisJob.STATUS_FAILED,
+            error=str(e),
+            finished_at=timezone.now(),
+            expires_at=timezone.now() + ttl
+        )
+        return
+
+    finished_at = timezone.now()
+    stored = running.update(
+        result=result,
+        status=AnalysisJob.STATUS_SUCCEEDED,
+        progress=1.0,
+        finished_at=finished_at,
+        expires_at=finished_at + ttl
+    )
+    if not stored:
+        logger.warning('Analysis job %s finished after its lease ran out; result discarded', job_id)
+
+
+def purge_expired_jobs() -> int:
+    """Delete jobs whose results have expired. Returns the number deleted."""
+    deleted, _ = AnalysisJob.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
+
+
+def run_housekeeping() -> None:
+    """
+    Fail jobs past their lease, purge expired jobs and record any
+    workspace's missing score history for today.
+    """
+    fail_stale_jobs()
+    purge_expired_jobs()
+    try:
+        history.record_pending()
+    except Exception:
+        logger.exception('Could not record score history')
+
+
+def _init_pool_process() -> None:
+    """Give each pool process its own database connections."""
+    import django
+    django.setup()
+    connections.close_all()
+
+
+class JobWorkerPool:
+    """
+    Polls the job table and runs claimed jobs in a local process pool.
+    """
+
+    def __init__(self, workers: Optional[int] = None, poll_interval: Optional[float] = None):
+        config = get_config()
+        self.workers = workers or config['WORKERS']
+        self.poll_interval = poll_interval or config['POLL_INTERVAL_SECONDS']
+        self._futures = set()
+
+    def run(self, max_jobs: Optional[int] = None) -> int:
+        """
+        Dispatch jobs until interrupted, or until ``max_jobs`` have finished.
+
+        Returns the number of jobs dispatched.
+        """
+        dispatched = 0
+        last_housekeeping = None
+        # Forked children must not share the parent's database connections
+        connections.close_all()
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_pool_process) as pool:
+            while max_jobs is None or dispatched < max_jobs:
+                self._futures = {f for f in self._futures if not f.done()}
+
+                if last_housekeeping is None or time.monotonic() - last_housekeeping > 60:
+                    run_housekeeping()
+                    last_housekeeping = time.monotonic()
+
+                job = None
+                if len(self._futures) < self.workers:
+                    job = claim_next_job()
+
+                if job is None:
+                    time.sleep(self.poll_interval)
+                    continue
+
+                connections.close_all()
+                self._futures.add(pool.submit(execute_job, job.id))
+                dispatched += 1
+
+            for future in self._futures:
+                future.result()
+
+        return dispatched
@@ -0,0 +1,55 @@
+"""
+Check scoring backends against the reference and benchmark them.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import conformance
+from tasks.backends import backend_names
+
+
+class Command(BaseCommand):
+    help = (
+        'Run every scoring backend on edge-case and random task sets, fail if '
+        'any result differs from the reference backend, then benchmark them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backend', action='append', choices=backend_names(),
+                            help='Backend to check (repeatable, defaults to all)')
+        parser.add_argument('--seeds', type=int, default=25, help='Number of random seeds')
+        parser.add_argument('--sizes', type=int, nargs='+', default=[0, 1, 2, 5, 20, 100],
+                            help='Random task set sizes to check')
+        parser.add_argument('--benchmark-sizes', type=int, nargs='*', default=[100, 1000, 3000],
+                            help='Task counts to benchmark (none to skip)')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per benchmark size')
+
+    def handle(self, *args, **options):
+        names = options['backend'] or backend_names()
+        report = conformance.check_backends(names, seeds=range(options['seeds']), sizes=options['sizes'])
+        self.stdout.write(f"Checked {report['cases']} cases")
+
+        failed = False
+        for name, entry in report['backends'].items():
+            status = 'reference' if name == 'reference' else (
+                f"{len(entry['mismatches'])} mismatches" if entry['mismatches'] else 'OK'
+            )
+            self.stdout.write(f"  {name:<12} {entry['seconds'] * 1000:>10.1f} ms  {status}")
+            for mismatch in entry['mismatches'][:20]:
+                self.stdout.write(f'      {mismatch}')
+            failed = failed or bool(entry['mismatches'])
+
+        if options['benchmark_sizes']:
+            timings = conformance.benchmark(
+                ['reference'] + [name for name in names if name != 'reference'],
+                sizes=options['benchmark_sizes'],
+                repeat=options['repeat']
+            )
+            self.stdout.write('')
+            self.stdout.write('Median analyze time (ms):')
+            self.stdout.write('  ' + f"{'tasks':<12}" + ''.join(f'{name:>12}' for name in timings))
+            for size in options['benchmark_sizes']:
+                self.stdout.write('  ' + f'{size:<12}' + ''.join(f'{timings[name][size]:>12.2f}' for name in timings))
+
+        if failed:
+            raise CommandError('Some backends do not match the reference backend')
+        self.stdout.write(self.style.SUCCESS('All backends match the reference'))
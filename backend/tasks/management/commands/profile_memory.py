@@ -0,0 +1,73 @@
+"""
+Profile the memory use of analyzing a task file, stage by stage.
+"""
+import gzip
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+
+from tasks import memprofile
+from tasks.backends import backend_names
+from tasks.serializers import STRATEGY_CHOICES
+
+
+def _mib(value: int) -> str:
+    return f'{value / (1024 * 1024):.2f} MiB'
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the analyze pipeline on a request body file under tracemalloc and '
+        'report peak and net allocation per stage and the top allocation sites.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Analyze request body or bare task list (.json or .json.gz)')
+        parser.add_argument('--strategy', choices=STRATEGY_CHOICES, help='Override the strategy in the file')
+        parser.add_argument('--backend', choices=backend_names(), help='Override the scoring backend')
+        parser.add_argument('--top', type=int, default=10,
+                            help='Allocation sites per stage (0 skips per-stage snapshots, much faster)')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'{path} does not exist')
+
+        def read_body():
+            body = path.read_bytes()
+            return gzip.decompress(body) if path.suffix == '.gz' else body
+
+        try:
+            _, report = memprofile.profile_analysis(
+                read_body,
+                strategy=options['strategy'],
+                backend=options['backend'],
+                top_sites=options['top']
+            )
+        except ParseError as e:
+            raise CommandError(f'{path}: {e}')
+        except serializers.ValidationError as e:
+            raise CommandError(f'{path}: invalid analyze request: {json.dumps(e.detail)[:500]}')
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"{report['task_count']} tasks, body {_mib(report['body_bytes'])}, "
+            f"response {_mib(report['response_bytes'])}"
+        )
+        self.stdout.write(f"Peak {_mib(report['peak_bytes'])}, retained at end {_mib(report['net_bytes'])}")
+        self.stdout.write('')
+        self.stdout.write(f"{'stage':<10}{'peak':>14}{'net':>14}{'time':>12}")
+        for entry in report['stages']:
+            self.stdout.write(
+                f"{entry['stage']:<10}{_mib(entry['peak_bytes']):>14}{_mib(entry['net_bytes']):>14}"
+                f"{entry['duration_ms']:>10.1f}ms"
+            )
+            for site in entry.get('top_sites', []):
+                self.stdout.write(f"    {_mib(site['net_bytes']):>12}  {site['blocks']:>8} blocks  {site['site']}")
@@ -0,0 +1,37 @@
+"""
+Record today's score history for every workspace.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import history
+from tasks.models import Workspace
+from tasks.snapshot import get_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Build each workspace's backlog snapshot and record it as today's score "
+        'history. The job workers (run_job_workers) also record it; without them, '
+        'run this daily (e.g. from cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workspace', action='append',
+                            help='Workspace slug to record (repeatable, defaults to all)')
+
+    def handle(self, *args, **options):
+        if not history.get_config()['ENABLED']:
+            raise CommandError('Score history is disabled (SCORE_HISTORY["ENABLED"])')
+
+        workspaces = Workspace.objects.order_by('pk')
+        if options['workspace']:
+            workspaces = workspaces.filter(slug__in=options['workspace'])
+            missing = set(options['workspace']) - {w.slug for w in workspaces}
+            if missing:
+                raise CommandError(f'Unknown workspaces: {", ".join(sorted(missing))}')
+
+        for workspace in workspaces:
+            # A no-op for days already recorded
+            snapshot = get_snapshot(workspace.pk)
+            history.record_day(workspace.pk, snapshot)
+            self.stdout.write(f'{workspace.slug}: {len(snapshot)} open tasks on {snapshot.reference_date}')
@@ -0,0 +1,73 @@
+"""
+Replay captured analyze/suggest requests against the current scorer.
+"""
+import json
+import statistics
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import capture
+from tasks.backends import backend_names
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-run requests recorded by the request capture layer with their '
+        'reference dates pinned, and report timing and ranking differences.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help='Capture file (defaults to REQUEST_CAPTURE PATH)')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per request (median is reported)')
+        parser.add_argument('--endpoint', choices=['analyze', 'suggest'], help='Only replay this endpoint')
+        parser.add_argument('--slowest', type=int, help='Only replay the N slowest captured requests')
+        parser.add_argument('--backend', choices=backend_names(),
+                            help='Scoring backend to replay with (defaults to the SCORING setting)')
+        parser.add_argument('--json', action='store_true', help='Print one JSON report per request')
+
+    def handle(self, *args, **options):
+        path = options['path'] or capture.capture_path()
+        try:
+            captures = [
+                c for c in capture.read_captures(path)
+                if not options['endpoint'] or c['endpoint'] == options['endpoint']
+            ]
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read {path}: {e}')
+
+        if options['slowest']:
+            captures = sorted(captures, key=lambda c: c['scoring_ms'], reverse=True)[:options['slowest']]
+        if not captures:
+            self.stdout.write('No captured requests to replay.')
+            return
+
+        reports = []
+        for record in captures:
+            report = capture.replay(record, repeat=options['repeat'], backend=options['backend'])
+            reports.append(report)
+            if options['json']:
+                self.stdout.write(json.dumps(report))
+                continue
+            line = (
+                f"{report['endpoint']:<8} {report['reference_date']} {report['strategy']:<16} "
+                f"{report['task_count']:>7} tasks  {report['captured_ms']:>10.2f} ms -> "
+                f"{report['replay_ms']:>10.2f} ms"
+            )
+            if report['ranking_changed']:
+                line += f"  RANKING CHANGED at rank {report['first_difference'] + 1}"
+            if report['score_changes']:
+                line += f"  {len(report['score_changes'])} scores changed"
+            self.stdout.write(line)
+
+        if options['json']:
+            return
+
+        ratios = [r['speedup'] for r in reports if r['speedup']]
+        changed = sum(1 for r in reports if r['ranking_changed'])
+        self.stdout.write('')
+        self.stdout.write(f'Replayed {len(reports)} requests')
+        if ratios:
+            self.stdout.write(f'Median speedup vs capture: {statistics.median(ratios):.2f}x')
+        self.stdout.write(f'Ranking changes: {changed}')
+        if changed:
+            self.stdout.write(self.style.WARNING('Some rankings differ from what was served.'))
@@ -0,0 +1,25 @@
+"""
+Run the local worker pool for asynchronous analysis jobs.
+"""
+from django.core.management.base import BaseCommand
+
+from tasks.jobs import JobWorkerPool
+
+
+class Command(BaseCommand):
+    help = 'Poll the analysis job table and run jobs in a local process pool.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, help='Number of worker processes')
+        parser.add_argument('--poll-interval', type=float, help='Seconds between polls when idle')
+        parser.add_argument('--max-jobs', type=int, help='Exit after dispatching this many jobs')
+
+    def handle(self, *args, **options):
+        pool = JobWorkerPool(workers=options['workers'], poll_interval=options['poll_interval'])
+        self.stdout.write(f'Starting {pool.workers} analysis job worker(s)')
+        try:
+            dispatched = pool.run(max_jobs=options['max_jobs'])
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping job workers')
+            return
+        self.stdout.write(self.style.SUCCESS(f'Dispatched {dispatched} job(s)'))
@@ -0,0 +1,64 @@
+"""
+Score a task stream in bounded memory and print the top-k tasks.
+"""
+import gzip
+import json
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from tasks.scoring import PriorityScorer
+from tasks.serializers import STRATEGY_CHOICES
+from tasks.streaming import DependentsSketch
+
+
+class Command(BaseCommand):
+    help = (
+        'Score a JSON Lines task file (one task per line, optionally gzipped) '
+        'in two streaming passes with bounded memory and print the top-k tasks.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Task file in JSON Lines format (.jsonl or .jsonl.gz)')
+        parser.add_argument('--top-k', type=int, default=10, help='Number of tasks to keep')
+        parser.add_argument('--strategy', choices=STRATEGY_CHOICES, default='smart_balance')
+        parser.add_argument('--date', type=date.fromisoformat, help='Score as of this date (YYYY-MM-DD)')
+        parser.add_argument('--epsilon', type=float, default=0.001,
+                            help='Sketch error as a fraction of total dependency edges')
+        parser.add_argument('--delta', type=float, default=0.01,
+                            help='Probability an estimate exceeds the error bound')
+        parser.add_argument('--heavy-hitters', type=int, default=100,
+                            help='Number of most depended-on tasks to track')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        opener = gzip.open if path.endswith('.gz') else open
+
+        def read_tasks():
+            with opener(path, 'rt', encoding='utf-8') as f:
+                for line_number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError as e:
+                        raise CommandError(f'{path}:{line_number}: invalid JSON ({e})')
+
+        try:
+            sketch = DependentsSketch(options['epsilon'], options['delta'], options['heavy_hitters'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        try:
+            result = PriorityScorer.top_k_stream(
+                read_tasks,
+                k=options['top_k'],
+                strategy=options['strategy'],
+                current_date=options['date'],
+                sketch=sketch
+            )
+        except OSError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(json.dumps(result, indent=2, cls=DjangoJSONEncoder))
@@ -0,0 +1,267 @@
+"""
+Opt-in tracemalloc profiling of the analyze pipeline.
+
+Large uploads can push workers into the OOM killer, and it is not obvious
+whether the raw body, the parsed JSON, the serializer, the task-dict
+copies or the rendered response dominate. The profiler runs the pipeline
+in named stages and reports for each one:
+- net bytes still allocated when the stage ends
+- peak bytes above the stage's starting point
+- the top allocation sites (file:line) for the stage's retained memory
+
+Profiles are available on POST /api/tasks/analyze/ with an
+``X-Memory-Profile: 1`` header (or ``?profile=memory``) when
+MEMORY_PROFILING['ENABLED'] is set, and from
+``python manage.py profile_memory <file>``.
+
+tracemalloc is process-wide: with threaded workers, allocations made by
+other requests during a profile are counted too. Tracing also slows
+allocation down noticeably, and taking per-stage snapshots costs time
+proportional to the number of live objects.
+"""
+import io
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import date
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from .admission import task_count
+from .scoring import PriorityScorer
+from .serializers import TaskAnalyzeSerializer, to_task_dicts
+
+DEFAULT_CONFIG = {
+    'ENABLED': False,
+    'TOP_SITES': 5,        # Allocation sites reported per stage (0 skips snapshots)
+    'TRACE_FRAMES': 1,     # Stack frames stored per allocation
+}
+
+_profile_lock = threading.Lock()
+# Sites hidden from reports: the profiler's own bookkeeping and imports
+_EXCLUDED_FILES = {
+    tracemalloc.__file__, __file__,
+    '<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>', '<unknown>',
+}
+
+
+class ProfilerBusy(Exception):
+    """
+    Raised when another memory profile is already running in this process.
+    """
+
+
+def get_config() -> Dict[str, Any]:
+    """Return memory profiling settings merged over the defaults."""
+    return {**DEFAULT_CONFIG, **getattr(settings, 'MEMORY_PROFILING', {})}
+
+
+def requested(request) -> bool:
+    """Check whether a request asks for a memory profile and profiling is enabled."""
+    if not get_config()['ENABLED']:
+        return False
+    header = request.META.get('HTTP_X_MEMORY_PROFILE', '').lower()
+    return header in ('1', 'true', 'yes') or request.GET.get('profile') == 'memory'
+
+
+def _site(frame: tracemalloc.Frame) -> str:
+    """Shorten a frame's filename relative to the longest matching sys.path entry."""
+    filename = frame.filename
+    for prefix in sorted((p for p in sys.path if p), key=len, reverse=True):
+        if filename.startswith(prefix + os.sep):
+            filename = filename[len(prefix) + 1:]
+            break
+    return f'{filename}:{frame.lineno}'
+
+
+class MemoryProfiler:
+    """
+    Measure allocations per named stage with tracemalloc.
+
+    Usage::
+
+        with MemoryProfiler() as profiler:
+            with profiler.stage('parse'):
+                ...
+        profiler.report()
+    """
+
+    def __init__(self, top_sites: int = 5, frames: int = 1):
+        self.top_sites = top_sites
+        self.frames = frames
+        self.stages: List[Dict[str, Any]] = []
+        self._started_tracing = False
+        self._previous: Dict[tracemalloc.Frame, Tuple[int, int]] = {}
+
+    def __enter__(self) -> 'MemoryProfiler':
+        if not _profile_lock.acquire(blocking=False):
+            raise ProfilerBusy('Another memory profile is running')
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        if self.top_sites:
+            self._previous = self._sizes_by_line()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._previous = {}
+        if self._started_tracing:
+            tracemalloc.stop()
+        _profile_lock.release()
+
+    @staticmethod
+    def _sizes_by_line() -> Dict[tracemalloc.Frame, Tuple[int, int]]:
+        """Allocated (bytes, blocks) per source line, from a fresh snapshot."""
+        return {
+            stat.traceback[0]: (stat.size, stat.count)
+            for stat in tracemalloc.take_snapshot().statistics('lineno')
+        }
+
+    def _top_sites(self, sizes: Dict[tracemalloc.Frame, Tuple[int, int]]) -> List[Dict[str, Any]]:
+        # Diffing grouped totals (and hiding sites afterwards) is far cheaper
+        # than Snapshot.compare_to or filter_traces on every block
+        growth = []
+        for frame, (size, count) in sizes.items():
+            previous_size, previous_count = self._previous.get(frame, (0, 0))
+            if size > previous_size and frame.filename not in _EXCLUDED_FILES:
+                growth.append((size - previous_size, count - previous_count, frame))
+        growth.sort(key=lambda item: item[0], reverse=True)
+        return [
+            {'site': _site(frame), 'net_bytes': size, 'blocks': count}
+            for size, count, frame in growth[:self.top_sites]
+        ]
+
+    @contextmanager
+    def stage(self, name: str):
+        """Measure the allocations made inside the block as one stage."""
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            # Read the counters before snapshotting, which allocates itself
+            current, peak = tracemalloc.get_traced_memory()
+            entry = {
+                'stage': name,
+                'net_bytes': current - before,
+                'peak_bytes': peak - before,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+            }
+            if self.top_sites:
+                sizes = self._sizes_by_line()
+                entry['top_sites'] = self._top_sites(sizes)
+                self._previous = sizes
+            self.stages.append(entry)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Totals and per-stage figures.
+
+        ``peak_bytes`` is the pipeline's high-water mark above its starting
+        point: memory retained by earlier stages plus the highest stage peak
+        on top of it.
+        """
+        retained = 0
+        peak = 0
+        for entry in self.stages:
+            peak = max(peak, retained + entry['peak_bytes'])
+            retained += entry['net_bytes']
+        return {
+            'peak_bytes': peak,
+            'net_bytes': retained,
+            'stages': self.stages,
+        }
+
+
+def header_value(report: Dict[str, Any]) -> str:
+    """Compact summary for the X-Memory-Profile response header (KiB)."""
+    stages = ','.join(
+        f"{entry['stage']}:{entry['peak_bytes'] // 1024}/{entry['net_bytes'] // 1024}"
+        for entry in report['stages']
+    )
+    return f"peak_kib={report['peak_bytes'] // 1024}; net_kib={report['net_bytes'] // 1024}; stages={stages}"
+
+
+def profile_analysis(
+    read_body: Callable[[], bytes],
+    strategy: Optional[str] = None,
+    backend: Optional[str] = None,
+    top_sites: Optional[int] = None,
+    admit: Callable[[int], ContextManager] = lambda task_count: nullcontext(),
+    render: bool = True
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Run the analyze pipeline stage by stage under the profiler.
+
+    Args:
+        read_body: Returns the raw JSON request body
+        strategy: Overrides the strategy in the body
+        backend: Overrides the scoring backend in the body
+        top_sites: Allocation sites per stage (defaults to the setting)
+        admit: Context manager factory wrapped around validation,
+            conversion and scoring, given the task count of the parsed but
+            unvalidated body (e.g. admission.admit)
+        render: Render the result to JSON as a final stage; callers that
+            render the result themselves pass False
+
+    Returns:
+        The analysis result and the memory report
+
+    Raises:
+        ParseError: If the body is not valid JSON
+        serializers.ValidationError: If the body is not a valid analyze request
+        ProfilerBusy: If another profile is running in this process
+    """
+    config = get_config()
+    if top_sites is None:
+        top_sites = config['TOP_SITES']
+
+    with MemoryProfiler(top_sites, config['TRACE_FRAMES']) as profiler:
+        with profiler.stage('body'):
+            body = read_body()
+
+        with profiler.stage('parse'):
+            data = JSONParser().parse(io.BytesIO(body))
+            if isinstance(data, list):
+                data = {'tasks': data}
+            if strategy:
+                data['strategy'] = strategy
+            if backend:
+                data['backend'] = backend
+
+        # Admitted before validation, which is itself heavy for large lists
+        with admit(task_count(data)):
+            with profiler.stage('validate'):
+                serializer = TaskAnalyzeSerializer(data=data)
+                if not serializer.is_valid():
+                    raise serializers.ValidationError(serializer.errors)
+
+            with profiler.stage('convert'):
+                task_dicts = to_task_dicts(serializer.validated_data['tasks'])
+
+            with profiler.stage('score'):
+                result = PriorityScorer.analyze_and_sort_tasks(
+                    task_dicts,
+                    strategy=serializer.validated_data.get('strategy', 'smart_balance'),
+                    current_date=date.today(),
+                    backend=serializer.validated_data.get('backend')
+                )
+
+        if render:
+            with profiler.stage('render'):
+                rendered = JSONRenderer().render(result)
+
+    report = profiler.report()
+    report['body_bytes'] = len(body)
+    if render:
+        report['response_bytes'] = len(rendered)
+    report['task_count'] = len(task_dicts)
+    return result, report
@@ -0,0 +1,85 @@
+"""
+Move Task.dependencies from a JSON list of IDs to the TaskDependency edge table.
+"""
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_json_to_edges(apps, schema_editor):
+    """Create one edge per valid ID in each task's legacy JSON list."""
+    Task = apps.get_model('tasks', 'Task')
+    TaskDependency = apps.get_model('tasks', 'TaskDependency')
+
+    existing_ids = set(Task.objects.values_list('id', flat=True))
+    edges = []
+    for task_id, legacy in Task.objects.values_list('id', 'legacy_dependencies').iterator():
+        if not isinstance(legacy, list):
+            continue
+        seen = set()
+        for raw in legacy:
+            try:
+                depends_on_id = int(raw)
+            except (TypeError, ValueError):
+                continue  # Titles or other free-form IDs cannot be resolved
+            if depends_on_id == task_id or depends_on_id not in existing_ids or depends_on_id in seen:
+                continue
+            seen.add(depends_on_id)
+            edges.append(TaskDependency(task_id=task_id, depends_on_id=depends_on_id))
+
+    TaskDependency.objects.bulk_create(edges, batch_size=1000)
+
+
+def copy_edges_to_json(apps, schema_editor):
+    """Rebuild the legacy JSON lists from the edge table."""
+    Task = apps.get_model('tasks', 'Task')
+    TaskDependency = apps.get_model('tasks', 'TaskDependency')
+
+    legacy = {}
+    for task_id, depends_on_id in TaskDependency.objects.values_list('task_id', 'depends_on_id'):
+        legacy.setdefault(task_id, []).append(depends_on_id)
+    for task_id, depends_on_ids in legacy.items():
+        Task.objects.filter(id=task_id).update(legacy_dependencies=depends_on_ids)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_analysisjob'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='task',
+            old_name='dependencies',
+            new_name='legacy_dependencies',
+        ),
+        migrations.CreateModel(
+            name='TaskDependency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depends_on', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dependent_edges', to='tasks.task')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dependency_edges', to='tasks.task')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['depends_on', 'task'], name='task_dependency_reverse_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='taskdependency',
+            constraint=models.UniqueConstraint(fields=('task', 'depends_on'), name='unique_task_dependency'),
+        ),
+        migrations.AddConstraint(
+            model_name='taskdependency',
+            constraint=models.CheckConstraint(check=models.Q(('task', models.F('depends_on')), _negated=True), name='task_dependency_not_self'),
+        ),
+        migrations.RunPython(copy_json_to_edges, copy_edges_to_json),
+        migrations.RemoveField(
+            model_name='task',
+            name='legacy_dependencies',
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='dependencies',
+            field=models.ManyToManyField(blank=True, help_text='Tasks that this task depends on', related_name='dependents', through='tasks.TaskDependency', to='tasks.task'),
+        ),
+    ]
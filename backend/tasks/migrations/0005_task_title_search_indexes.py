@@ -0,0 +1,47 @@
+"""
+Search indexes on task titles, PostgreSQL only.
+
+- A GIN full-text index matching SearchVector('title', config='simple'),
+  used by the search endpoint (including ``:*`` prefix queries)
+- A trigram index so the remaining ``icontains`` lookups on titles
+  avoid a sequential scan
+
+Other databases use the in-process index in tasks/search.py, so this is
+a no-op for them.
+"""
+from django.db import migrations
+
+FTS_INDEX = 'tasks_task_title_fts_idx'
+TRGM_INDEX = 'tasks_task_title_trgm_idx'
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {FTS_INDEX} ON tasks_task "
+        f"USING gin (to_tsvector('simple'::regconfig, COALESCE(title, '')))"
+    )
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {TRGM_INDEX} ON tasks_task '
+        f'USING gin (UPPER(title::text) gin_trgm_ops)'
+    )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {FTS_INDEX}')
+    schema_editor.execute(f'DROP INDEX IF EXISTS {TRGM_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
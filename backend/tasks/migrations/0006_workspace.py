@@ -0,0 +1,132 @@
+"""
+Partition tasks by workspace.
+
+- Creates the default workspace (pk 1) and assigns every existing task to it
+- Adds composite (workspace, status) and (workspace, updated_at) indexes
+  for per-workspace backlog loads and change detection
+- On PostgreSQL, adds constraint triggers rejecting dependency edges whose
+  tasks are in different workspaces, including edges that would cross
+  after a task moves. Other databases rely on the model-level checks in
+  TaskDependency.save() and the m2m_changed handler in signals.py.
+"""
+from django.core.management.color import no_style
+from django.db import migrations, models
+import django.db.models.deletion
+import tasks.models
+
+DEFAULT_WORKSPACE_ID = 1
+
+CREATE_TRIGGERS = """
+CREATE OR REPLACE FUNCTION tasks_check_dependency_workspace() RETURNS trigger AS $$
+BEGIN
+    IF (SELECT workspace_id FROM tasks_task WHERE id = NEW.task_id)
+        IS DISTINCT FROM (SELECT workspace_id FROM tasks_task WHERE id = NEW.depends_on_id) THEN
+        RAISE EXCEPTION 'Task dependency % -> % crosses workspaces', NEW.task_id, NEW.depends_on_id
+            USING ERRCODE = 'integrity_constraint_violation';
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE CONSTRAINT TRIGGER tasks_dependency_same_workspace
+    AFTER INSERT OR UPDATE ON tasks_taskdependency
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE PROCEDURE tasks_check_dependency_workspace();
+
+CREATE OR REPLACE FUNCTION tasks_check_task_workspace() RETURNS trigger AS $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM tasks_taskdependency edge
+        JOIN tasks_task other ON other.id = edge.depends_on_id
+        WHERE edge.task_id = NEW.id AND other.workspace_id <> NEW.workspace_id
+        UNION ALL
+        SELECT 1 FROM tasks_taskdependency edge
+        JOIN tasks_task other ON other.id = edge.task_id
+        WHERE edge.depends_on_id = NEW.id AND other.workspace_id <> NEW.workspace_id
+    ) THEN
+        RAISE EXCEPTION 'Task % has dependencies in another workspace', NEW.id
+            USING ERRCODE = 'integrity_constraint_violation';
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Deferred, so connected tasks can be moved together within a transaction
+CREATE CONSTRAINT TRIGGER tasks_task_same_workspace
+    AFTER UPDATE OF workspace_id ON tasks_task
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW
+    WHEN (OLD.workspace_id IS DISTINCT FROM NEW.workspace_id)
+    EXECUTE PROCEDURE tasks_check_task_workspace();
+"""
+
+DROP_TRIGGERS = """
+DROP TRIGGER IF EXISTS tasks_task_same_workspace ON tasks_task;
+DROP FUNCTION IF EXISTS tasks_check_task_workspace();
+DROP TRIGGER IF EXISTS tasks_dependency_same_workspace ON tasks_taskdependency;
+DROP FUNCTION IF EXISTS tasks_check_dependency_workspace();
+"""
+
+
+def create_default_workspace(apps, schema_editor):
+    Workspace = apps.get_model('tasks', 'Workspace')
+    Workspace.objects.get_or_create(pk=DEFAULT_WORKSPACE_ID, defaults={'name': 'Default', 'slug': 'default'})
+    # The explicit primary key does not advance the ID sequence
+    for sql in schema_editor.connection.ops.sequence_reset_sql(no_style(), [Workspace]):
+        schema_editor.execute(sql)
+
+
+def create_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(CREATE_TRIGGERS)
+
+
+def drop_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(DROP_TRIGGERS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_title_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Workspace',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.SlugField(unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.RunPython(create_default_workspace, migrations.RunPython.noop),
+        # Existing tasks land in the default workspace
+        migrations.AddField(
+            model_name='task',
+            name='workspace',
+            field=models.ForeignKey(db_index=False, default=DEFAULT_WORKSPACE_ID, on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to='tasks.workspace'),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='workspace',
+            field=models.ForeignKey(db_index=False, default=tasks.models.default_workspace_id, on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to='tasks.workspace'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['workspace', 'status'], name='task_workspace_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['workspace', 'updated_at'], name='task_workspace_updated_idx'),
+        ),
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
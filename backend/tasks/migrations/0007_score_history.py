@@ -0,0 +1,60 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_workspace'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBacklogSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('strategy', models.CharField(max_length=50)),
+                ('open_tasks', models.PositiveIntegerField()),
+                ('overdue', models.PositiveIntegerField()),
+                ('due_today', models.PositiveIntegerField()),
+                ('due_this_week', models.PositiveIntegerField(help_text='Due in 1 to 7 days')),
+                ('due_later', models.PositiveIntegerField()),
+                ('no_due_date', models.PositiveIntegerField()),
+                ('mean_score', models.FloatField(null=True)),
+                ('median_score', models.FloatField(null=True)),
+                ('p90_score', models.FloatField(null=True)),
+                ('recorded_at', models.DateTimeField(auto_now_add=True)),
+                ('workspace', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='daily_summaries', to='tasks.workspace')),
+            ],
+            options={
+                'verbose_name_plural': 'daily backlog summaries',
+                'ordering': ['day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ScoreSample',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('task_id', models.BigIntegerField()),
+                ('rank', models.PositiveIntegerField(help_text='1-based rank in the backlog that day')),
+                ('score', models.FloatField()),
+                ('due_date', models.DateField(blank=True, null=True)),
+                ('workspace', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='score_samples', to='tasks.workspace')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['workspace', 'task_id', 'day'], name='score_sample_task_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='scoresample',
+            constraint=models.UniqueConstraint(fields=('workspace', 'day', 'task_id'), name='unique_score_sample'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailybacklogsummary',
+            constraint=models.UniqueConstraint(fields=('workspace', 'day'), name='unique_backlog_day'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_score_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workspace',
+            name='revision',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+    ]
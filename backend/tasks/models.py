@@ -1,14 +1,78 @@
 """
-Task model for the Smart Task Analyzer.
+Models for the Smart Task Analyzer.
 """
-from django.db import models
+import uuid
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
+class Workspace(models.Model):
+    """
+    A team's partition of the backlog.
+    
+    Tasks, dependency edges, queues and score snapshots are all scoped to
+    one workspace, so one team's backlog size and write rate do not affect
+    another's. Tasks created without a workspace go to the default one.
+    
+    ``revision`` advances after every committed write to the workspace's
+    tasks or edges. Processes caching task state compare it to notice
+    changes, then reload tasks whose ``updated_at`` is within
+    CHANGE_SCAN_OVERLAP of their previous scan: a transaction stamps
+    ``updated_at`` before it commits, so a watermark on ``updated_at``
+    alone would miss rows that commit after a later-stamped row.
+    """
+    DEFAULT_ID = 1
+    CHANGE_SCAN_OVERLAP = timedelta(seconds=60)  # Longer than any task write transaction
+    
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=50, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    revision = models.BigIntegerField(default=0, editable=False)
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+    
+    @classmethod
+    def record_change(cls, workspace_id):
+        """Advance a workspace's revision; run once a write to its tasks has committed."""
+        cls.objects.filter(pk=workspace_id).update(revision=models.F('revision') + 1)
+
+
+def default_workspace_id():
+    """Primary key of the default workspace, creating it if it is missing."""
+    workspace, _ = Workspace.objects.get_or_create(
+        pk=Workspace.DEFAULT_ID, defaults={'name': 'Default', 'slug': 'default'}
+    )
+    return workspace.pk
+
+
 class Task(models.Model):
     """
     Represents a task with properties for priority calculation.
     """
+    STATUS_PENDING = 'pending'
+    STATUS_IN_PROGRESS = 'in_progress'
+    STATUS_DONE = 'done'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_IN_PROGRESS, 'In progress'),
+        (STATUS_DONE, 'Done'),
+    ]
+    
+    workspace = models.ForeignKey(
+        Workspace,
+        on_delete=models.CASCADE,
+        related_name='tasks',
+        default=default_workspace_id,
+        db_index=False,  # Covered by the composite indexes below
+    )
     title = models.CharField(max_length=200)
     due_date = models.DateField(null=True, blank=True)
     estimated_hours = models.FloatField(
@@ -19,15 +83,239 @@ class Task(models.Model):
         validators=[MinValueValidator(1), MaxValueValidator(10)],
         help_text="Importance rating from 1-10"
     )
-    dependencies = models.JSONField(
-        default=list,
-        help_text="List of task IDs that this task depends on"
+    dependencies = models.ManyToManyField(
+        'self',
+        through='TaskDependency',
+        symmetrical=False,
+        related_name='dependents',
+        blank=True,
+        help_text="Tasks that this task depends on"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        db_index=True
     )
+    completed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Open-backlog loads and per-workspace change detection
+            models.Index(fields=['workspace', 'status'], name='task_workspace_status_idx'),
+            models.Index(fields=['workspace', 'updated_at'], name='task_workspace_updated_idx'),
+        ]
     
     def __str__(self):
         return self.title
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets signal handlers invalidate the old workspace when a task moves
+        instance._loaded_workspace_id = instance.__dict__.get('workspace_id')
+        return instance
+    
+    def save(self, *args, **kwargs):
+        # Enforced on every save, not just in clean(): a moved task's edges
+        # would otherwise cross workspaces, like TaskDependency.save() prevents
+        if self.pk is not None and getattr(self, '_loaded_workspace_id', None) != self.workspace_id:
+            self.check_workspace_move()
+        super().save(*args, **kwargs)
+        self._loaded_workspace_id = self.workspace_id
+    
+    def clean(self):
+        """Reject moving a task with dependency edges to another workspace."""
+        self.check_workspace_move()
+    
+    def check_workspace_move(self):
+        """Raise ValidationError if the task has edges to tasks outside its workspace."""
+        if self.pk is None or self.workspace_id is None:
+            return
+        crossing = TaskDependency.objects.filter(
+            models.Q(task=self) & ~models.Q(depends_on__workspace=self.workspace_id) |
+            models.Q(depends_on=self) & ~models.Q(task__workspace=self.workspace_id)
+        )
+        if crossing.exists():
+            raise ValidationError(
+                'Remove this task\'s dependencies before moving it to another workspace.'
+            )
+
+
+class TaskDependency(models.Model):
+    """
+    A dependency edge: ``task`` cannot start until ``depends_on`` is done.
+    
+    Indexed in both directions so both "what does X depend on" and
+    "what depends on X" are index lookups.
+    """
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='dependency_edges')
+    depends_on = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='dependent_edges')
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'depends_on'], name='unique_task_dependency'),
+            models.CheckConstraint(
+                check=~models.Q(task=models.F('depends_on')),
+                name='task_dependency_not_self'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['depends_on', 'task'], name='task_dependency_reverse_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.task_id} depends on {self.depends_on_id}'
+    
+    def clean(self):
+        """Reject self-dependencies, cross-workspace edges and edges that would close a cycle."""
+        if self.task_id is None or self.depends_on_id is None:
+            return
+        if self.task_id == self.depends_on_id:
+            raise ValidationError('A task cannot depend on itself.')
+        self.check_same_workspace()
+        self.check_acyclic()
+    
+    def check_acyclic(self):
+        """Raise ValidationError if the edge would close a cycle, locking the workspace's graph."""
+        from .graph import check_acyclic, lock_workspace_graph
+        
+        lock_workspace_graph(self.task.workspace_id)
+        check_acyclic(self.task_id, self.depends_on_id)
+    
+    def check_same_workspace(self):
+        """Raise ValidationError if the edge's tasks are in different workspaces."""
+        if self.task.workspace_id != self.depends_on.workspace_id:
+            raise ValidationError('A task can only depend on tasks in the same workspace.')
+    
+    def save(self, *args, **kwargs):
+        # Enforced on every save, not just in clean(): edges crossing
+        # workspaces would leak one team's tasks into another's scoring,
+        # and cycles would leave tasks that can never start. The
+        # transaction holds the graph lock until the edge is written.
+        with transaction.atomic():
+            self.check_same_workspace()
+            self.check_acyclic()
+            super().save(*args, **kwargs)
+
+
+class AnalysisJob(models.Model):
+    """
+    An analysis submitted for asynchronous execution by the job workers.
+    """
+    KIND_ANALYZE = 'analyze'
+    KIND_SWEEP = 'sweep'
+    KIND_CHOICES = [
+        (KIND_ANALYZE, 'Analyze'),
+        (KIND_SWEEP, 'Multi-strategy sweep'),
+    ]
+    
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default=KIND_ANALYZE)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    fingerprint = models.CharField(
+        max_length=64,
+        db_index=True,
+        help_text="Hash of kind and payload, used to deduplicate submissions"
+    )
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True, default='')
+    progress = models.FloatField(default=0.0, help_text="Completion from 0.0 to 1.0")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f'{self.kind} job {self.id} ({self.status})'
+
 
+class ScoreSample(models.Model):
+    """
+    One open task's rank and score on one day; append-only.
+    
+    Written in bulk with the day's DailyBacklogSummary. ``task_id`` is a
+    plain column rather than a foreign key, so history outlives deleted
+    tasks and inserts need no constraint checks.
+    """
+    workspace = models.ForeignKey(
+        Workspace,
+        on_delete=models.CASCADE,
+        related_name='score_samples',
+        db_index=False,  # Covered by the unique constraint below
+    )
+    day = models.DateField()
+    task_id = models.BigIntegerField()
+    rank = models.PositiveIntegerField(help_text="1-based rank in the backlog that day")
+    score = models.FloatField()
+    due_date = models.DateField(null=True, blank=True)
+    
+    class Meta:
+        constraints = [
+            # Also the index for a workspace's samples by day
+            models.UniqueConstraint(fields=['workspace', 'day', 'task_id'], name='unique_score_sample'),
+        ]
+        indexes = [
+            models.Index(fields=['workspace', 'task_id', 'day'], name='score_sample_task_idx'),
+        ]
+    
+    def __str__(self):
+        return f'Task {self.task_id} ranked {self.rank} on {self.day}'
+
+
+class DailyBacklogSummary(models.Model):
+    """
+    Aggregates of a workspace's open backlog on one day.
+    
+    Trend queries read one row per day instead of the day's samples.
+    Due-date bands are relative to ``day``; scores are for ``strategy``.
+    """
+    workspace = models.ForeignKey(
+        Workspace,
+        on_delete=models.CASCADE,
+        related_name='daily_summaries',
+        db_index=False,  # Covered by the unique constraint below
+    )
+    day = models.DateField()
+    strategy = models.CharField(max_length=50)
+    open_tasks = models.PositiveIntegerField()
+    overdue = models.PositiveIntegerField()
+    due_today = models.PositiveIntegerField()
+    due_this_week = models.PositiveIntegerField(help_text="Due in 1 to 7 days")
+    due_later = models.PositiveIntegerField()
+    no_due_date = models.PositiveIntegerField()
+    mean_score = models.FloatField(null=True)
+    median_score = models.FloatField(null=True)
+    p90_score = models.FloatField(null=True)
+    recorded_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['day']
+        verbose_name_plural = 'daily backlog summaries'
+        constraints = [
+            models.UniqueConstraint(fields=['workspace', 'day'], name='unique_backlog_day'),
+        ]
+    
+    def __str__(self):
+        return f'{self.workspace_id} on {self.day}'
@@ -0,0 +1,213 @@
+"""
+Server-push of re-ranked backlog suggestions.
+
+Clients subscribe to /api/tasks/suggest/stream/ (Server-Sent Events)
+instead of polling. Each worker process runs one watcher thread per
+(workspace, strategy, k) while it has subscribers:
+- It polls the workspace snapshot's generation (a shared-memory read, no
+  database query) and the date
+- Bursts of writes are coalesced: after a change is seen, it waits until
+  the generation has been quiet for COALESCE_SECONDS (at most
+  MAX_DELAY_SECONDS) before rescoring
+- It rescores once per change, through the shared snapshot, and wakes
+  every subscriber; subscribers only diff their last top-k against the
+  new one
+- States whose top-k is unchanged are not published
+- Writes to other workspaces are never seen, so they cause no rescores
+
+Streams are long-lived, so serve them from threaded workers (gunicorn
+``--worker-class gthread``, as configured in gunicorn.conf.py). Each
+stream ends after MAX_STREAM_SECONDS; EventSource clients reconnect
+automatically. A single-threaded server (``wsgi.multithread`` false) can
+serve nothing else while a stream is open, and a sync gunicorn worker is
+killed after its 30 s timeout, so there streams end after
+SINGLE_THREADED_MAX_STREAM_SECONDS instead.
+"""
+import logging
+import threading
+import time
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+
+from . import snapshot
+from .models import Workspace
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    'POLL_INTERVAL_SECONDS': 0.5,
+    'COALESCE_SECONDS': 0.5,     # Quiet period required after a write burst
+    'MAX_DELAY_SECONDS': 3.0,    # Publish at least this soon after the first change
+    'KEEPALIVE_SECONDS': 15.0,
+    'MAX_STREAM_SECONDS': 300.0,
+    'SINGLE_THREADED_MAX_STREAM_SECONDS': 20.0,  # Below gunicorn's sync worker timeout
+    'RETRY_MILLISECONDS': 3000,  # Client reconnect delay sent in the stream
+}
+
+
+def get_config() -> Dict[str, Any]:
+    """Return suggestion stream settings merged over the defaults."""
+    return {**DEFAULT_CONFIG, **getattr(settings, 'SUGGESTION_STREAM', {})}
+
+
+def rank_changes(previous: Optional[List[Dict[str, Any]]], current: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Describe how the top-k moved between two states.
+
+    Returns:
+        ``moved``: tasks whose rank changed or that are new to the top-k,
+        with ``previous_rank`` None for new entries, and ``dropped``: IDs
+        that left the top-k
+    """
+    old_ranks = {task['id']: rank for rank, task in enumerate(previous or [], 1)}
+    current_ids = {task['id'] for task in current}
+    return {
+        'moved': [
+            {'id': task['id'], 'rank': rank, 'previous_rank': old_ranks.get(task['id'])}
+            for rank, task in enumerate(current, 1)
+            if old_ranks.get(task['id']) != rank
+        ],
+        'dropped': [task_id for task_id in old_ranks if task_id not in current_ids],
+    }
+
+
+class SuggestionBroadcaster:
+    """
+    Shares one rescore per backlog change among all subscribers for a
+    (workspace, strategy, k) triple in this process.
+    """
+
+    def __init__(self, strategy: str = 'smart_balance', k: int = 3, workspace_id: int = Workspace.DEFAULT_ID):
+        self.workspace_id = workspace_id
+        self.strategy = strategy
+        self.k = k
+        self.rescores = 0
+        self._condition = threading.Condition()
+        self._subscribers = 0
+        self._state: Optional[Dict[str, Any]] = None
+        self._seen: Optional[Tuple[int, date]] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _compute(self) -> None:
+        """Rescore through the snapshot and publish if the top-k changed."""
+        backlog = snapshot.get_snapshot(self.workspace_id)
+        tasks = backlog.top(self.strategy, self.k)
+        self.rescores += 1
+
+        with self._condition:
+            # Record what the data reflects: a stale snapshot served during
+            # another worker's rebuild is picked up again on the next poll
+            self._seen = (backlog.generation, backlog.reference_date)
+            previous = self._state
+            key = [(task['id'], task['priority_score']) for task in tasks]
+            if previous is not None and previous['key'] == key and previous['reference_date'] == backlog.reference_date:
+                return
+            self._state = {
+                'sequence': (previous['sequence'] if previous else 0) + 1,
+                'key': key,
+                'tasks': tasks,
+                'reference_date': backlog.reference_date,
+                'snapshot_version': backlog.version,
+                'total_tasks': len(backlog),
+            }
+            self._condition.notify_all()
+
+    def _changed(self) -> bool:
+        return self._seen != (snapshot.current_generation(self.workspace_id), date.today())
+
+    def poll(self) -> bool:
+        """
+        Check for a change and, after coalescing, publish the new state.
+
+        Returns:
+            True if a rescore happened
+        """
+        if not self._changed():
+            return False
+
+        config = get_config()
+        first_seen = time.monotonic()
+        generation = snapshot.current_generation(self.workspace_id)
+        while time.monotonic() - first_seen < config['MAX_DELAY_SECONDS']:
+            time.sleep(config['COALESCE_SECONDS'])
+            latest = snapshot.current_generation(self.workspace_id)
+            if latest == generation:
+                break
+            generation = latest
+
+        self._compute()
+        return True
+
+    def _run(self) -> None:
+        try:
+            while True:
+                with self._condition:
+                    if not self._subscribers:
+                        self._thread = None
+                        return
+                try:
+                    self.poll()
+                except Exception:
+                    # Subscribers keep the last state; retry on the next poll
+                    logger.exception('Suggestion push rescore failed')
+                time.sleep(get_config()['POLL_INTERVAL_SECONDS'])
+        finally:
+            connections.close_all()
+
+    def subscribe(self) -> None:
+        """Register a subscriber, computing the first state if needed."""
+        with self._condition:
+            self._subscribers += 1
+            needs_state = self._state is None
+        if needs_state:
+            self._compute()
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=f'suggestion-push-{self.workspace_id}-{self.strategy}-{self.k}', daemon=True
+                )
+                self._thread.start()
+
+    def unsubscribe(self) -> None:
+        with self._condition:
+            self._subscribers = max(0, self._subscribers - 1)
+
+    def wait(self, after_sequence: int, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Block until a state newer than ``after_sequence`` is published.
+
+        Slow subscribers skip straight to the newest state. Returns None
+        on timeout.
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._state is not None and self._state['sequence'] > after_sequence,
+                timeout
+            )
+            if self._state is not None and self._state['sequence'] > after_sequence:
+                return self._state
+            return None
+
+
+_broadcasters: Dict[Tuple[int, str, int], SuggestionBroadcaster] = {}
+_broadcasters_lock = threading.Lock()
+
+
+def get_broadcaster(
+    strategy: str = 'smart_balance', k: int = 3, workspace_id: int = Workspace.DEFAULT_ID
+) -> SuggestionBroadcaster:
+    """Return this process's broadcaster for (workspace, strategy, k), creating it if needed."""
+    with _broadcasters_lock:
+        key = (workspace_id, strategy, k)
+        if key not in _broadcasters:
+            _broadcasters[key] = SuggestionBroadcaster(strategy, k, workspace_id)
+        return _broadcasters[key]
+
+
+def reset_broadcasters() -> None:
+    """Drop all broadcasters (used by tests)."""
+    with _broadcasters_lock:
+        _broadcasters.clear()
@@ -0,0 +1,370 @@
+"""
+Server-side "next task" priority queue over persisted tasks.
+
+Instead of rescoring the whole backlog on every suggest call, each worker
+process keeps a heap of eligible tasks:
+- A task is eligible once it is pending and every dependency is done
+- Peek is O(1) amortized; claim and complete are O(log n) plus the
+  completed task's direct neighbours
+- Completing a task unblocks dependents whose last open dependency it
+  was, and rescores its own dependencies (their open dependents count
+  dropped) without a full analyze_and_sort_tasks
+
+Claims use a conditional UPDATE, so several workers can share the table
+safely. Queues are per workspace. The workspace's revision, advanced as
+each write commits, shows when any process changed its tasks; the tasks
+updated since the last lookup, less Workspace.CHANGE_SCAN_OVERLAP for
+writes that committed late, are then reloaded and applied incrementally,
+so a write elsewhere costs other workers its change set, not a rebuild.
+Heaps are rebuilt in full when the date rolls over, when more than
+REBUILD_FRACTION of the open tasks changed at once, and after deletions
+or moves made in this process (see invalidate()).
+"""
+import heapq
+import itertools
+import threading
+from datetime import date, datetime
+from functools import partial
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .graph import to_scoring_dicts
+from .models import Task, TaskDependency, Workspace
+from .scoring import PriorityScorer
+from .snapshot import mark_stale
+
+REBUILD_FRACTION = 0.25  # Rebuild instead of applying more changes than this share of open tasks
+MIN_INCREMENTAL_CHANGES = 100
+
+
+class TaskQueue:
+    """
+    Priority queue of a workspace's eligible persisted tasks for a single strategy.
+    """
+
+    def __init__(self, strategy: str = 'smart_balance', workspace_id: int = Workspace.DEFAULT_ID):
+        self.strategy = strategy
+        self.workspace_id = workspace_id
+        self._lock = threading.RLock()
+        self._built_for: Optional[date] = None
+        self._fingerprint: Any = None
+        self._scanned_at: Optional[datetime] = None
+        self._heap: List[Tuple[float, int, int]] = []
+        self._sequence = itertools.count()
+        self._scored: Dict[int, Dict[str, Any]] = {}
+        self._entry: Dict[int, int] = {}  # Task ID -> sequence of its live heap entry
+        self._dicts: Dict[int, Dict[str, Any]] = {}
+        self._status: Dict[int, str] = {}
+        self._unmet: Dict[int, int] = {}
+        self._dependencies: Dict[int, Set[int]] = {}
+        self._dependents: Dict[int, Set[int]] = {}
+
+    def _tasks(self):
+        return Task.objects.filter(workspace_id=self.workspace_id)
+
+    def _current_fingerprint(self) -> Any:
+        """
+        The workspace's revision and its tasks' latest update time, in one query.
+        
+        Task and dependency edge writes advance the revision once they
+        commit (see signals.py); the update time also catches queryset
+        updates that send no signals. Deletions are picked up through
+        invalidate() in the deleting process; other workers skip deleted
+        tasks when claiming.
+        """
+        return Workspace.objects.filter(pk=self.workspace_id).annotate(
+            latest=Max('tasks__updated_at')
+        ).values_list('revision', 'latest').first()
+    
+    def invalidate(self) -> None:
+        """Force a rebuild on next use."""
+        with self._lock:
+            self._built_for = None
+
+    def _ensure_fresh(self) -> None:
+        today = date.today()
+        scanned_at = timezone.now()  # Before the lookup, so no later write predates it
+        fingerprint = self._current_fingerprint()
+        if self._built_for != today:
+            self._rebuild(today, fingerprint, scanned_at)
+        elif self._fingerprint != fingerprint and not self._apply_changes(fingerprint, scanned_at):
+            self._rebuild(today, fingerprint, scanned_at)
+
+    def _rebuild(self, today: date, fingerprint: Any, scanned_at: datetime) -> None:
+        """Load open tasks and their edges, then heapify the eligible ones."""
+        open_tasks = list(self._tasks().exclude(status=Task.STATUS_DONE))
+        open_ids = {task.pk for task in open_tasks}
+
+        self._dicts = {int(d['id']): d for d in to_scoring_dicts(open_tasks)}
+        self._status = {task.pk: task.status for task in open_tasks}
+        self._dependencies = {task_id: set() for task_id in open_ids}
+        self._dependents = {task_id: set() for task_id in open_ids}
+        self._unmet = {task_id: 0 for task_id in open_ids}
+
+        # Only edges between open tasks matter: done dependencies are met
+        edges = TaskDependency.objects.filter(
+            task_id__in=open_ids, depends_on_id__in=open_ids
+        ).values_list('task_id', 'depends_on_id')
+        for task_id, depends_on_id in edges:
+            self._dependencies[task_id].add(depends_on_id)
+            self._dependents[depends_on_id].add(task_id)
+            self._unmet[task_id] += 1
+
+        self._built_for = today
+        self._fingerprint = fingerprint
+        self._scanned_at = scanned_at
+        self._scored = {}
+        self._entry = {}
+        self._heap = []
+        for task_id in open_ids:
+            self._score(task_id)
+            if self._is_eligible(task_id):
+                self._heap.append(self._make_entry(task_id))
+        heapq.heapify(self._heap)
+
+    def _apply_changes(self, fingerprint: Any, scanned_at: datetime) -> bool:
+        """
+        Apply the tasks written since the previous lookup to the queue.
+        
+        Tasks updated since the previous lookup began, less
+        Workspace.CHANGE_SCAN_OVERLAP, are reloaded with their dependency
+        edges (edge writes advance the dependent task's updated_at), and
+        tasks that reopened get their incoming edges back. The overlap
+        catches transactions that stamped updated_at before the previous
+        lookup but committed after it. Only those tasks, and tasks whose
+        open dependents changed, are rescored. Reapplying an unchanged task
+        is a no-op, so the overlap costs a few reloads and nothing else.
+        
+        Returns False, leaving the queue untouched, when so many tasks
+        changed that a rebuild is cheaper.
+        """
+        limit = max(MIN_INCREMENTAL_CHANGES, int(len(self._status) * REBUILD_FRACTION))
+        changed = self._tasks().filter(
+            updated_at__gte=self._scanned_at - Workspace.CHANGE_SCAN_OVERLAP
+        )
+        changed = list(changed[:limit + 1])
+        if len(changed) > limit:
+            return False
+        
+        rescore: Set[int] = set()
+        for task in changed:
+            if task.status == Task.STATUS_DONE:
+                self._close(task.pk)
+        
+        open_changed = [task for task in changed if task.status != Task.STATUS_DONE]
+        reopened = {task.pk for task in open_changed if task.pk not in self._status}
+        for task in open_changed:
+            if task.pk in reopened:
+                self._dependencies.setdefault(task.pk, set())
+                self._dependents.setdefault(task.pk, set())
+                self._unmet.setdefault(task.pk, 0)
+            self._status[task.pk] = task.status
+        self._dicts.update({int(d['id']): d for d in to_scoring_dicts(open_changed)})
+        
+        # Replace the changed tasks' edges to open tasks with what is stored now
+        changed_ids = {task.pk for task in open_changed}
+        stored = {task_id: set() for task_id in changed_ids}
+        for task_id, depends_on_id in TaskDependency.objects.filter(
+            task_id__in=changed_ids
+        ).values_list('task_id', 'depends_on_id'):
+            if depends_on_id in self._status:
+                stored[task_id].add(depends_on_id)
+        for task_id, dependency_ids in stored.items():
+            for depends_on_id in self._dependencies[task_id] - dependency_ids:
+                self._unlink(task_id, depends_on_id)
+                rescore.add(depends_on_id)
+            for depends_on_id in dependency_ids - self._dependencies[task_id]:
+                self._link(task_id, depends_on_id)
+                rescore.add(depends_on_id)
+        
+        # Unchanged open tasks depending on a reopened task are blocked again
+        for task_id, depends_on_id in TaskDependency.objects.filter(
+            depends_on_id__in=reopened
+        ).values_list('task_id', 'depends_on_id'):
+            if task_id in self._status and depends_on_id not in self._dependencies[task_id]:
+                self._link(task_id, depends_on_id)
+                rescore.add(depends_on_id)
+        
+        for task_id in (rescore | changed_ids) & set(self._status):
+            self._score(task_id)
+            if self._is_eligible(task_id):
+                self._push(task_id)
+        self._fingerprint = fingerprint
+        self._scanned_at = scanned_at
+        return True
+
+    def _link(self, task_id: int, depends_on_id: int) -> None:
+        self._dependencies[task_id].add(depends_on_id)
+        self._dependents[depends_on_id].add(task_id)
+        self._unmet[task_id] += 1
+
+    def _unlink(self, task_id: int, depends_on_id: int) -> None:
+        self._dependencies[task_id].discard(depends_on_id)
+        self._dependents[depends_on_id].discard(task_id)
+        self._unmet[task_id] -= 1
+
+    def _close(self, task_id: int) -> List[int]:
+        """
+        Drop a done task from the graph, rescoring its neighbours.
+        
+        Returns the IDs of dependents whose last open dependency it was.
+        """
+        if task_id not in self._status:
+            return []
+        self._status.pop(task_id)
+        self._forget(task_id)
+
+        unblocked = []
+        for dependent_id in self._dependents.pop(task_id, set()):
+            self._dependencies[dependent_id].discard(task_id)
+            self._unmet[dependent_id] -= 1
+            if self._is_eligible(dependent_id):
+                self._push(dependent_id)
+                unblocked.append(dependent_id)
+
+        # Dependencies lost an open dependent, so their scores drop
+        for dependency_id in self._dependencies.pop(task_id, set()):
+            self._dependents[dependency_id].discard(task_id)
+            self._score(dependency_id)
+            if self._is_eligible(dependency_id):
+                self._push(dependency_id)
+
+        self._unmet.pop(task_id, None)
+        return sorted(unblocked)
+
+    def _score(self, task_id: int) -> None:
+        """Score one task using its current number of open dependents."""
+        dependency_score = PriorityScorer._dependency_score_for_count(len(self._dependents[task_id]))
+        self._scored[task_id] = PriorityScorer._score_task(
+            dict(self._dicts[task_id]), dependency_score, self.strategy, None, self._built_for
+        )
+
+    def _is_eligible(self, task_id: int) -> bool:
+        return self._status.get(task_id) == Task.STATUS_PENDING and self._unmet[task_id] == 0
+
+    def _make_entry(self, task_id: int) -> Tuple[float, int, int]:
+        sequence = next(self._sequence)
+        self._entry[task_id] = sequence
+        return (-self._scored[task_id]['priority_score'], sequence, task_id)
+
+    def _push(self, task_id: int) -> None:
+        heapq.heappush(self._heap, self._make_entry(task_id))
+
+    def _top(self) -> Optional[int]:
+        """Discard superseded heap entries and return the best live task ID."""
+        while self._heap:
+            _, sequence, task_id = self._heap[0]
+            if self._entry.get(task_id) == sequence and self._is_eligible(task_id):
+                return task_id
+            heapq.heappop(self._heap)
+        return None
+
+    def _forget(self, task_id: int) -> None:
+        self._entry.pop(task_id, None)
+
+    def peek(self) -> Optional[Dict[str, Any]]:
+        """Return the highest-priority eligible task without claiming it."""
+        with self._lock:
+            self._ensure_fresh()
+            task_id = self._top()
+            return self._scored[task_id] if task_id is not None else None
+
+    def eligible_count(self) -> int:
+        with self._lock:
+            self._ensure_fresh()
+            return sum(1 for task_id in self._entry if self._is_eligible(task_id))
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """
+        Claim the highest-priority eligible task, marking it in progress.
+
+        Tasks claimed concurrently by another worker are skipped.
+        """
+        with self._lock:
+            self._ensure_fresh()
+            while True:
+                task_id = self._top()
+                if task_id is None:
+                    return None
+                heapq.heappop(self._heap)
+                self._forget(task_id)
+
+                claimed = self._tasks().filter(
+                    pk=task_id, status=Task.STATUS_PENDING
+                ).update(status=Task.STATUS_IN_PROGRESS, updated_at=timezone.now())
+                if claimed:
+                    # The write advances the fingerprint; the next refresh
+                    # reapplies it as a no-op along with any other changes
+                    transaction.on_commit(partial(mark_stale, self.workspace_id))
+                    transaction.on_commit(partial(Workspace.record_change, self.workspace_id))
+                    self._status[task_id] = Task.STATUS_IN_PROGRESS
+                    return self._scored[task_id]
+                self._lost_claim(task_id)
+
+    def _lost_claim(self, task_id: int) -> None:
+        """
+        Record what another worker did to a task this worker failed to claim.
+        
+        The task keeps its place in the dependency graph unless it is done
+        or deleted, so completing it later still unblocks its dependents.
+        """
+        current = self._tasks().filter(pk=task_id).values_list('status', flat=True).first()
+        if current is None or current == Task.STATUS_DONE:
+            self._close(task_id)
+        else:
+            self._status[task_id] = current
+
+    def complete(self, task_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Mark a task done and incrementally update the queue.
+
+        Returns None if the task does not exist in this workspace,
+        otherwise a summary with the IDs of dependents that became eligible.
+        """
+        with self._lock:
+            self._ensure_fresh()
+            now = timezone.now()
+            updated = self._tasks().filter(pk=task_id).exclude(
+                status=Task.STATUS_DONE
+            ).update(status=Task.STATUS_DONE, completed_at=now, updated_at=now)
+            if not updated:
+                if not self._tasks().filter(pk=task_id).exists():
+                    return None
+                return {'id': task_id, 'unblocked': []}
+
+            transaction.on_commit(partial(mark_stale, self.workspace_id))
+            transaction.on_commit(partial(Workspace.record_change, self.workspace_id))
+            return {'id': task_id, 'unblocked': self._close(task_id)}
+
+
+_queues: Dict[Tuple[int, str], TaskQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_queue(strategy: str = 'smart_balance', workspace_id: int = Workspace.DEFAULT_ID) -> TaskQueue:
+    """Return this process's queue for a workspace and ``strategy``, creating it if needed."""
+    with _queues_lock:
+        key = (workspace_id, strategy)
+        if key not in _queues:
+            _queues[key] = TaskQueue(strategy, workspace_id)
+        return _queues[key]
+
+
+def invalidate_queues(workspace_id: Optional[int] = None) -> None:
+    """Force a workspace's queues (or every queue) in this process to rebuild on next use."""
+    with _queues_lock:
+        queues = [
+            task_queue for (queue_workspace_id, _), task_queue in _queues.items()
+            if workspace_id is None or queue_workspace_id == workspace_id
+        ]
+    for queue in queues:
+        queue.invalidate()
+
+
+def reset_queues() -> None:
+    """Drop all cached queues (used by tests)."""
+    with _queues_lock:
+        _queues.clear()
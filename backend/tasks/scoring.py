@@ -7,10 +7,14 @@ This module implements the core priority calculation logic that considers:
 - Effort (estimated hours)
 - Dependencies (blocking relationships)
 """
+import heapq
 from datetime import date, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Iterable, Iterator
 from collections import defaultdict
 
+from . import explanations
+from .streaming import DependentsSketch
+
 
 class PriorityScorer:
     """
@@ -72,16 +76,33 @@ class PriorityScorer:
         if current_date is None:
             current_date = date.today()
         
+        due = PriorityScorer._parse_due_date(due_date)
+        if due is None:
+            return 0.1  # Low urgency for missing or invalid due dates
+        
+        return PriorityScorer._urgency_for_days((due - current_date).days)
+    
+    @staticmethod
+    def _parse_due_date(due_date: Any) -> Optional[date]:
+        """
+        Parse a due date string or date, returning None if missing or invalid.
+        """
         if not due_date:
-            return 0.1  # Low urgency for tasks without due dates
+            return None
         
         try:
             due = date.fromisoformat(due_date) if isinstance(due_date, str) else due_date
         except (ValueError, AttributeError):
-            return 0.1  # Invalid date format
-        
-        days_diff = (due - current_date).days
+            return None
+        return due
+    
+    @staticmethod
+    def _urgency_for_days(days_diff: int) -> float:
+        """
+        Map the number of days until the due date to an urgency score.
         
+        Negative values mean the task is overdue.
+        """
         if days_diff < 0:
             # Past due: exponential penalty
             # Formula: 1.0 + (days_overdue * 0.1)
@@ -173,6 +194,13 @@ class PriorityScorer:
             if isinstance(deps, list) and task_id in deps:
                 dependents_count += 1
         
+        return PriorityScorer._dependency_score_for_count(dependents_count)
+    
+    @staticmethod
+    def _dependency_score_for_count(dependents_count: int) -> float:
+        """
+        Map the number of dependent tasks to a dependency score.
+        """
         # Normalize: 0 dependents = 0.0, 3+ dependents = 1.0
         if dependents_count == 0:
             return 0.0
@@ -246,7 +274,8 @@ class PriorityScorer:
         task: Dict[str, Any],
         task_list: List[Dict[str, Any]],
         strategy: str = 'smart_balance',
-        weights: Optional[Dict[str, float]] = None
+        weights: Optional[Dict[str, float]] = None,
+        current_date: Optional[date] = None
     ) -> Dict[str, Any]:
         """
         Calculate comprehensive priority score for a task.
@@ -256,10 +285,31 @@ class PriorityScorer:
             task_list: List of all tasks (for dependency calculation)
             strategy: Sorting strategy name
             weights: Custom weights (overrides strategy if provided)
+            current_date: Date to score urgency against (defaults to today)
             
         Returns:
             Dictionary with task data, score, and component scores
         """
+        task_id = task.get('id') or task.get('title')
+        dependency_score = cls.calculate_dependency_score(task_id, task_list)
+        
+        return cls._score_task(task, dependency_score, strategy, weights, current_date)
+    
+    @classmethod
+    def _score_task(
+        cls,
+        task: Dict[str, Any],
+        dependency_score: float,
+        strategy: str = 'smart_balance',
+        weights: Optional[Dict[str, float]] = None,
+        current_date: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """
+        Score a task whose dependency score has already been computed.
+        
+        Shared by calculate_priority_score and callers that count
+        dependents some other way (e.g. streaming sketches).
+        """
         # Get weights based on strategy
         if weights:
             w = weights
@@ -267,16 +317,14 @@ class PriorityScorer:
             w = cls.STRATEGY_WEIGHTS.get(strategy, cls.DEFAULT_WEIGHTS)
         
         # Extract task data with validation
-        task_id = task.get('id') or task.get('title')
         due_date = task.get('due_date')
         importance = task.get('importance', 5)
         estimated_hours = task.get('estimated_hours', 4)
         
         # Calculate component scores
-        urgency_score = cls.calculate_urgency_score(due_date)
+        urgency_score = cls.calculate_urgency_score(due_date, current_date)
         importance_score = cls.calculate_importance_score(importance)
         effort_score = cls.calculate_effort_score(estimated_hours)
-        dependency_score = cls.calculate_dependency_score(task_id, task_list)
         
         # Calculate weighted total score
         total_score = (
@@ -286,10 +334,10 @@ class PriorityScorer:
             dependency_score * w['dependencies']
         )
         
-        # Generate explanation
-        explanation = cls._generate_explanation(
+        # Reason codes only; text is rendered on request (see explanations.py)
+        reasons = explanations.reasons(
             urgency_score, importance_score, effort_score, dependency_score,
-            due_date, importance, estimated_hours, total_score
+            importance, estimated_hours
         )
         
         return {
@@ -301,59 +349,49 @@ class PriorityScorer:
                 'effort': round(effort_score, 3),
                 'dependencies': round(dependency_score, 3)
             },
-            'explanation': explanation
+            'reasons': reasons
         }
     
     @staticmethod
-    def _generate_explanation(
-        urgency: float,
-        importance: float,
-        effort: float,
-        dependency: float,
-        due_date: Optional[str],
-        importance_rating: int,
-        estimated_hours: float,
-        total_score: float
-    ) -> str:
-        """
-        Generate human-readable explanation for the priority score.
-        """
-        reasons = []
-        
-        if urgency >= 0.8:
-            if due_date:
-                try:
-                    due = date.fromisoformat(due_date) if isinstance(due_date, str) else due_date
-                    if due < date.today():
-                        days_overdue = (date.today() - due).days
-                        reasons.append(f"Overdue by {days_overdue} day(s)")
-                    else:
-                        reasons.append("Due very soon")
-                except:
-                    reasons.append("High urgency")
-            else:
-                reasons.append("High urgency")
-        
-        if importance >= 0.7:
-            reasons.append(f"High importance ({importance_rating}/10)")
-        
-        if effort >= 0.7:
-            reasons.append(f"Quick win ({estimated_hours}h estimated)")
-        
-        if dependency >= 0.5:
-            reasons.append("Blocks other tasks")
-        
-        if not reasons:
-            reasons.append("Standard priority task")
-        
-        return "; ".join(reasons)
+    def _validate_tasks(tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Fill in IDs and default fields, dropping tasks without a title.
+        
+        Tasks are updated in place.
+        """
+        return [task for i, task in enumerate(tasks) if PriorityScorer._validate_task(task, i)]
+    
+    @staticmethod
+    def _validate_task(task: Dict[str, Any], index: int) -> bool:
+        """
+        Fill in a single task's ID and defaults in place.
+        
+        Returns False if the task has no title and should be skipped.
+        """
+        # Ensure each task has an ID
+        if 'id' not in task:
+            task['id'] = task.get('title', f'task_{index}')
+        
+        # Validate required fields
+        if 'title' not in task:
+            return False  # Skip invalid tasks
+        
+        # Set defaults for missing fields
+        task.setdefault('due_date', None)
+        task.setdefault('importance', 5)
+        task.setdefault('estimated_hours', 4)
+        task.setdefault('dependencies', [])
+        
+        return True
     
     @classmethod
     def analyze_and_sort_tasks(
         cls,
         tasks: List[Dict[str, Any]],
         strategy: str = 'smart_balance',
-        weights: Optional[Dict[str, float]] = None
+        weights: Optional[Dict[str, float]] = None,
+        current_date: Optional[date] = None,
+        backend: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Analyze a list of tasks and return them sorted by priority.
@@ -362,54 +400,218 @@ class PriorityScorer:
             tasks: List of task dictionaries
             strategy: Sorting strategy to use
             weights: Custom weights (optional)
+            current_date: Date to score urgency against (defaults to today)
+            backend: Scoring backend name (defaults to the SCORING setting);
+                see tasks/backends.py
             
         Returns:
             Dictionary with sorted tasks, circular dependencies, and metadata
         """
-        if not tasks:
-            return {
-                'tasks': [],
-                'circular_dependencies': [],
-                'strategy': strategy,
-                'message': 'No tasks provided'
-            }
-        
-        # Validate and clean tasks
-        validated_tasks = []
-        for i, task in enumerate(tasks):
-            # Ensure each task has an ID
-            if 'id' not in task:
-                task['id'] = task.get('title', f'task_{i}')
-            
-            # Validate required fields
-            if 'title' not in task:
-                continue  # Skip invalid tasks
-            
-            # Set defaults for missing fields
-            task.setdefault('due_date', None)
-            task.setdefault('importance', 5)
-            task.setdefault('estimated_hours', 4)
-            task.setdefault('dependencies', [])
+        from .backends import get_backend
+        
+        return get_backend(backend).analyze(tasks, strategy, weights, current_date)
+
+    
+    @classmethod
+    def forecast_scores(
+        cls,
+        tasks: List[Dict[str, Any]],
+        days: int = 14,
+        strategy: str = 'smart_balance',
+        weights: Optional[Dict[str, float]] = None,
+        start_date: Optional[date] = None,
+        track_top: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Forecast each task's score and rank for every day in a date range.
+        
+        Only urgency depends on the date, so importance, effort and
+        dependency scores are computed once per task. Urgency is a function
+        of the days between due date and scoring date, so each distinct
+        offset is evaluated once and shared across all tasks and days.
+        
+        Args:
+            tasks: List of task dictionaries
+            days: Number of days to forecast, starting at start_date
+            strategy: Sorting strategy to use
+            weights: Custom weights (optional)
+            start_date: First forecast day (defaults to today)
+            track_top: Report overtakes among this many leading tasks per day
             
-            validated_tasks.append(task)
+        Returns:
+            Dictionary with forecast dates, per-task score and rank series,
+            and the days on which leading tasks overtake each other
+        """
+        if start_date is None:
+            start_date = date.today()
+        w = weights or cls.STRATEGY_WEIGHTS.get(strategy, cls.DEFAULT_WEIGHTS)
+        dates = [start_date + timedelta(days=offset) for offset in range(days)]
         
-        # Detect circular dependencies
-        circular_deps = cls.detect_circular_dependencies(validated_tasks)
+        validated_tasks = cls._validate_tasks(tasks)
         
-        # Calculate scores for all tasks
-        scored_tasks = []
+        # Count dependents for every task in a single pass
+        dependents = defaultdict(int)
         for task in validated_tasks:
-            scored_task = cls.calculate_priority_score(task, validated_tasks, strategy, weights)
-            scored_tasks.append(scored_task)
+            deps = task.get('dependencies', [])
+            if isinstance(deps, list):
+                for dep in set(deps):
+                    dependents[dep] += 1
+        
+        # Date-independent weighted components, kept separate so totals are
+        # summed in the same order as calculate_priority_score
+        static_parts = []
+        due_ordinals = []
+        for task in validated_tasks:
+            task_id = task.get('id') or task.get('title')
+            static_parts.append((
+                cls.calculate_importance_score(task.get('importance', 5)) * w['importance'],
+                cls.calculate_effort_score(task.get('estimated_hours', 4)) * w['effort'],
+                cls._dependency_score_for_count(dependents.get(task_id, 0)) * w['dependencies']
+            ))
+            due = cls._parse_due_date(task.get('due_date'))
+            due_ordinals.append(due.toordinal() if due is not None else None)
+        
+        urgency_by_offset = {}
+        no_due_urgency = 0.1 * w['urgency']
+        
+        scores = [[0.0] * days for _ in validated_tasks]
+        ranks = [[0] * days for _ in validated_tasks]
+        order_by_day = []
+        
+        for day_index, day in enumerate(dates):
+            day_ordinal = day.toordinal()
+            for i, (importance, effort, dependency) in enumerate(static_parts):
+                due_ordinal = due_ordinals[i]
+                if due_ordinal is None:
+                    urgency = no_due_urgency
+                else:
+                    offset = due_ordinal - day_ordinal
+                    urgency = urgency_by_offset.get(offset)
+                    if urgency is None:
+                        urgency = cls._urgency_for_days(offset) * w['urgency']
+                        urgency_by_offset[offset] = urgency
+                scores[i][day_index] = round(urgency + importance + effort + dependency, 3)
+            
+            # Same ordering as analyze_and_sort_tasks: stable, descending score
+            order = sorted(range(len(validated_tasks)), key=lambda i: scores[i][day_index], reverse=True)
+            for rank, i in enumerate(order, 1):
+                ranks[i][day_index] = rank
+            order_by_day.append(order)
+        
+        # Report pairs among the leading tasks whose relative order flips
+        overtakes = []
+        for day_index in range(1, days):
+            leaders = set(order_by_day[day_index - 1][:track_top]) | set(order_by_day[day_index][:track_top])
+            for i in leaders:
+                for j in leaders:
+                    if (ranks[i][day_index - 1] > ranks[j][day_index - 1]
+                            and ranks[i][day_index] < ranks[j][day_index]):
+                        overtakes.append({
+                            'date': str(dates[day_index]),
+                            'task': validated_tasks[i]['id'],
+                            'overtook': validated_tasks[j]['id'],
+                        })
+        
+        return {
+            'strategy': strategy,
+            'start_date': str(start_date),
+            'days': days,
+            'dates': [str(day) for day in dates],
+            'tasks': [
+                {
+                    'id': task['id'],
+                    'title': task['title'],
+                    'scores': scores[i],
+                    'ranks': ranks[i],
+                }
+                for i, task in enumerate(validated_tasks)
+            ],
+            'overtakes': overtakes,
+            'total_tasks': len(validated_tasks),
+        }
+    
+    @classmethod
+    def score_stream(
+        cls,
+        task_source: Callable[[], Iterable[Dict[str, Any]]],
+        strategy: str = 'smart_balance',
+        weights: Optional[Dict[str, float]] = None,
+        current_date: Optional[date] = None,
+        sketch: Optional[DependentsSketch] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Score an unbounded task stream in bounded memory.
+        
+        Makes two passes over ``task_source()``: the first estimates
+        dependents counts into a fixed-size sketch, the second yields
+        each scored task as it streams past. Dependency scores are
+        approximate (never lower than exact, see tasks/streaming.py for
+        the error bounds) and circular dependencies are not detected.
+        
+        Args:
+            task_source: Callable returning a fresh iterable of tasks per pass
+            strategy: Sorting strategy to use
+            weights: Custom weights (optional)
+            current_date: Date to score urgency against (defaults to today)
+            sketch: Pre-sized DependentsSketch (optional)
+            
+        Yields:
+            Scored task dictionaries in input order
+        """
+        if current_date is None:
+            current_date = date.today()
+        if sketch is None:
+            sketch = DependentsSketch()
+        
+        for task in task_source():
+            # Untitled tasks are skipped below, so their dependencies do not count
+            if 'title' in task:
+                sketch.add_task(task)
+        
+        for i, task in enumerate(task_source()):
+            if not cls._validate_task(task, i):
+                continue
+            task_id = task.get('id') or task.get('title')
+            dependency_score = cls._dependency_score_for_count(sketch.estimate(task_id))
+            yield cls._score_task(task, dependency_score, strategy, weights, current_date)
+    
+    @classmethod
+    def top_k_stream(
+        cls,
+        task_source: Callable[[], Iterable[Dict[str, Any]]],
+        k: int = 10,
+        strategy: str = 'smart_balance',
+        weights: Optional[Dict[str, float]] = None,
+        current_date: Optional[date] = None,
+        sketch: Optional[DependentsSketch] = None
+    ) -> Dict[str, Any]:
+        """
+        Return the k highest-priority tasks of a stream in bounded memory.
         
-        # Sort by priority score (descending)
-        scored_tasks.sort(key=lambda x: x['priority_score'], reverse=True)
+        Keeps at most k scored tasks in a min-heap. Ties are broken by
+        input order, matching the stable sort in analyze_and_sort_tasks.
         
+        Returns:
+            Dictionary with the top tasks, strategy, task count and the
+            sketch's sizing and error bounds
+        """
+        if sketch is None:
+            sketch = DependentsSketch()
+        
+        heap = []
+        total = 0
+        for i, scored in enumerate(cls.score_stream(task_source, strategy, weights, current_date, sketch)):
+            total += 1
+            entry = (scored['priority_score'], -i, scored)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+        
+        top = [scored for _, _, scored in sorted(heap, key=lambda e: e[:2], reverse=True)]
         return {
-            'tasks': scored_tasks,
-            'circular_dependencies': circular_deps,
+            'tasks': top,
             'strategy': strategy,
-            'total_tasks': len(scored_tasks),
-            'message': f'Analyzed {len(scored_tasks)} tasks using {strategy} strategy'
+            'total_tasks': total,
+            'sketch': sketch.stats(),
         }
-
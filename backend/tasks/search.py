@@ -0,0 +1,337 @@
+"""
+Indexed full-text and prefix search over task titles.
+
+Two backends, picked by database vendor:
+- PostgreSQL: full-text search against a GIN expression index on
+  ``to_tsvector('simple', title)``, with ``:*`` prefix matching for
+  autocomplete (indexes are created by migration 0005)
+- Everything else (SQLite): an in-process inverted index with a sorted
+  vocabulary, so prefix terms expand by binary search
+
+All query terms must match, and searches from the API are scoped to one
+workspace. Results are ranked by text relevance boosted by the task's
+current priority from its workspace's backlog snapshot:
+``score = relevance * (1 + priority_score)``.
+"""
+import bisect
+import heapq
+import math
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from django.db import connection
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from .models import Task, Workspace
+
+TOKEN_RE = re.compile(r'\w+')
+MAX_PREFIX_EXPANSIONS = 64  # Vocabulary terms a prefix may expand to
+CANDIDATE_FACTOR = 5        # Relevance candidates fetched per result before priority boosting
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return TOKEN_RE.findall(text.lower())
+
+
+class InvertedIndex:
+    """
+    In-process inverted index over task titles.
+
+    Kept current incrementally: saves and deletes in this process update
+    it through signals. Each search first checks workspace revisions and
+    the latest ``updated_at``; when either moved, it pulls rows updated
+    since the previous check began, less Workspace.CHANGE_SCAN_OVERLAP so
+    transactions that stamped rows early but committed late are not missed.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+        self._doc_tokens: Dict[int, List[str]] = {}
+        self._doc_workspace: Dict[int, int] = {}
+        self._total_length = 0
+        self._fingerprint: Any = None
+        self._scanned_at = None
+        self._built = False
+
+    def __len__(self) -> int:
+        return len(self._doc_tokens)
+
+    def _add(self, task_id: int, title: str, workspace_id: int) -> None:
+        self._remove(task_id)
+        tokens = tokenize(title)
+        self._doc_tokens[task_id] = tokens
+        self._doc_workspace[task_id] = workspace_id
+        self._total_length += len(tokens)
+        for token in tokens:
+            postings = self._postings[token]
+            if not postings:
+                self._vocabulary_dirty = True
+            postings[task_id] = postings.get(task_id, 0) + 1
+
+    def _remove(self, task_id: int) -> None:
+        tokens = self._doc_tokens.pop(task_id, None)
+        if tokens is None:
+            return
+        del self._doc_workspace[task_id]
+        self._total_length -= len(tokens)
+        for token in set(tokens):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(task_id, None)
+                if not postings:
+                    del self._postings[token]
+                    self._vocabulary_dirty = True
+
+    def upsert(self, task_id: int, title: str, workspace_id: int) -> None:
+        with self._lock:
+            if self._built:
+                self._add(task_id, title, workspace_id)
+
+    def remove(self, task_id: int) -> None:
+        with self._lock:
+            self._remove(task_id)
+
+    def refresh(self) -> None:
+        """Load the whole table on first use, then only rows changed since."""
+        with self._lock:
+            scanned_at = timezone.now()  # Before the lookup, so no later write predates it
+            fingerprint = (
+                Workspace.objects.aggregate(revision=Sum('revision'))['revision'],
+                Task.objects.aggregate(latest=Max('updated_at'))['latest'],
+            )
+            rows = Task.objects.all()
+            if self._built:
+                if fingerprint == self._fingerprint:
+                    return
+                rows = rows.filter(updated_at__gte=self._scanned_at - Workspace.CHANGE_SCAN_OVERLAP)
+
+            rows = rows.values_list('id', 'title', 'workspace_id')
+            for task_id, title, workspace_id in rows.iterator():
+                self._add(task_id, title, workspace_id)
+            self._fingerprint = fingerprint
+            self._scanned_at = scanned_at
+            self._built = True
+
+    def _terms_for(self, token: str, prefix: bool) -> List[str]:
+        if not prefix:
+            return [token] if token in self._postings else []
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        start = bisect.bisect_left(self._vocabulary, token)
+        terms = []
+        for term in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(token):
+                break
+            terms.append(term)
+        return terms
+
+    def prefix_capped(self, token: str) -> bool:
+        """Check whether ``token`` is a prefix of more than MAX_PREFIX_EXPANSIONS terms."""
+        with self._lock:
+            self._terms_for(token, prefix=True)  # Re-sorts the vocabulary if needed
+            beyond = bisect.bisect_left(self._vocabulary, token) + MAX_PREFIX_EXPANSIONS
+            return beyond < len(self._vocabulary) and self._vocabulary[beyond].startswith(token)
+
+    def search(
+        self, query: str, prefix: bool = False, limit: int = 100, workspace_id: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Return up to ``limit`` (task ID, BM25 relevance) pairs, best first.
+
+        Every query token must match; with ``prefix`` the last token
+        matches any term it is a prefix of. With ``workspace_id``, only
+        that workspace's tasks are returned. Term statistics stay global.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        with self._lock:
+            doc_count = len(self._doc_tokens)
+            if not doc_count:
+                return []
+            average_length = self._total_length / doc_count
+
+            # Each query token maps to the union of its (expanded) terms
+            token_matches = []
+            for i, token in enumerate(tokens):
+                terms = self._terms_for(token, prefix and i == len(tokens) - 1)
+                if not terms:
+                    return []
+                token_matches.append(terms)
+
+            # Intersect starting from the rarest token to keep candidate sets small
+            token_matches.sort(key=lambda terms: sum(len(self._postings[t]) for t in terms))
+            candidates: Optional[Set[int]] = None
+            for terms in token_matches:
+                matched = set()
+                for term in terms:
+                    matched.update(self._postings[term])
+                candidates = matched if candidates is None else candidates & matched
+                if not candidates:
+                    return []
+            if workspace_id is not None:
+                candidates = {task_id for task_id in candidates if self._doc_workspace[task_id] == workspace_id}
+                if not candidates:
+                    return []
+
+            scores = dict.fromkeys(candidates, 0.0)
+            for terms in token_matches:
+                for term in terms:
+                    postings = self._postings[term]
+                    idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    # Walk whichever side is smaller
+                    if len(postings) < len(candidates):
+                        hits = ((task_id, tf) for task_id, tf in postings.items() if task_id in scores)
+                    else:
+                        hits = ((task_id, postings[task_id]) for task_id in candidates if task_id in postings)
+                    for task_id, tf in hits:
+                        length = len(self._doc_tokens[task_id])
+                        scores[task_id] += idf * tf * (K1 + 1) / (
+                            tf + K1 * (1 - B + B * length / average_length)
+                        )
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+
+_index = InvertedIndex()
+
+
+def get_index() -> InvertedIndex:
+    return _index
+
+
+def reset_index() -> None:
+    """Discard the in-process index (used by tests)."""
+    global _index
+    _index = InvertedIndex()
+
+
+def uses_postgres() -> bool:
+    return connection.vendor == 'postgresql'
+
+
+def _postgres_candidates(
+    tokens: List[str], prefix: bool, limit: int, workspace_id: Optional[int]
+) -> List[Tuple[int, float]]:
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+    # Tokens are \w+ only, so they are safe to join into a raw tsquery
+    terms = [f'{token}:*' if prefix and i == len(tokens) - 1 else token for i, token in enumerate(tokens)]
+    query = SearchQuery(' & '.join(terms), search_type='raw', config='simple')
+    vector = SearchVector('title', config='simple')  # Matches the expression index
+    tasks = Task.objects.all() if workspace_id is None else Task.objects.filter(workspace_id=workspace_id)
+    rows = (
+        tasks
+        .annotate(document=vector)
+        .filter(document=query)
+        .annotate(relevance=SearchRank(vector, query))
+        .order_by('-relevance')
+        .values_list('id', 'relevance')[:limit]
+    )
+    return list(rows)
+
+
+def search_ids(
+    query: str, prefix: bool = False, limit: int = 100, workspace_id: Optional[int] = None
+) -> List[Tuple[int, float]]:
+    """
+    Relevance-ranked (task ID, relevance) pairs from the active backend,
+    from one workspace or (without ``workspace_id``) all of them.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    if uses_postgres():
+        return _postgres_candidates(tokens, prefix, limit, workspace_id)
+    _index.refresh()
+    return _index.search(query, prefix=prefix, limit=limit, workspace_id=workspace_id)
+
+
+def prefix_capped(query: str) -> bool:
+    """
+    Check whether prefix-searching ``query`` would drop matches.
+
+    The in-process index expands the last token to at most
+    MAX_PREFIX_EXPANSIONS terms; PostgreSQL prefix matching has no cap.
+    """
+    tokens = tokenize(query)
+    if not tokens or uses_postgres():
+        return False
+    _index.refresh()
+    return _index.prefix_capped(tokens[-1])
+
+
+def search_tasks(
+    query: str,
+    prefix: bool = False,
+    limit: int = 20,
+    strategy: str = 'smart_balance',
+    priorities: Optional[Dict[int, float]] = None,
+    workspace_id: int = Workspace.DEFAULT_ID
+) -> List[Dict[str, Any]]:
+    """
+    Search a workspace's task titles and rank hits by relevance and priority.
+
+    Args:
+        query: Search text
+        prefix: Treat the last word as a prefix (autocomplete)
+        limit: Maximum number of results
+        strategy: Strategy whose priority scores boost the ranking
+        priorities: Priority score by task ID (defaults to the workspace's
+            backlog snapshot)
+        workspace_id: Workspace to search
+
+    Returns:
+        Ranked result dictionaries
+    """
+    candidates = search_ids(query, prefix=prefix, limit=limit * CANDIDATE_FACTOR, workspace_id=workspace_id)
+    if not candidates:
+        return []
+
+    if priorities is None:
+        from .snapshot import get_snapshot
+        backlog = get_snapshot(workspace_id)
+        priorities = {}
+        for task_id, _ in candidates:
+            index = backlog.index_of(task_id)
+            if index is not None:
+                priorities[task_id] = backlog.score(index, strategy)
+
+    ranked = sorted(
+        (
+            (relevance * (1 + priorities.get(task_id, 0.0)), task_id, relevance)
+            for task_id, relevance in candidates
+        ),
+        reverse=True
+    )[:limit]
+
+    # Hydrating from the table also drops tasks deleted by other workers
+    tasks = Task.objects.in_bulk([task_id for _, task_id, _ in ranked])
+    return [
+        {
+            'id': str(task_id),
+            'title': tasks[task_id].title,
+            'status': tasks[task_id].status,
+            'due_date': tasks[task_id].due_date,
+            'importance': tasks[task_id].importance,
+            'estimated_hours': tasks[task_id].estimated_hours,
+            'relevance': round(relevance, 4),
+            'priority_score': priorities.get(task_id),
+            'score': round(score, 4),
+        }
+        for score, task_id, relevance in ranked
+        if task_id in tasks
+    ]
@@ -3,6 +3,27 @@ Serializers for task API endpoints.
 """
 from rest_framework import serializers
 from datetime import date
+from .models import AnalysisJob, Task
+from . import backends
+
+
+STRATEGY_CHOICES = ['smart_balance', 'fastest_wins', 'high_impact', 'deadline_driven']
+
+
+def to_task_dicts(tasks):
+    """Convert validated serializer tasks to the dictionaries the scorer expects."""
+    task_dicts = []
+    for task in tasks:
+        task_dict = {
+            'id': task.get('id') or task.get('title'),
+            'title': task['title'],
+            'due_date': task.get('due_date'),
+            'estimated_hours': task.get('estimated_hours', 4),
+            'importance': task.get('importance', 5),
+            'dependencies': task.get('dependencies', [])
+        }
+        task_dicts.append(task_dict)
+    return task_dicts
 
 
 class TaskSerializer(serializers.Serializer):
@@ -21,6 +42,7 @@ class TaskSerializer(serializers.Serializer):
     )
     priority_score = serializers.FloatField(read_only=True, required=False)
     component_scores = serializers.DictField(read_only=True, required=False)
+    reasons = serializers.ListField(child=serializers.DictField(), read_only=True, required=False)
     explanation = serializers.CharField(read_only=True, required=False)
     
     def validate_due_date(self, value):
@@ -42,8 +64,84 @@ class TaskAnalyzeSerializer(serializers.Serializer):
     """
     tasks = TaskSerializer(many=True)
     strategy = serializers.ChoiceField(
-        choices=['smart_balance', 'fastest_wins', 'high_impact', 'deadline_driven'],
+        choices=STRATEGY_CHOICES,
         default='smart_balance',
         required=False
     )
+    backend = serializers.CharField(required=False, help_text="Scoring backend (defaults to the SCORING setting)")
+    
+    def validate_backend(self, value):
+        """Ensure the backend is registered."""
+        if value not in backends.backend_names():
+            raise serializers.ValidationError(f"Unknown backend. Choose from: {', '.join(backends.backend_names())}")
+        return value
+
+
+
+class JobSubmitSerializer(TaskAnalyzeSerializer):
+    """
+    Serializer for submitting an asynchronous analysis job.
+    """
+    kind = serializers.ChoiceField(
+        choices=[choice for choice, _ in AnalysisJob.KIND_CHOICES],
+        default=AnalysisJob.KIND_ANALYZE,
+        required=False
+    )
+    strategies = serializers.ListField(
+        child=serializers.ChoiceField(choices=STRATEGY_CHOICES),
+        required=False,
+        help_text="Strategies to compare (sweep jobs only, defaults to all)"
+    )
+
 
+class ForecastSerializer(TaskAnalyzeSerializer):
+    """
+    Serializer for multi-date urgency forecast requests.
+    """
+    days = serializers.IntegerField(min_value=1, max_value=90, default=14, required=False)
+    start_date = serializers.DateField(required=False, allow_null=True)
+
+
+class PersistedTaskSerializer(serializers.ModelSerializer):
+    """
+    Serializer for creating and updating persisted tasks.
+    
+    ``dependencies`` lists the IDs of tasks in the same workspace; the
+    views write the edges, checking each new one for cycles.
+    """
+    dependencies = serializers.ListField(child=serializers.IntegerField(), required=False, write_only=True)
+    
+    class Meta:
+        model = Task
+        fields = [
+            'id', 'workspace', 'title', 'due_date', 'estimated_hours', 'importance',
+            'dependencies', 'status', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'workspace', 'status', 'created_at', 'updated_at']
+    
+    def validate_dependencies(self, value):
+        return sorted(set(value))
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data['dependencies'] = sorted(instance.dependency_edges.values_list('depends_on_id', flat=True))
+        return data
+
+
+class AnalysisJobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for job status, progress and result.
+    """
+    class Meta:
+        model = AnalysisJob
+        fields = [
+            'id', 'kind', 'status', 'progress', 'error', 'result',
+            'created_at', 'started_at', 'finished_at', 'expires_at'
+        ]
+    
+    def to_representation(self, instance):
+        """Only include the result once the job has succeeded."""
+        data = super().to_representation(instance)
+        if instance.status != AnalysisJob.STATUS_SUCCEEDED:
+            data.pop('result')
+        return data
@@ -0,0 +1,137 @@
+"""
+Signal handlers keeping derived task state in sync with writes.
+"""
+from functools import partial
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Task, TaskDependency, Workspace
+
+
+def _workspaces_of(sender, instance):
+    """
+    IDs of the workspaces a write to a task or dependency edge affects.
+    
+    A task moved to another workspace affects both; an edge deleted in a
+    cascade from its task's deletion affects none beyond the task's own.
+    """
+    if sender is Task:
+        previous = getattr(instance, '_loaded_workspace_id', None)
+        return {instance.workspace_id, previous} - {None}
+    try:
+        return {instance.task.workspace_id}
+    except Task.DoesNotExist:
+        return set()
+
+
+@receiver(post_save, sender=TaskDependency)
+@receiver(post_delete, sender=TaskDependency)
+def touch_dependent_task(sender, instance, **kwargs):
+    """
+    Advance the dependent task's updated_at when its edges change.
+    
+    Other workers watch Max(updated_at) to notice changes, and edge
+    writes do not otherwise touch the task row.
+    """
+    Task.objects.filter(pk=instance.task_id).update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Task.dependencies.through)
+def touch_tasks_on_bulk_edge_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Advance dependent tasks' updated_at, and mark the snapshot stale, when
+    ``task.dependencies`` is changed through the related manager.
+    
+    The manager writes edges in bulk, without TaskDependency's signals.
+    Clearing ``task.dependents`` leaves no record of which tasks changed,
+    so only the snapshot is marked stale then.
+    """
+    from .snapshot import mark_stale
+    
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    task_ids = pk_set if reverse else {instance.pk}
+    if task_ids:
+        Task.objects.filter(pk__in=task_ids).update(updated_at=timezone.now())
+    transaction.on_commit(partial(mark_stale, instance.workspace_id))
+    transaction.on_commit(partial(Workspace.record_change, instance.workspace_id))
+
+
+@receiver(m2m_changed, sender=Task.dependencies.through)
+def check_dependency_edges(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """
+    Reject ``task.dependencies.add(...)`` across workspaces or closing a cycle.
+    
+    The related manager bulk-creates edges, bypassing TaskDependency.save()
+    and clean(). Edges added together all share ``instance``, so they
+    cannot form a cycle that none of them forms alone; each is checked on
+    its own.
+    """
+    from .graph import check_acyclic, lock_workspace_graph
+    
+    if action != 'pre_add' or not pk_set:
+        return
+    if model.objects.filter(pk__in=pk_set).exclude(workspace_id=instance.workspace_id).exists():
+        raise ValidationError('A task can only depend on tasks in the same workspace.')
+    
+    lock_workspace_graph(instance.workspace_id)
+    for other_id in sorted(pk_set):
+        # Through task.dependents, ``instance`` is the edge's target
+        edge = (other_id, instance.pk) if reverse else (instance.pk, other_id)
+        check_acyclic(*edge)
+
+
+@receiver(post_delete, sender=Task)
+def invalidate_on_task_delete(sender, instance, **kwargs):
+    """Deleting a task does not advance Max(updated_at), so invalidate directly."""
+    from .queue import invalidate_queues
+    
+    invalidate_queues(instance.workspace_id)
+
+
+@receiver(post_save, sender=Task)
+def invalidate_on_task_move(sender, instance, **kwargs):
+    """A task leaving a workspace does not advance that workspace's Max(updated_at) either."""
+    from .queue import invalidate_queues
+    
+    previous = getattr(instance, '_loaded_workspace_id', None)
+    if previous is not None and previous != instance.workspace_id:
+        invalidate_queues(previous)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=TaskDependency)
+@receiver(post_delete, sender=TaskDependency)
+def mark_snapshot_stale(sender, instance, **kwargs):
+    """
+    Ask workers to rebuild the written workspace's backlog snapshot, and
+    advance its revision so queues and search indexes reload changes.
+    
+    Deferred until the write commits: bumped earlier, another worker could
+    rebuild from the pre-commit rows and stamp that snapshot as current.
+    """
+    from .snapshot import mark_stale
+    
+    for workspace_id in _workspaces_of(sender, instance):
+        transaction.on_commit(partial(mark_stale, workspace_id))
+        transaction.on_commit(partial(Workspace.record_change, workspace_id))
+
+
+@receiver(post_save, sender=Task)
+def index_task_title(sender, instance, **kwargs):
+    """Keep this process's search index current without waiting for a refresh."""
+    from .search import get_index
+    
+    get_index().upsert(instance.pk, instance.title, instance.workspace_id)
+
+
+@receiver(post_delete, sender=Task)
+def unindex_task_title(sender, instance, **kwargs):
+    from .search import get_index
+    
+    get_index().remove(instance.pk)
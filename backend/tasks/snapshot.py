@@ -0,0 +1,561 @@
+"""
+Read-only columnar snapshot of the persisted backlog in shared memory.
+
+Every gunicorn worker would otherwise load and score the same backlog on
+its own. Instead, one worker scores the open tasks once and writes them
+into a ``multiprocessing.shared_memory`` segment that every worker
+attaches to and reads through memoryviews, without copying:
+- Task columns: IDs, due dates, importance, hours and titles
+- Component scores and a total score per strategy
+- A precomputed rank order per strategy, so top-k and pages are O(k)
+- The dependency graph in CSR form, in both directions
+
+A small control segment holds the current snapshot version and the
+requested generation behind a seqlock. Task writes bump the generation;
+the next reader that notices rebuilds into a new segment and swaps the
+version, while other readers keep serving the previous snapshot until
+the swap. Snapshots are also rebuilt when the date rolls over.
+
+Each workspace has its own snapshot, control segment and locks, so a
+write only invalidates its own workspace's snapshot and rebuilds for
+different workspaces never wait on each other. Within a process, the
+global lock only guards the per-workspace lock table; a workspace's lock
+guards its process-local state and is never held while a snapshot is
+built. Builds are serialized across processes and threads by a file lock.
+"""
+import bisect
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+from array import array
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from multiprocessing import resource_tracker, shared_memory
+
+from . import explanations
+from .models import Task, TaskDependency, Workspace
+from .scoring import PriorityScorer
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows development machines
+    fcntl = None
+
+
+MAGIC = b'STSN'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sIQQIIIIQ')  # magic, format, version, generation, date, n, m, strategies, blob
+HEADER_SIZE = 64
+CONTROL = struct.Struct('<QQQ')  # seq, version, generation
+STRATEGIES = list(PriorityScorer.STRATEGY_WEIGHTS)
+COMPONENTS = ['urgency', 'importance', 'effort', 'dependencies']
+
+_lock = threading.Lock()  # Guards _workspace_locks only
+_workspace_locks: Dict[int, threading.Lock] = {}
+_current: Dict[int, 'Snapshot'] = {}
+_control: Dict[int, shared_memory.SharedMemory] = {}
+
+
+def _base_name(workspace_id: int) -> str:
+    """Segment name prefix, unique per database and workspace so they never collide."""
+    configured = getattr(settings, 'SHARED_SNAPSHOT', {}).get('NAME')
+    if not configured:
+        database = str(settings.DATABASES['default'].get('NAME'))
+        configured = 'smarttask_' + hashlib.sha1(database.encode('utf-8')).hexdigest()[:10]
+    return f'{configured}_w{workspace_id}'
+
+
+def _untrack(segment: shared_memory.SharedMemory) -> None:
+    """
+    Stop the resource tracker unlinking the segment when this process exits.
+
+    Snapshots must outlive the worker that built or attached them.
+    """
+    try:
+        resource_tracker.unregister(segment._name, 'shared_memory')
+    except Exception:
+        pass
+
+
+def _open_segment(name: str, create: bool = False, size: int = 0) -> shared_memory.SharedMemory:
+    segment = shared_memory.SharedMemory(name=name, create=create, size=size)
+    _untrack(segment)
+    return segment
+
+
+def _unlink_segment(name: str) -> None:
+    """
+    Unlink a segment by name, ignoring segments that are already gone.
+
+    Opened without untracking, because unlink() unregisters it from the
+    resource tracker. Workers still attached keep their mapping.
+    """
+    try:
+        segment = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    segment.close()
+    segment.unlink()
+
+
+def _aligned(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _layout(n: int, m: int, blob_len: int) -> Tuple[Dict[str, Tuple[int, int, str]], int]:
+    """
+    Compute each column's (offset, length, format) from the table sizes.
+
+    Readers and the writer share this, so the header only needs sizes.
+    """
+    columns = [
+        ('ids', n, 'q'),
+        ('due', n, 'i'),
+        ('importance', n, 'i'),
+        ('hours', n, 'd'),
+    ]
+    columns += [(f'component_{name}', n, 'd') for name in COMPONENTS]
+    columns += [(f'score_{name}', n, 'd') for name in STRATEGIES]
+    columns += [(f'order_{name}', n, 'i') for name in STRATEGIES]
+    columns += [
+        ('dep_offsets', n + 1, 'i'),
+        ('dep_targets', m, 'i'),
+        ('rdep_offsets', n + 1, 'i'),
+        ('rdep_targets', m, 'i'),
+        ('title_offsets', n + 1, 'i'),
+        ('titles', blob_len, 'B'),
+    ]
+
+    layout = {}
+    offset = HEADER_SIZE
+    for name, count, fmt in columns:
+        layout[name] = (offset, count, fmt)
+        offset = _aligned(offset + count * struct.calcsize(fmt))
+    return layout, max(offset, HEADER_SIZE)
+
+
+class Snapshot:
+    """
+    Zero-copy view of one snapshot version.
+    """
+
+    def __init__(self, segment: shared_memory.SharedMemory):
+        self._segment = segment
+        (magic, fmt, self.version, self.generation, date_ordinal,
+         self.size, edges, strategies, blob_len) = HEADER.unpack_from(segment.buf, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION or strategies != len(STRATEGIES):
+            raise ValueError(f'Incompatible snapshot segment {segment.name}')
+        self.reference_date = date.fromordinal(date_ordinal)
+
+        layout, _ = _layout(self.size, edges, blob_len)
+        buf = segment.buf
+        self._columns = {
+            name: buf[offset:offset + count * struct.calcsize(fmt)].cast(fmt)
+            for name, (offset, count, fmt) in layout.items()
+        }
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __del__(self):
+        columns = getattr(self, '_columns', {})
+        for view in columns.values():
+            view.release()
+        columns.clear()
+        try:
+            self._segment.close()
+        except (BufferError, AttributeError):
+            pass
+
+    @property
+    def fingerprint(self) -> str:
+        return f'{self._segment.name}:{self.reference_date.isoformat()}'
+
+    def _title(self, index: int) -> str:
+        offsets = self._columns['title_offsets']
+        return bytes(self._columns['titles'][offsets[index]:offsets[index + 1]]).decode('utf-8')
+
+    def _neighbours(self, prefix: str, index: int) -> List[int]:
+        offsets = self._columns[f'{prefix}_offsets']
+        targets = self._columns[f'{prefix}_targets']
+        return [targets[i] for i in range(offsets[index], offsets[index + 1])]
+
+    def dependencies(self, index: int) -> List[int]:
+        """Row indices of the open tasks that row ``index`` depends on."""
+        return self._neighbours('dep', index)
+
+    def dependents(self, index: int) -> List[int]:
+        """Row indices of the open tasks that depend on row ``index``."""
+        return self._neighbours('rdep', index)
+
+    def index_of(self, task_id: int) -> Optional[int]:
+        """Row index of an open task, or None if it is not in this snapshot."""
+        ids = self._columns['ids']
+        index = bisect.bisect_left(ids, task_id)
+        return index if index < self.size and ids[index] == task_id else None
+
+    def score(self, index: int, strategy: str = 'smart_balance') -> float:
+        return round(self._columns[f'score_{strategy}'][index], 3)
+
+    def task(self, index: int, strategy: str = 'smart_balance') -> Dict[str, Any]:
+        """Materialize one row in the same shape analyze_and_sort_tasks returns."""
+        columns = self._columns
+        ids = columns['ids']
+        due = columns['due'][index]
+        components = {name: columns[f'component_{name}'][index] for name in COMPONENTS}
+        score = columns[f'score_{strategy}'][index]
+        due_date = date.fromordinal(due) if due else None
+        importance = columns['importance'][index]
+        hours = columns['hours'][index]
+
+        return {
+            'id': str(ids[index]),
+            'title': self._title(index),
+            'due_date': due_date,
+            'estimated_hours': hours,
+            'importance': importance,
+            'dependencies': [str(ids[i]) for i in self.dependencies(index)],
+            'priority_score': round(score, 3),
+            'component_scores': {name: round(value, 3) for name, value in components.items()},
+            'reasons': explanations.reasons(
+                components['urgency'], components['importance'], components['effort'],
+                components['dependencies'], importance, hours
+            ),
+        }
+
+    def page(self, strategy: str = 'smart_balance', offset: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
+        """Tasks ranked ``offset`` to ``offset + limit`` for ``strategy``."""
+        order = self._columns[f'order_{strategy}']
+        return [self.task(order[rank], strategy) for rank in range(offset, min(offset + limit, self.size))]
+
+    def top(self, strategy: str = 'smart_balance', k: int = 3) -> List[Dict[str, Any]]:
+        return self.page(strategy, 0, k)
+
+    def ranked(self, strategy: str = 'smart_balance') -> Iterator[Tuple[int, float, Optional[date]]]:
+        """Yield (task ID, score, due date) for every row in rank order, without building dicts."""
+        columns = self._columns
+        ids, due, scores = columns['ids'], columns['due'], columns[f'score_{strategy}']
+        for index in columns[f'order_{strategy}']:
+            yield ids[index], scores[index], date.fromordinal(due[index]) if due[index] else None
+
+
+def _build_columns(workspace_id: int, reference_date: date) -> Tuple[Dict[str, array], bytes, int]:
+    """Load and score a workspace's open backlog into column arrays."""
+    tasks = list(
+        Task.objects.filter(workspace_id=workspace_id)
+        .exclude(status=Task.STATUS_DONE)
+        .order_by('id')  # Sorted IDs let readers look rows up by bisection
+        .values_list('id', 'title', 'due_date', 'importance', 'estimated_hours')
+    )
+    index_of = {row[0]: i for i, row in enumerate(tasks)}
+    n = len(tasks)
+
+    edges = [
+        (index_of[task_id], index_of[depends_on_id])
+        for task_id, depends_on_id in TaskDependency.objects.filter(
+            task_id__in=list(index_of), depends_on_id__in=list(index_of)
+        ).values_list('task_id', 'depends_on_id')
+    ]
+
+    def csr(pairs):
+        offsets = array('i', [0] * (n + 1))
+        for source, _ in pairs:
+            offsets[source + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+        targets = array('i', [0] * len(pairs))
+        cursor = array('i', offsets[:n])
+        for source, target in pairs:
+            targets[cursor[source]] = target
+            cursor[source] += 1
+        return offsets, targets
+
+    dep_offsets, dep_targets = csr(edges)
+    rdep_offsets, rdep_targets = csr([(target, source) for source, target in edges])
+
+    columns = {
+        'ids': array('q', (row[0] for row in tasks)),
+        'due': array('i', (row[2].toordinal() if row[2] else 0 for row in tasks)),
+        'importance': array('i', (row[3] for row in tasks)),
+        'hours': array('d', (row[4] for row in tasks)),
+        'dep_offsets': dep_offsets,
+        'dep_targets': dep_targets,
+        'rdep_offsets': rdep_offsets,
+        'rdep_targets': rdep_targets,
+    }
+
+    components = {name: array('d', [0.0] * n) for name in COMPONENTS}
+    for i, (_, _, due_date, importance, hours) in enumerate(tasks):
+        components['urgency'][i] = PriorityScorer.calculate_urgency_score(due_date, reference_date)
+        components['importance'][i] = PriorityScorer.calculate_importance_score(importance)
+        components['effort'][i] = PriorityScorer.calculate_effort_score(hours)
+        components['dependencies'][i] = PriorityScorer._dependency_score_for_count(
+            rdep_offsets[i + 1] - rdep_offsets[i]
+        )
+    for name in COMPONENTS:
+        columns[f'component_{name}'] = components[name]
+
+    for strategy in STRATEGIES:
+        w = PriorityScorer.STRATEGY_WEIGHTS[strategy]
+        # Same summation order and rounding as calculate_priority_score
+        scores = array('d', (
+            round(
+                components['urgency'][i] * w['urgency'] +
+                components['importance'][i] * w['importance'] +
+                components['effort'][i] * w['effort'] +
+                components['dependencies'][i] * w['dependencies'],
+                3
+            )
+            for i in range(n)
+        ))
+        columns[f'score_{strategy}'] = scores
+        columns[f'order_{strategy}'] = array('i', sorted(range(n), key=lambda i: scores[i], reverse=True))
+
+    titles = bytearray()
+    title_offsets = array('i', [0])
+    for row in tasks:
+        titles += row[1].encode('utf-8')
+        title_offsets.append(len(titles))
+    columns['title_offsets'] = title_offsets
+
+    return columns, bytes(titles), len(edges)
+
+
+def _write_segment(
+    workspace_id: int, version: int, generation: int, reference_date: date
+) -> shared_memory.SharedMemory:
+    """Build a workspace's snapshot and write it into a new segment for ``version``."""
+    columns, titles, m = _build_columns(workspace_id, reference_date)
+    n = len(columns['ids'])
+    layout, size = _layout(n, m, len(titles))
+
+    name = f'{_base_name(workspace_id)}_{version}'
+    try:
+        segment = _open_segment(name, create=True, size=size)
+    except FileExistsError:
+        # Left over from an earlier run whose control segment was lost
+        _unlink_segment(name)
+        segment = _open_segment(name, create=True, size=size)
+
+    HEADER.pack_into(
+        segment.buf, 0, MAGIC, FORMAT_VERSION, version, generation,
+        reference_date.toordinal(), n, m, len(STRATEGIES), len(titles)
+    )
+    for column, (offset, count, fmt) in layout.items():
+        data = titles if column == 'titles' else columns[column].tobytes()
+        segment.buf[offset:offset + len(data)] = data
+    return segment
+
+
+def _workspace_lock(workspace_id: int) -> threading.Lock:
+    """The lock guarding this process's state for one workspace."""
+    with _lock:
+        if workspace_id not in _workspace_locks:
+            _workspace_locks[workspace_id] = threading.Lock()
+        return _workspace_locks[workspace_id]
+
+
+def _control_segment(workspace_id: int, create: bool) -> Optional[shared_memory.SharedMemory]:
+    """This process's handle on a workspace's control segment; callers hold its workspace lock."""
+    if workspace_id not in _control:
+        name = f'{_base_name(workspace_id)}_ctl'
+        try:
+            control = _open_segment(name)
+        except FileNotFoundError:
+            if not create:
+                return None
+            try:
+                control = _open_segment(name, create=True, size=CONTROL.size)
+                CONTROL.pack_into(control.buf, 0, 0, 0, 0)
+            except FileExistsError:
+                control = _open_segment(name)
+        _control[workspace_id] = control
+    return _control[workspace_id]
+
+
+def _read_control(control: shared_memory.SharedMemory) -> Tuple[int, int]:
+    """Read (version, generation) consistently using the seqlock."""
+    while True:
+        seq, version, generation = CONTROL.unpack_from(control.buf, 0)
+        if seq % 2 == 0 and CONTROL.unpack_from(control.buf, 0)[0] == seq:
+            return version, generation
+
+
+def _write_control(control: shared_memory.SharedMemory, version: int, generation: int) -> None:
+    """Publish (version, generation); callers hold the control lock."""
+    seq = CONTROL.unpack_from(control.buf, 0)[0]
+    struct.pack_into('<Q', control.buf, 0, seq + 1)
+    struct.pack_into('<QQ', control.buf, 8, version, generation)
+    struct.pack_into('<Q', control.buf, 0, seq + 2)
+
+
+class _FileLock:
+    """
+    Host-wide lock on one workspace's snapshot, shared by all workers.
+
+    ``build`` serializes rebuilds; ``control`` guards control segment
+    writes and is only ever held briefly. Every holder opens its own
+    descriptor, so threads of one process exclude each other too. Without
+    fcntl, a process-local lock stands in.
+    """
+
+    _local: Dict[Tuple[int, str], threading.Lock] = {}
+
+    def __init__(self, workspace_id: int, purpose: str, blocking: bool = True):
+        self.workspace_id = workspace_id
+        self.purpose = purpose
+        self.blocking = blocking
+        self.fd = None
+        self.local = None
+
+    def __enter__(self) -> bool:
+        if fcntl is None:
+            with _lock:
+                self.local = self._local.setdefault((self.workspace_id, self.purpose), threading.Lock())
+            if self.local.acquire(blocking=self.blocking):
+                return True
+            self.local = None
+            return False
+        path = os.path.join(tempfile.gettempdir(), f'{_base_name(self.workspace_id)}.{self.purpose}.lock')
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        flags = fcntl.LOCK_EX if self.blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        try:
+            fcntl.flock(self.fd, flags)
+            return True
+        except OSError:
+            os.close(self.fd)
+            self.fd = None
+            return False
+
+    def __exit__(self, *exc):
+        if self.fd is not None:
+            os.close(self.fd)
+        if self.local is not None:
+            self.local.release()
+
+
+def _attach(workspace_id: int, version: int) -> Optional[Snapshot]:
+    if not version:
+        return None
+    try:
+        return Snapshot(_open_segment(f'{_base_name(workspace_id)}_{version}'))
+    except FileNotFoundError:
+        return None  # Swapped and unlinked since the control was read
+
+
+def _is_fresh(snapshot: Optional[Snapshot], generation: int) -> bool:
+    return (
+        snapshot is not None
+        and snapshot.generation >= generation
+        and snapshot.reference_date == date.today()
+    )
+
+
+def _rebuild(workspace_id: int, control: shared_memory.SharedMemory, blocking: bool) -> Optional[Snapshot]:
+    """Rebuild under the workspace's build lock and swap the published version."""
+    with _FileLock(workspace_id, 'build', blocking) as acquired:
+        if not acquired:
+            return None
+        version, generation = _read_control(control)
+        current = _attach(workspace_id, version)
+        if _is_fresh(current, generation):
+            return current  # Another worker rebuilt while we waited
+
+        segment = _write_segment(workspace_id, version + 1, generation, date.today())
+        with _FileLock(workspace_id, 'control'):
+            # Keep any generation bumped during the build, so the new
+            # snapshot is seen as stale if tasks changed meanwhile
+            _, latest_generation = _read_control(control)
+            _write_control(control, version + 1, latest_generation)
+        if version:
+            _unlink_segment(f'{_base_name(workspace_id)}_{version}')
+        return Snapshot(segment)
+
+
+def get_snapshot(workspace_id: int = Workspace.DEFAULT_ID) -> Snapshot:
+    """
+    Return a current snapshot of a workspace's open backlog, rebuilding if stale.
+
+    When a snapshot exists but is stale and another worker or thread is
+    already rebuilding, the existing snapshot is served until the swap.
+    """
+    lock = _workspace_lock(workspace_id)
+    with lock:
+        control = _control_segment(workspace_id, create=True)
+        version, generation = _read_control(control)
+        current = _current.get(workspace_id)
+        if current is None or current.version != version:
+            attached = _attach(workspace_id, version)
+            if attached is not None:
+                current = _current[workspace_id] = attached
+
+    if _is_fresh(current, generation):
+        return current
+
+    rebuilt = _rebuild(workspace_id, control, blocking=current is None)
+    if rebuilt is None:
+        return current
+    with lock:
+        # Keep a newer snapshot another thread may have swapped in meanwhile
+        latest = _current.get(workspace_id)
+        if latest is None or latest.version < rebuilt.version:
+            _current[workspace_id] = rebuilt
+        return _current[workspace_id]
+
+
+def current_generation(workspace_id: int = Workspace.DEFAULT_ID) -> int:
+    """
+    Published generation of a workspace's backlog; it advances on every
+    write to the workspace's tasks.
+
+    A lock-free read of shared memory, cheap enough to poll. Returns 0
+    until some worker has built the workspace's snapshot.
+    """
+    with _workspace_lock(workspace_id):
+        control = _control_segment(workspace_id, create=False)
+        if control is None:
+            return 0
+    return _read_control(control)[1]
+
+
+def mark_stale(workspace_id: int = Workspace.DEFAULT_ID) -> None:
+    """
+    Request a rebuild of a workspace's snapshot after its tasks change.
+
+    Other workspaces' snapshots are unaffected. A no-op until some
+    worker has built the workspace's snapshot.
+    """
+    with _workspace_lock(workspace_id):
+        control = _control_segment(workspace_id, create=False)
+        if control is None:
+            return
+    with _FileLock(workspace_id, 'control'):
+        version, generation = _read_control(control)
+        _write_control(control, version, generation + 1)
+
+
+def destroy(workspace_id: Optional[int] = None) -> None:
+    """
+    Unlink a workspace's segments (used by tests and teardown).
+
+    Without ``workspace_id``, destroys every workspace's snapshot.
+    """
+    if workspace_id is None:
+        workspace_ids = set(_control) | set(Workspace.objects.values_list('pk', flat=True))
+    else:
+        workspace_ids = {workspace_id}
+
+    for workspace_id in workspace_ids:
+        with _workspace_lock(workspace_id):
+            control = _control_segment(workspace_id, create=False)
+            if control is not None:
+                version, _ = _read_control(control)
+                control.close()
+                _unlink_segment(f'{_base_name(workspace_id)}_{version}')
+                _unlink_segment(f'{_base_name(workspace_id)}_ctl')
+            _current.pop(workspace_id, None)
+            _control.pop(workspace_id, None)
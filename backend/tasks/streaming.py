@@ -0,0 +1,170 @@
+"""
+Fixed-memory sketches for scoring task streams too large to hold in memory.
+
+Dependency scores need to know how many tasks depend on each task, which
+normally means keeping the whole task list around. Streaming mode instead
+makes two passes over the input:
+1. Count dependents approximately into a CountMinSketch, tracking the
+   most depended-on tasks alongside it
+2. Score each task as it streams past, keeping only a bounded top-k heap
+
+Error bounds:
+- Estimates never undercount. With width ``ceil(e / epsilon)`` and depth
+  ``ceil(ln(1 / delta))``, an estimate exceeds the true count by more
+  than ``epsilon * N`` with probability at most ``delta``, where N is
+  the total number of dependency edges in the stream.
+- Dependency scores saturate at 3 dependents, so an error only changes a
+  score when it pushes a count of 0-2 across a threshold. Scores are
+  therefore never lower than the exact score and differ only when the
+  overcount exceeds the gap to the next threshold.
+
+Memory is fixed by the parameters and does not grow with the input:
+roughly ``8 * width * depth`` bytes for the sketch plus ``capacity``
+heavy-hitter entries plus the ``k`` tasks kept in the heap.
+"""
+import hashlib
+import heapq
+import math
+from array import array
+from typing import Any, Dict, Hashable, List, Tuple
+
+
+class CountMinSketch:
+    """
+    Approximate frequency counts in a fixed ``depth x width`` counter table.
+    """
+
+    def __init__(self, width: int, depth: int):
+        if width < 1 or depth < 1:
+            raise ValueError('width and depth must be positive')
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self._rows = [array('Q', bytes(8 * width)) for _ in range(depth)]
+
+    @classmethod
+    def from_error_bounds(cls, epsilon: float, delta: float) -> 'CountMinSketch':
+        """
+        Size a sketch for additive error ``epsilon * N`` with failure
+        probability ``delta``.
+        """
+        if not 0 < epsilon < 1 or not 0 < delta < 1:
+            raise ValueError('epsilon and delta must be between 0 and 1')
+        return cls(math.ceil(math.e / epsilon), math.ceil(math.log(1 / delta)))
+
+    def _columns(self, key: Hashable) -> List[int]:
+        # Double hashing: one digest yields an independent-enough column per row
+        digest = hashlib.blake2b(repr(key).encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, key: Hashable, count: int = 1) -> int:
+        """Add ``count`` occurrences of ``key`` and return its new estimate."""
+        self.total += count
+        estimate = None
+        for row, column in zip(self._rows, self._columns(key)):
+            row[column] += count
+            if estimate is None or row[column] < estimate:
+                estimate = row[column]
+        return estimate
+
+    def estimate(self, key: Hashable) -> int:
+        """Estimated count for ``key``; never lower than the true count."""
+        return min(row[column] for row, column in zip(self._rows, self._columns(key)))
+
+    @property
+    def memory_bytes(self) -> int:
+        return 8 * self.width * self.depth
+
+
+class HeavyHitters:
+    """
+    Track the ``capacity`` keys with the largest count-min estimates.
+
+    Uses a min-heap with lazy deletion, so checking whether a key belongs
+    in the table is O(1) and updates are O(log capacity) amortized.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError('capacity must be positive')
+        self.capacity = capacity
+        self.counts: Dict[Hashable, int] = {}
+        self._heap: List[Tuple[int, int, Hashable]] = []
+        self._sequence = 0  # Tie-breaker so keys are never compared
+
+    def _push(self, key: Hashable, count: int) -> None:
+        self._sequence += 1
+        heapq.heappush(self._heap, (count, self._sequence, key))
+
+    def _pop_stale(self) -> None:
+        # Drop heap entries superseded by a newer count or an eviction
+        while self._heap and self.counts.get(self._heap[0][2]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def offer(self, key: Hashable, count: int) -> None:
+        """Record that ``key`` now has estimated count ``count``."""
+        if key in self.counts:
+            self.counts[key] = count
+            self._push(key, count)
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = count
+            self._push(key, count)
+        else:
+            self._pop_stale()
+            if count > self._heap[0][0]:
+                _, _, evicted = heapq.heappop(self._heap)
+                del self.counts[evicted]
+                self.counts[key] = count
+                self._push(key, count)
+
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, i, k) for c, i, k in self._heap if self.counts.get(k) == c]
+            heapq.heapify(self._heap)
+
+    def top(self, n: int) -> List[Tuple[Hashable, int]]:
+        """The ``n`` keys with the highest estimated counts."""
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:n]
+
+
+class DependentsSketch:
+    """
+    Approximate dependents counts for the first pass of streaming mode.
+    """
+
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.01, heavy_hitters: int = 100):
+        self.epsilon = epsilon
+        self.delta = delta
+        self.sketch = CountMinSketch.from_error_bounds(epsilon, delta)
+        self.heavy = HeavyHitters(heavy_hitters)
+        self.tasks_seen = 0
+
+    def add_task(self, task: Dict[str, Any]) -> None:
+        """Count one dependent for each distinct ID this task depends on."""
+        self.tasks_seen += 1
+        deps = task.get('dependencies', [])
+        if not isinstance(deps, list):
+            return
+        for dep in set(deps):
+            self.heavy.offer(dep, self.sketch.add(dep))
+
+    def estimate(self, task_id: Hashable) -> int:
+        """Upper-bound estimate of how many tasks depend on ``task_id``."""
+        return self.sketch.estimate(task_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Sizing and error bounds for reporting alongside results."""
+        return {
+            'width': self.sketch.width,
+            'depth': self.sketch.depth,
+            'epsilon': self.epsilon,
+            'delta': self.delta,
+            'edges_counted': self.sketch.total,
+            'tasks_seen': self.tasks_seen,
+            'max_overcount': math.floor(self.epsilon * self.sketch.total),
+            'sketch_bytes': self.sketch.memory_bytes,
+            'heavy_hitters': [
+                {'id': key, 'dependents': count} for key, count in self.heavy.top(10)
+            ],
+        }
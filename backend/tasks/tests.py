@@ -1,9 +1,27 @@
 """
 Unit tests for the priority scoring algorithm.
 """
-from django.test import TestCase
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from unittest import mock
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
 from datetime import date, timedelta
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from tasks import (
+    admission, backends, capture, conformance, explanations, graph, history, jobs, memprofile, push, queue,
+    search, snapshot, warmup
+)
+from tasks.models import AnalysisJob, DailyBacklogSummary, ScoreSample, Task, TaskDependency, Workspace
 from tasks.scoring import PriorityScorer
+from tasks.serializers import TaskAnalyzeSerializer
+from tasks.streaming import CountMinSketch, DependentsSketch
 
 
 class PriorityScoringTests(TestCase):
@@ -107,7 +125,8 @@ class PriorityScoringTests(TestCase):
         # Should have all required fields
         self.assertIn('priority_score', result)
         self.assertIn('component_scores', result)
-        self.assertIn('explanation', result)
+        self.assertIn('reasons', result)
+        self.assertNotIn('explanation', result)
         
         # Priority score should be positive
         self.assertGreater(result['priority_score'], 0)
@@ -174,3 +193,1537 @@ class PriorityScoringTests(TestCase):
         self.assertEqual(len(result['tasks']), 1)
         self.assertIn('priority_score', result['tasks'][0])
 
+
+
+class AdmissionControlTests(TestCase):
+    """
+    Test suite for admission control of heavy analyses.
+    """
+    
+    def setUp(self):
+        admission.reset_stats()
+        self.lock_dir = tempfile.mkdtemp()
+    
+    def _payload(self, count):
+        return json.dumps({
+            'tasks': [
+                {'title': f'Task {i}', 'estimated_hours': 1, 'importance': 5}
+                for i in range(count)
+            ]
+        })
+    
+    def test_classify_by_task_count(self):
+        """Test that analyses above the threshold are heavy."""
+        with override_settings(ADMISSION_CONTROL={'HEAVY_TASK_THRESHOLD': 2}):
+            self.assertEqual(admission.classify(2), admission.LIGHT)
+            self.assertEqual(admission.classify(3), admission.HEAVY)
+    
+    def test_oversized_body_rejected(self):
+        """Test that bodies over the limit get 413 before parsing."""
+        with override_settings(ADMISSION_CONTROL={'MAX_BODY_BYTES': 50}):
+            response = self.client.post(
+                '/api/tasks/analyze/', self._payload(5), content_type='application/json'
+            )
+        
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(admission.get_stats()['counters']['rejected_body_too_large'], 1)
+    
+    @override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=100, ADMISSION_CONTROL={'MAX_BODY_BYTES': 10_000})
+    def test_body_limit_capped_at_upload_limit(self):
+        """Test that bodies Django would refuse to read get 413 rather than 500."""
+        self.assertEqual(admission.get_config()['MAX_BODY_BYTES'], 100)
+        response = self.client.post('/api/tasks/analyze/', self._payload(5), content_type='application/json')
+        
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.json()['max_bytes'], 100)
+    
+    def test_heavy_over_budget_gets_429(self):
+        """Test that heavy analyses over the process budget get a fast 429."""
+        config = {
+            'HEAVY_TASK_THRESHOLD': 2,
+            'MAX_HEAVY_PER_PROCESS': 1,
+            'RETRY_AFTER_SECONDS': 7,
+            'LOCK_DIR': self.lock_dir,
+        }
+        with override_settings(ADMISSION_CONTROL=config):
+            with admission.admit(10):
+                response = self.client.post(
+                    '/api/tasks/analyze/', self._payload(5), content_type='application/json'
+                )
+            
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response['Retry-After'], '7')
+            
+            # Light analyses are still served while heavy slots are busy
+            with admission.admit(10):
+                response = self.client.post(
+                    '/api/tasks/analyze/', self._payload(2), content_type='application/json'
+                )
+            self.assertEqual(response.status_code, 200)
+        
+        counters = admission.get_stats()['counters']
+        self.assertEqual(counters['rejected_process_budget'], 1)
+        self.assertEqual(counters['admitted_heavy'], 2)
+    
+    def test_heavy_analyses_admitted_before_validation(self):
+        """Test that heavy analyses over budget are rejected without validating their tasks."""
+        config = {'HEAVY_TASK_THRESHOLD': 2, 'MAX_HEAVY_PER_PROCESS': 1, 'LOCK_DIR': self.lock_dir}
+        with override_settings(ADMISSION_CONTROL=config):
+            with admission.admit(10), mock.patch.object(TaskAnalyzeSerializer, 'is_valid') as is_valid:
+                response = self.client.post(
+                    '/api/tasks/analyze/', self._payload(5), content_type='application/json'
+                )
+            self.assertEqual(response.status_code, 429)
+            is_valid.assert_not_called()
+            
+            # Malformed bodies are left for validation
+            self.assertEqual(admission.task_count({'tasks': 'many'}), 0)
+            response = self.client.post(
+                '/api/tasks/analyze/', json.dumps(['not', 'an', 'object']), content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 400)
+    
+    def test_host_budget_shared_across_slots(self):
+        """Test that the host-wide budget limits heavy analyses."""
+        config = {
+            'HEAVY_TASK_THRESHOLD': 0,
+            'MAX_HEAVY_PER_PROCESS': 5,
+            'MAX_HEAVY_PER_HOST': 1,
+            'LOCK_DIR': self.lock_dir,
+        }
+        if admission.fcntl is None:
+            self.skipTest('File locks unavailable on this platform')
+        
+        with override_settings(ADMISSION_CONTROL=config):
+            with admission.admit(1):
+                with self.assertRaises(admission.AdmissionRejected) as ctx:
+                    with admission.admit(1):
+                        pass
+            self.assertEqual(ctx.exception.reason, 'host_budget')
+            
+            # Slot is released once the first analysis finishes
+            with admission.admit(1):
+                pass
+
+
+class AnalysisJobTests(TestCase):
+    """
+    Test suite for asynchronous analysis jobs.
+    """
+    
+    def _submit(self, **extra):
+        body = {
+            'tasks': [
+                {'id': 'a', 'title': 'Task A', 'estimated_hours': 1, 'importance': 9},
+                {'id': 'b', 'title': 'Task B', 'estimated_hours': 8, 'importance': 2},
+            ],
+            **extra
+        }
+        return self.client.post('/api/tasks/jobs/', json.dumps(body), content_type='application/json')
+    
+    def test_submit_run_and_poll(self):
+        """Test that a submitted job can be executed and its result polled."""
+        response = self._submit()
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()['id']
+        self.assertEqual(response.json()['status'], AnalysisJob.STATUS_QUEUED)
+        self.assertNotIn('result', response.json())
+        
+        job = jobs.claim_next_job()
+        self.assertEqual(str(job.id), job_id)
+        jobs.execute_job(job.id)
+        
+        data = self.client.get(f'/api/tasks/jobs/{job_id}/').json()
+        self.assertEqual(data['status'], AnalysisJob.STATUS_SUCCEEDED)
+        self.assertEqual(data['progress'], 1.0)
+        self.assertEqual(data['result']['tasks'][0]['id'], 'a')
+    
+    def test_sweep_job_scores_every_strategy(self):
+        """Test that sweep jobs return one analysis per strategy."""
+        response = self._submit(kind='sweep', strategies=['fastest_wins', 'high_impact'])
+        jobs.execute_job(jobs.claim_next_job().id)
+        
+        job = AnalysisJob.objects.get(id=response.json()['id'])
+        self.assertEqual(set(job.result['strategies']), {'fastest_wins', 'high_impact'})
+    
+    def test_identical_submissions_deduplicated(self):
+        """Test that identical submissions share one job."""
+        first = self._submit().json()
+        second = self._submit().json()
+        other = self._submit(strategy='high_impact').json()
+        
+        self.assertEqual(first['id'], second['id'])
+        self.assertTrue(second['deduplicated'])
+        self.assertNotEqual(first['id'], other['id'])
+    
+    def test_expired_job_gone_and_not_reused(self):
+        """Test that expired results return 410 and are not deduplicated against."""
+        job_id = self._submit().json()['id']
+        with override_settings(ANALYSIS_JOBS={'RESULT_TTL_SECONDS': -1}):
+            jobs.execute_job(jobs.claim_next_job().id)
+        
+        self.assertEqual(self.client.get(f'/api/tasks/jobs/{job_id}/').status_code, 410)
+        self.assertNotEqual(self._submit().json()['id'], job_id)
+        self.assertEqual(jobs.purge_expired_jobs(), 1)
+    
+    def _age(self, job_id, seconds):
+        """Backdate a job's lease."""
+        AnalysisJob.objects.filter(id=job_id).update(started_at=timezone.now() - timedelta(seconds=seconds))
+    
+    def test_stale_running_job_failed_and_not_reused(self):
+        """Test that a running job past its lease is failed and a resubmission gets a new job."""
+        job_id = self._submit().json()['id']
+        jobs.claim_next_job()
+        self.assertEqual(self._submit().json()['id'], job_id)
+        
+        with override_settings(ANALYSIS_JOBS={'RUNNING_TIMEOUT_SECONDS': 60}):
+            self._age(job_id, 30)
+            self.assertEqual(self._submit().json()['id'], job_id)
+            self._age(job_id, 120)
+            resubmitted = self._submit().json()
+            self.assertNotEqual(resubmitted['id'], job_id)
+            self.assertEqual(str(jobs.claim_next_job().id), resubmitted['id'])
+            self.assertEqual(AnalysisJob.objects.get(id=job_id).status, AnalysisJob.STATUS_RUNNING)
+            
+            # Stale jobs are failed by housekeeping, not on every claim poll
+            with mock.patch.object(history, 'record_pending'):
+                jobs.run_housekeeping()
+        
+        job = AnalysisJob.objects.get(id=job_id)
+        self.assertEqual(job.status, AnalysisJob.STATUS_FAILED)
+        self.assertIn('60 seconds', job.error)
+        self.assertIsNotNone(job.expires_at)
+    
+    def test_late_result_does_not_revive_failed_job(self):
+        """Test that a worker finishing after its lease ran out leaves the job failed."""
+        job_id = self._submit().json()['id']
+        jobs.claim_next_job()
+        with override_settings(ANALYSIS_JOBS={'RUNNING_TIMEOUT_SECONDS': 60}):
+            self._age(job_id, 120)
+            jobs.fail_stale_jobs()
+        jobs.execute_job(job_id)
+        
+        job = AnalysisJob.objects.get(id=job_id)
+        self.assertEqual(job.status, AnalysisJob.STATUS_FAILED)
+        self.assertIsNone(job.result)
+    
+    def test_worker_pool_runs_queued_jobs(self):
+        """Test that the worker pool claims, runs and finishes queued jobs."""
+        first = self._submit().json()['id']
+        second = self._submit(kind='sweep', strategies=['deadline_driven']).json()['id']
+        
+        class InlineExecutor:
+            """Runs submissions in this process, where the test database lives."""
+            def __init__(self, max_workers, initializer):
+                pass
+            
+            def __enter__(self):
+                return self
+            
+            def __exit__(self, *exc_info):
+                return False
+            
+            def submit(self, fn, *args):
+                future = Future()
+                future.set_result(fn(*args))
+                return future
+        
+        with mock.patch.object(jobs, 'ProcessPoolExecutor', InlineExecutor), \
+                mock.patch.object(jobs, 'run_housekeeping') as housekeeping:
+            dispatched = jobs.JobWorkerPool(workers=1, poll_interval=0.01).run(max_jobs=2)
+        
+        self.assertEqual(dispatched, 2)
+        housekeeping.assert_called_once_with()
+        for job_id in (first, second):
+            self.assertEqual(AnalysisJob.objects.get(id=job_id).status, AnalysisJob.STATUS_SUCCEEDED)
+
+
+class ForecastTests(TestCase):
+    """
+    Test suite for multi-date urgency forecasts.
+    """
+    
+    def _tasks(self, start):
+        return [
+            {'id': 'soon', 'title': 'Soon', 'due_date': str(start + timedelta(days=3)),
+             'estimated_hours': 6, 'importance': 4, 'dependencies': []},
+            {'id': 'later', 'title': 'Later', 'due_date': str(start + timedelta(days=10)),
+             'estimated_hours': 1, 'importance': 6, 'dependencies': ['soon']},
+            {'id': 'undated', 'title': 'Undated', 'estimated_hours': 2, 'importance': 7},
+        ]
+    
+    def test_forecast_matches_daily_analysis(self):
+        """Test that every forecast day matches a full analysis on that date."""
+        start = date(2025, 3, 1)
+        forecast = PriorityScorer.forecast_scores(self._tasks(start), days=12, start_date=start)
+        
+        for day_index, day in enumerate(forecast['dates']):
+            result = PriorityScorer.analyze_and_sort_tasks(
+                self._tasks(start), current_date=date.fromisoformat(day)
+            )
+            for rank, scored in enumerate(result['tasks'], 1):
+                series = next(t for t in forecast['tasks'] if t['id'] == scored['id'])
+                self.assertEqual(series['scores'][day_index], scored['priority_score'])
+                self.assertEqual(series['ranks'][day_index], rank)
+    
+    def test_forecast_reports_overtakes(self):
+        """Test that tasks moving ahead of others are reported."""
+        start = date(2025, 3, 1)
+        tasks = [
+            {'id': 'quick_win', 'title': 'Quick win', 'estimated_hours': 1, 'importance': 10},
+            {'id': 'slipping', 'title': 'Slipping', 'due_date': str(start + timedelta(days=5)),
+             'estimated_hours': 8, 'importance': 1},
+        ]
+        forecast = PriorityScorer.forecast_scores(tasks, days=12, start_date=start)
+        
+        self.assertEqual(forecast['overtakes'], [
+            {'date': str(start + timedelta(days=9)), 'task': 'slipping', 'overtook': 'quick_win'}
+        ])
+    
+    def test_forecast_endpoint(self):
+        """Test the forecast API endpoint."""
+        body = {'tasks': self._tasks(date.today()), 'days': 5}
+        for task in body['tasks']:
+            task.setdefault('dependencies', [])
+        response = self.client.post('/api/tasks/forecast/', json.dumps(body), content_type='application/json')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['dates']), 5)
+        self.assertEqual(len(response.json()['tasks'][0]['ranks']), 5)
+
+
+class SuggestConditionalGetTests(TestCase):
+    """
+    Test suite for ETag and If-None-Match handling on suggestions.
+    """
+    
+    def test_get_returns_strong_etag_and_cache_control(self):
+        """Test that GET suggestions carry caching headers."""
+        response = self.client.get('/api/tasks/suggest/')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('max-age=', response['Cache-Control'])
+    
+    def test_matching_etag_returns_304_without_scoring(self):
+        """Test that revalidation with a matching ETag skips the scorer."""
+        etag = self.client.get('/api/tasks/suggest/?strategy=high_impact')['ETag']
+        
+        with mock.patch.object(PriorityScorer, 'analyze_and_sort_tasks') as analyze:
+            response = self.client.get(
+                '/api/tasks/suggest/?strategy=high_impact', HTTP_IF_NONE_MATCH=etag
+            )
+        
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        analyze.assert_not_called()
+    
+    def test_etag_changes_with_strategy_and_date(self):
+        """Test that the ETag reflects the strategy and reference date."""
+        etag = self.client.get('/api/tasks/suggest/')['ETag']
+        
+        response = self.client.get('/api/tasks/suggest/?strategy=fastest_wins', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        
+        tomorrow = date.today() + timedelta(days=1)
+        with mock.patch('tasks.views.date') as mock_date:
+            mock_date.today.return_value = tomorrow
+            response = self.client.get('/api/tasks/suggest/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class DependencyGraphTests(TestCase):
+    """
+    Test suite for the persisted dependency edge table.
+    """
+    
+    def setUp(self):
+        # c depends on b, b depends on a, d depends on a
+        self.a, self.b, self.c, self.d = [
+            Task.objects.create(title=title, estimated_hours=1, importance=5)
+            for title in 'abcd'
+        ]
+        TaskDependency.objects.create(task=self.b, depends_on=self.a)
+        TaskDependency.objects.create(task=self.c, depends_on=self.b)
+        TaskDependency.objects.create(task=self.d, depends_on=self.a)
+    
+    def test_dependents_counts(self):
+        """Test that dependents are counted per task."""
+        counts = graph.dependents_counts([self.a.pk, self.b.pk, self.c.pk])
+        self.assertEqual(counts, {self.a.pk: 2, self.b.pk: 1})
+    
+    def test_neighbourhood_is_one_hop(self):
+        """Test that the neighbourhood covers direct edges only."""
+        neighbourhood = graph.load_neighbourhood([self.b.pk])
+        self.assertEqual(neighbourhood['task_ids'], {self.a.pk, self.b.pk, self.c.pk})
+    
+    def test_cycle_rejected_at_write_time(self):
+        """Test that an edge closing a cycle fails validation."""
+        self.assertTrue(graph.would_create_cycle(self.a.pk, self.c.pk))
+        self.assertFalse(graph.would_create_cycle(self.c.pk, self.d.pk))
+        
+        with self.assertRaises(ValidationError):
+            TaskDependency(task=self.a, depends_on=self.c).clean()
+        with self.assertRaises(ValidationError):
+            TaskDependency(task=self.a, depends_on=self.a).clean()
+        TaskDependency(task=self.c, depends_on=self.d).clean()
+    
+    def test_cycle_rejected_on_save(self):
+        """Test that saving an edge that closes a cycle fails even without clean()."""
+        with self.assertRaisesMessage(ValidationError, 'a -> c -> b -> a'):
+            TaskDependency.objects.create(task=self.a, depends_on=self.c)
+        self.assertFalse(TaskDependency.objects.filter(task=self.a).exists())
+        
+        TaskDependency.objects.create(task=self.c, depends_on=self.d)
+        self.assertEqual(TaskDependency.objects.count(), 4)
+    
+    def test_find_cycle_reports_path(self):
+        """Test that the rejected edge's cycle is reported in order, with titles."""
+        cycle = graph.find_cycle(self.a.pk, self.c.pk)
+        self.assertEqual(cycle, [self.a.pk, self.c.pk, self.b.pk, self.a.pk])
+        self.assertEqual(graph.describe_cycle(cycle), 'a -> c -> b -> a')
+        self.assertIsNone(graph.find_cycle(self.d.pk, self.b.pk))
+        
+        with self.assertRaisesMessage(ValidationError, 'a -> c -> b -> a'):
+            TaskDependency(task=self.a, depends_on=self.c).clean()
+        with self.assertRaisesMessage(ValidationError, 'circular dependency'), transaction.atomic():
+            self.c.dependents.add(self.a)
+        self.assertFalse(TaskDependency.objects.filter(task=self.a, depends_on=self.c).exists())
+    
+    def test_cycle_check_searches_smaller_side(self):
+        """Test that the check's cost follows the smaller region, not the backlog."""
+        chain = [Task.objects.create(title=f'step {i}', estimated_hours=1, importance=5) for i in range(30)]
+        TaskDependency.objects.bulk_create(
+            TaskDependency(task=later, depends_on=earlier) for earlier, later in zip(chain, chain[1:])
+        )
+        leaf = Task.objects.create(title='leaf', estimated_hours=1, importance=5)
+        
+        # Nothing depends on the leaf, so the downstream side ends at once
+        with self.assertNumQueries(2):
+            self.assertIsNone(graph.find_cycle(leaf.pk, chain[-1].pk))
+        # Closing the chain walks it once
+        self.assertEqual(len(graph.find_cycle(chain[0].pk, chain[-1].pk)), 31)
+    
+    def test_api_rejects_edges_closing_cycles(self):
+        """Test task create and update through the API."""
+        response = self.client.post(
+            '/api/tasks/', {'title': 'e', 'estimated_hours': 2, 'importance': 6, 'dependencies': [self.c.pk]},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+        e = response.json()
+        self.assertEqual(e['dependencies'], [self.c.pk])
+        
+        response = self.client.patch(
+            f'/api/tasks/{self.a.pk}/', {'title': 'a2', 'dependencies': [e['id']]},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['cycle'], [self.a.pk, e['id'], self.c.pk, self.b.pk, self.a.pk])
+        self.a.refresh_from_db()
+        self.assertEqual((self.a.title, self.a.dependencies.count()), ('a', 0))
+        
+        # Dropping b's edge to a in the same update breaks the cycle
+        response = self.client.patch(
+            f'/api/tasks/{self.b.pk}/', {'dependencies': []}, content_type='application/json'
+        )
+        self.assertEqual(response.json()['dependencies'], [])
+        response = self.client.patch(
+            f'/api/tasks/{self.a.pk}/', {'dependencies': [e['id']]}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        
+        for body in [{'dependencies': [self.a.pk]}, {'dependencies': [999999]}, {'importance': 11}]:
+            response = self.client.patch(f'/api/tasks/{self.a.pk}/', body, content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+    
+    def test_scoring_dicts_match_api_format(self):
+        """Test conversion of persisted tasks for the scorer."""
+        dicts = {d['title']: d for d in graph.to_scoring_dicts(Task.objects.all())}
+        
+        self.assertEqual(dicts['c']['dependencies'], [str(self.b.pk)])
+        result = PriorityScorer.analyze_and_sort_tasks(list(dicts.values()))
+        scored_a = next(t for t in result['tasks'] if t['title'] == 'a')
+        self.assertEqual(scored_a['component_scores']['dependencies'], 0.75)
+
+
+class StreamingScoringTests(TestCase):
+    """
+    Test suite for bounded-memory streaming scoring.
+    """
+    
+    def _tasks(self):
+        start = date(2025, 3, 1)
+        return [
+            {
+                'id': f'task_{i}',
+                'title': f'Task {i}',
+                'due_date': str(start + timedelta(days=i % 17 - 5)),
+                'estimated_hours': 1 + i % 9,
+                'importance': 1 + i % 10,
+                'dependencies': [f'task_{j}' for j in range(max(0, i - 3), i) if (i * j) % 4 == 0]
+            }
+            for i in range(200)
+        ]
+    
+    def test_count_min_never_undercounts(self):
+        """Test that estimates are upper bounds within the error bound."""
+        sketch = CountMinSketch.from_error_bounds(epsilon=0.01, delta=0.01)
+        for i in range(1000):
+            sketch.add(f'key_{i % 50}')
+        
+        for i in range(50):
+            estimate = sketch.estimate(f'key_{i}')
+            self.assertGreaterEqual(estimate, 20)
+            self.assertLessEqual(estimate, 20 + 0.01 * 1000)
+    
+    def test_stream_matches_exact_scores_with_tight_sketch(self):
+        """Test that streaming agrees with the full analysis when error is zero."""
+        current = date(2025, 3, 1)
+        exact = PriorityScorer.analyze_and_sort_tasks(self._tasks(), current_date=current)
+        streamed = PriorityScorer.top_k_stream(
+            self._tasks, k=15, current_date=current, sketch=DependentsSketch(epsilon=0.0001)
+        )
+        
+        self.assertEqual(streamed['total_tasks'], 200)
+        self.assertEqual(
+            [t['id'] for t in streamed['tasks']],
+            [t['id'] for t in exact['tasks'][:15]]
+        )
+    
+    def test_stream_ignores_untitled_tasks_dependencies(self):
+        """Test that untitled tasks, which the full analysis skips, add no dependents."""
+        current = date(2025, 3, 1)
+        
+        def tasks():
+            return self._tasks()[:20] + [
+                {'id': f'untitled_{i}', 'estimated_hours': 1, 'dependencies': ['task_0', 'task_1']}
+                for i in range(3)
+            ]
+        
+        exact = {
+            t['id']: t['priority_score']
+            for t in PriorityScorer.analyze_and_sort_tasks(tasks(), current_date=current)['tasks']
+        }
+        streamed = {
+            t['id']: t['priority_score']
+            for t in PriorityScorer.score_stream(tasks, current_date=current, sketch=DependentsSketch(epsilon=0.0001))
+        }
+        self.assertEqual(streamed, exact)
+    
+    def test_coarse_sketch_only_overestimates(self):
+        """Test that a tiny sketch never lowers dependency scores."""
+        current = date(2025, 3, 1)
+        exact = {
+            t['id']: t['component_scores']['dependencies']
+            for t in PriorityScorer.analyze_and_sort_tasks(self._tasks(), current_date=current)['tasks']
+        }
+        sketch = DependentsSketch(epsilon=0.5, delta=0.5)
+        
+        for scored in PriorityScorer.score_stream(self._tasks, current_date=current, sketch=sketch):
+            self.assertGreaterEqual(scored['component_scores']['dependencies'], exact[scored['id']])
+        self.assertLess(sketch.stats()['sketch_bytes'], 100)
+
+
+class TaskQueueTests(TestCase):
+    """
+    Test suite for the persisted "next task" priority queue.
+    """
+    
+    def setUp(self):
+        queue.reset_queues()
+        today = date.today()
+        self.base = Task.objects.create(
+            title='Base', due_date=today + timedelta(days=20), estimated_hours=8, importance=3
+        )
+        self.blocked = Task.objects.create(
+            title='Blocked', due_date=today, estimated_hours=1, importance=10
+        )
+        self.other = Task.objects.create(
+            title='Other', due_date=today + timedelta(days=3), estimated_hours=2, importance=6
+        )
+        TaskDependency.objects.create(task=self.blocked, depends_on=self.base)
+    
+    def test_blocked_tasks_not_eligible(self):
+        """Test that tasks with open dependencies are not suggested."""
+        response = self.client.get('/api/tasks/queue/')
+        
+        self.assertEqual(response.json()['eligible_tasks'], 2)
+        self.assertEqual(response.json()['task']['title'], 'Other')
+    
+    def test_claim_marks_in_progress(self):
+        """Test that claiming pops the best task and persists its status."""
+        response = self.client.post('/api/tasks/queue/claim/')
+        
+        self.assertEqual(response.json()['task']['title'], 'Other')
+        self.other.refresh_from_db()
+        self.assertEqual(self.other.status, Task.STATUS_IN_PROGRESS)
+        self.assertEqual(self.client.get('/api/tasks/queue/').json()['task']['title'], 'Base')
+    
+    def test_complete_unblocks_dependents_incrementally(self):
+        """Test that completion updates the queue without a full analysis."""
+        task_queue = queue.get_queue()
+        self.assertEqual(task_queue.peek()['title'], 'Other')
+        
+        with mock.patch.object(PriorityScorer, 'analyze_and_sort_tasks') as analyze, \
+                mock.patch.object(task_queue, '_rebuild') as rebuild:
+            result = task_queue.complete(self.base.pk)
+            self.assertEqual(result['unblocked'], [self.blocked.pk])
+            self.assertEqual(task_queue.peek()['title'], 'Blocked')
+        analyze.assert_not_called()
+        rebuild.assert_not_called()
+        
+        self.base.refresh_from_db()
+        self.assertEqual(self.base.status, Task.STATUS_DONE)
+    
+    def test_external_changes_trigger_rebuild(self):
+        """Test that writes from elsewhere are picked up."""
+        self.assertEqual(queue.get_queue().peek()['title'], 'Other')
+        Task.objects.filter(pk=self.other.pk).update(
+            status=Task.STATUS_DONE, updated_at=timezone.now()
+        )
+        
+        self.assertEqual(queue.get_queue().peek()['title'], 'Base')
+    
+    def test_external_changes_applied_incrementally(self):
+        """Test that other processes' writes are applied without a rebuild, matching one."""
+        def eligible(task_queue):
+            task_queue.peek()
+            return {
+                task_id: task_queue._scored[task_id]['priority_score']
+                for task_id in task_queue._entry if task_queue._is_eligible(task_id)
+            }
+        
+        done = Task.objects.create(title='Done', estimated_hours=1, importance=9, status=Task.STATUS_DONE)
+        waiting = Task.objects.create(title='Waiting', estimated_hours=1, importance=4)
+        TaskDependency.objects.create(task=waiting, depends_on=done)
+        task_queue = queue.get_queue()
+        self.assertIn(waiting.pk, eligible(task_queue))
+        
+        with mock.patch.object(task_queue, '_rebuild') as rebuild:
+            # Reopening blocks its dependents again
+            Task.objects.filter(pk=done.pk).update(status=Task.STATUS_PENDING, updated_at=timezone.now())
+            self.assertIn(done.pk, eligible(task_queue))
+            self.assertNotIn(waiting.pk, eligible(task_queue))
+            
+            Task.objects.filter(pk=self.base.pk).update(status=Task.STATUS_DONE, updated_at=timezone.now())
+            Task.objects.filter(pk=self.other.pk).update(importance=1, updated_at=timezone.now())
+            eligible(task_queue)
+            Task.objects.filter(pk=self.blocked.pk).update(importance=9, updated_at=timezone.now())
+            eligible(task_queue)
+            
+            # Related-manager edge writes bypass TaskDependency's signals
+            self.other.dependencies.add(waiting)
+            TaskDependency.objects.filter(task=waiting).delete()
+            incremental = eligible(task_queue)
+        rebuild.assert_not_called()
+        
+        self.assertEqual(incremental, eligible(queue.TaskQueue()))
+        self.assertEqual(set(incremental), {done.pk, waiting.pk, self.blocked.pk})
+    
+    def test_late_commit_with_early_stamp_applied(self):
+        """Test that a write stamped before the last lookup but committed after it is picked up."""
+        task_queue = queue.get_queue()
+        self.assertEqual(task_queue.peek()['title'], 'Other')
+        
+        # Another process's transaction stamped the row before the lookup
+        Task.objects.filter(pk=self.other.pk).update(
+            status=Task.STATUS_DONE, updated_at=timezone.now() - timedelta(seconds=30)
+        )
+        Workspace.record_change(Workspace.DEFAULT_ID)
+        
+        with mock.patch.object(task_queue, '_rebuild') as rebuild:
+            self.assertEqual(task_queue.peek()['title'], 'Base')
+        rebuild.assert_not_called()
+    
+    def test_lost_claim_keeps_task_in_graph(self):
+        """Test that a worker losing a claim still unblocks dependents when the task completes."""
+        Task.objects.filter(pk=self.other.pk).update(status=Task.STATUS_DONE, updated_at=timezone.now())
+        worker_a, worker_b = queue.TaskQueue(), queue.TaskQueue()
+        self.assertEqual(worker_a.peek()['title'], 'Base')
+        self.assertEqual(worker_b.claim()['title'], 'Base')
+        
+        # B's claim lands between A's refresh and A's conditional UPDATE
+        with mock.patch.object(worker_a, '_ensure_fresh'):
+            self.assertIsNone(worker_a.claim())
+        self.assertEqual(worker_b.complete(self.base.pk)['unblocked'], [self.blocked.pk])
+        
+        self.assertEqual(worker_a.peek()['title'], 'Blocked')
+        self.assertEqual(worker_a._unmet[self.blocked.pk], 0)
+    
+    def test_claim_empty_queue_and_missing_task(self):
+        """Test the empty-queue and unknown-task responses."""
+        Task.objects.update(status=Task.STATUS_DONE, updated_at=timezone.now())
+        
+        self.assertEqual(self.client.post('/api/tasks/queue/claim/').status_code, 204)
+        self.assertEqual(self.client.post('/api/tasks/99999/complete/').status_code, 404)
+
+
+class SharedSnapshotTests(TestCase):
+    """
+    Test suite for the shared-memory backlog snapshot.
+    """
+    
+    def setUp(self):
+        self.settings_override = override_settings(SHARED_SNAPSHOT={'NAME': f'sttest{os.getpid()}'})
+        self.settings_override.enable()
+        snapshot.destroy()
+        today = date.today()
+        self.tasks = [
+            Task.objects.create(
+                title=f'Task {i}', due_date=today + timedelta(days=i * 3 - 4),
+                estimated_hours=1 + i, importance=10 - i
+            )
+            for i in range(6)
+        ]
+        TaskDependency.objects.create(task=self.tasks[1], depends_on=self.tasks[5])
+        TaskDependency.objects.create(task=self.tasks[2], depends_on=self.tasks[5])
+        Task.objects.filter(pk=self.tasks[3].pk).update(status=Task.STATUS_DONE)
+    
+    def tearDown(self):
+        snapshot.destroy()
+        self.settings_override.disable()
+    
+    def test_pages_match_full_analysis(self):
+        """Test that snapshot ranking matches analyzing the open backlog."""
+        open_tasks = Task.objects.exclude(status=Task.STATUS_DONE)
+        for strategy in ['smart_balance', 'high_impact']:
+            expected = PriorityScorer.analyze_and_sort_tasks(
+                graph.to_scoring_dicts(open_tasks), strategy=strategy
+            )['tasks']
+            page = snapshot.get_snapshot().page(strategy, 0, 10)
+            
+            self.assertEqual([t['id'] for t in page], [t['id'] for t in expected])
+            self.assertEqual([t['priority_score'] for t in page], [t['priority_score'] for t in expected])
+            self.assertEqual(page[0]['component_scores'], expected[0]['component_scores'])
+    
+    def test_writes_trigger_versioned_rebuild(self):
+        """Test that a task write swaps in a new snapshot version."""
+        first = snapshot.get_snapshot()
+        self.assertEqual(len(first), 5)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(
+                title='New', estimated_hours=1, importance=10, due_date=date.today() - timedelta(days=30)
+            )
+        second = snapshot.get_snapshot()
+        
+        self.assertEqual(second.version, first.version + 1)
+        self.assertEqual(len(second), 6)
+        self.assertEqual(second.top('smart_balance', 1)[0]['title'], 'New')
+    
+    def test_stale_mark_waits_for_commit(self):
+        """Test that a rebuild inside the writing transaction does not hide the write after commit."""
+        first = snapshot.get_snapshot()
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                Task.objects.create(title='Late', estimated_hours=1, importance=10)
+                self.assertEqual(snapshot.current_generation(), 0)
+                # A rebuild now, as another worker would run it, stays on the old generation
+                self.assertEqual(snapshot.get_snapshot().version, first.version)
+        
+        rebuilt = snapshot.get_snapshot()
+        self.assertEqual(rebuilt.version, first.version + 1)
+        self.assertEqual(len(rebuilt), 6)
+    
+    def test_other_workers_attach_without_queries(self):
+        """Test that a worker with no local state attaches without DB work."""
+        built = snapshot.get_snapshot()
+        built_version = built.version
+        built_page = built.page()
+        del built
+        
+        # Simulate a fresh worker process
+        snapshot._current.clear()
+        snapshot._control.clear()
+        with self.assertNumQueries(0):
+            attached = snapshot.get_snapshot()
+            self.assertEqual(attached.version, built_version)
+            self.assertEqual(attached.page(), built_page)
+        
+        blocker = next(i for i in range(len(attached)) if attached.task(i)['title'] == 'Task 5')
+        dependents = {attached.task(i)['title'] for i in attached.dependents(blocker)}
+        self.assertEqual(dependents, {'Task 1', 'Task 2'})
+    
+    def test_backlog_endpoints(self):
+        """Test the backlog page and snapshot-backed suggest endpoints."""
+        response = self.client.get('/api/tasks/backlog/?offset=1&limit=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_tasks'], 5)
+        self.assertEqual(len(response.json()['tasks']), 2)
+        
+        response = self.client.get('/api/tasks/suggest/?source=backlog')
+        self.assertEqual(len(response.json()['suggestions']), 3)
+        
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/tasks/suggest/?source=backlog', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+
+class TaskSearchTests(TestCase):
+    """
+    Test suite for indexed title search.
+    """
+    
+    def setUp(self):
+        self.settings_override = override_settings(SHARED_SNAPSHOT={'NAME': f'sttest{os.getpid()}'})
+        self.settings_override.enable()
+        snapshot.destroy()
+        search.reset_index()
+        today = date.today()
+        self.urgent = Task.objects.create(title='Quarterly report draft', due_date=today - timedelta(days=2), estimated_hours=2, importance=10)
+        self.later = Task.objects.create(title='Quarterly report review', due_date=today + timedelta(days=60), estimated_hours=2, importance=2)
+        self.other = Task.objects.create(title='Refactor reporting module', due_date=today, estimated_hours=2, importance=5)
+    
+    def tearDown(self):
+        snapshot.destroy()
+        self.settings_override.disable()
+    
+    def test_all_terms_and_prefix_matching(self):
+        """Test that every word must match and prefix mode expands the last one."""
+        self.assertEqual(
+            {task_id for task_id, _ in search.search_ids('quarterly report')},
+            {self.urgent.pk, self.later.pk}
+        )
+        self.assertEqual(search.search_ids('report draft'), [(self.urgent.pk, mock.ANY)])
+        self.assertEqual(search.search_ids('repo'), [])
+        self.assertEqual(
+            {task_id for task_id, _ in search.search_ids('repo', prefix=True)},
+            {self.urgent.pk, self.later.pk, self.other.pk}
+        )
+    
+    def test_index_follows_writes(self):
+        """Test that saves and deletes are reflected in later searches."""
+        search.search_ids('report')
+        self.later.title = 'Quarterly budget review'
+        self.later.save()
+        Task.objects.create(title='Report to board', due_date=date.today(), estimated_hours=1, importance=5)
+        self.urgent.delete()
+        
+        titles = {task.title for task in Task.objects.filter(
+            pk__in=[task_id for task_id, _ in search.search_ids('report')]
+        )}
+        self.assertEqual(titles, {'Report to board'})
+        
+        # Writes that bypass signals are picked up through updated_at
+        Task.objects.filter(pk=self.other.pk).update(title='Refactor report module', updated_at=timezone.now())
+        self.assertIn(self.other.pk, [task_id for task_id, _ in search.search_ids('report')])
+    
+    def test_late_commit_with_early_stamp_indexed(self):
+        """Test that a write stamped before the last search but committed after it is picked up."""
+        search.search_ids('report')
+        
+        # Another process's transaction stamped the row before that search
+        Task.objects.filter(pk=self.other.pk).update(
+            title='Refactor report module', updated_at=timezone.now() - timedelta(seconds=30)
+        )
+        Workspace.record_change(Workspace.DEFAULT_ID)
+        
+        self.assertIn(self.other.pk, [task_id for task_id, _ in search.search_ids('report')])
+    
+    def test_endpoint_ranks_by_relevance_and_priority(self):
+        """Test that equally relevant tasks are ordered by priority."""
+        response = self.client.get('/api/tasks/search/', {'q': 'quarterly rep', 'prefix': 'true'})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([r['id'] for r in results], [str(self.urgent.pk), str(self.later.pk)])
+        self.assertGreater(results[0]['priority_score'], results[1]['priority_score'])
+        
+        self.assertEqual(self.client.get('/api/tasks/search/').status_code, 400)
+        self.assertEqual(self.client.get('/api/tasks/search/', {'q': 'x', 'strategy': 'nope'}).status_code, 400)
+    
+    def test_admin_search_uses_index(self):
+        """Test that the admin changelist search goes through the index."""
+        from django.contrib.admin.sites import site
+        from django.test import RequestFactory
+        
+        queryset, may_have_duplicates = site._registry[Task].get_search_results(
+            RequestFactory().get('/'), Task.objects.all(), 'quarterly'
+        )
+        self.assertFalse(may_have_duplicates)
+        self.assertEqual(set(queryset), {self.urgent, self.later})
+    
+    def test_admin_search_falls_back_when_index_is_capped(self):
+        """Test that capped or empty index searches fall back to icontains."""
+        from django.contrib.admin.sites import site
+        from django.test import RequestFactory
+        
+        model_admin = site._registry[Task]
+        
+        def admin_search(term):
+            queryset, _ = model_admin.get_search_results(RequestFactory().get('/'), Task.objects.all(), term)
+            return set(queryset)
+        
+        # More distinct words share the prefix than the index expands
+        expanded = Task.objects.bulk_create(
+            Task(title=f'Milestone{i:03d}', estimated_hours=1, importance=5)
+            for i in range(search.MAX_PREFIX_EXPANSIONS + 1)
+        )
+        search.reset_index()
+        self.assertTrue(search.prefix_capped('milestone'))
+        self.assertFalse(search.prefix_capped('milestone00'))
+        self.assertEqual(admin_search('milestone'), set(expanded))
+        
+        # Over the result limit
+        with mock.patch.object(model_admin, 'search_result_limit', 1):
+            self.assertEqual(admin_search('quarterly'), {self.urgent, self.later})
+        
+        # Infix matches the index cannot see
+        self.assertEqual(admin_search('uarterl'), {self.urgent, self.later})
+
+
+class RequestCaptureTests(TestCase):
+    """
+    Test suite for request capture and replay.
+    """
+    
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'captures.jsonl.gz')
+        self.settings_override = override_settings(REQUEST_CAPTURE={
+            'ENABLED': True, 'PATH': self.path, 'SAMPLE_RATE': 1.0, 'MIN_SCORING_MS': 0
+        })
+        self.settings_override.enable()
+        self.payload = {
+            'strategy': 'deadline_driven',
+            'tasks': [
+                {'id': 'a', 'title': 'A', 'due_date': '2026-03-01', 'estimated_hours': 2, 'importance': 4},
+                {'id': 'b', 'title': 'B', 'due_date': '2026-02-20', 'estimated_hours': 6, 'importance': 9},
+                {'id': 'c', 'title': 'C', 'due_date': None, 'estimated_hours': 1, 'importance': 7,
+                 'dependencies': ['a']},
+            ]
+        }
+    
+    def tearDown(self):
+        self.settings_override.disable()
+        self.directory.cleanup()
+    
+    def test_capture_and_replay_with_pinned_date(self):
+        """Test that captured requests replay identically on a later day."""
+        self.client.post('/api/tasks/analyze/', self.payload, content_type='application/json')
+        self.client.post('/api/tasks/suggest/', self.payload, content_type='application/json')
+        
+        records = list(capture.read_captures(self.path))
+        self.assertEqual([r['endpoint'] for r in records], ['analyze', 'suggest'])
+        self.assertEqual(records[0]['reference_date'], date.today().isoformat())
+        self.assertEqual(records[0]['strategy'], 'deadline_driven')
+        
+        class MonthLater(date):
+            @classmethod
+            def today(cls):
+                return date.today() + timedelta(days=30)
+        
+        with mock.patch('tasks.scoring.date', MonthLater):
+            reports = [capture.replay(record, repeat=1) for record in records]
+        for report in reports:
+            self.assertFalse(report['ranking_changed'])
+            self.assertEqual(report['score_changes'], [])
+    
+    def test_replay_reports_ranking_differences(self):
+        """Test that replay flags rankings that differ from what was served."""
+        self.client.post('/api/tasks/analyze/', self.payload, content_type='application/json')
+        record = next(capture.read_captures(self.path))
+        record['ranking'] = list(reversed(record['ranking']))
+        
+        report = capture.replay(record, repeat=1)
+        self.assertTrue(report['ranking_changed'])
+        self.assertEqual(report['first_difference'], 0)
+    
+    def test_disabled_by_default(self):
+        """Test that nothing is written unless capture is enabled."""
+        with override_settings(REQUEST_CAPTURE={}):
+            self.client.post('/api/tasks/analyze/', self.payload, content_type='application/json')
+        self.assertFalse(os.path.exists(self.path))
+
+
+class ScoringBackendTests(TestCase):
+    """
+    Test suite for pluggable scoring backends and their conformance checks.
+    """
+    
+    def test_backends_match_reference(self):
+        """Test that every backend matches the reference on edge cases and random sets."""
+        report = conformance.check_backends(seeds=range(8), sizes=(0, 1, 5, 30))
+        for name, entry in report['backends'].items():
+            self.assertEqual(entry['mismatches'], [], name)
+    
+    def test_backends_must_implement_analyze(self):
+        """Test that a backend without analyze() cannot be instantiated."""
+        class Incomplete(backends.ScoringBackend):
+            name = 'incomplete'
+        
+        with self.assertRaises(TypeError):
+            Incomplete()
+        with self.assertRaises(TypeError):
+            backends.ScoringBackend()
+    
+    def test_conformance_detects_differences(self):
+        """Test that a backend with different tie ordering is reported."""
+        class ReversedTies(backends.ReferenceBackend):
+            name = 'reversed_ties'
+            
+            def analyze(self, tasks, strategy='smart_balance', weights=None, current_date=None):
+                return super().analyze(list(reversed(tasks)), strategy, weights, current_date)
+        
+        backends.register_backend(ReversedTies())
+        self.addCleanup(backends._backends.pop, 'reversed_ties')
+        report = conformance.check_backends(['reversed_ties'], seeds=[], sizes=())
+        self.assertTrue(any('ties' in m for m in report['backends']['reversed_ties']['mismatches']))
+    
+    def test_indexed_backend_handles_long_chains(self):
+        """Test that cycle detection does not recurse once per chain link."""
+        tasks = [{'id': i, 'title': f'T{i}', 'dependencies': [i + 1]} for i in range(5000)]
+        result = PriorityScorer.analyze_and_sort_tasks(tasks, backend='indexed')
+        self.assertEqual(result['circular_dependencies'], [])
+        self.assertEqual(result['total_tasks'], 5000)
+    
+    def test_backend_selection(self):
+        """Test that backends are chosen per request or by setting."""
+        payload = {'tasks': [
+            {'id': 'a', 'title': 'A', 'due_date': str(date.today()), 'estimated_hours': 2, 'importance': 5},
+            {'id': 'b', 'title': 'B', 'estimated_hours': 1, 'importance': 8, 'dependencies': ['a']},
+        ]}
+        responses = [
+            self.client.post('/api/tasks/analyze/', {**payload, 'backend': name}, content_type='application/json')
+            for name in ('reference', 'indexed')
+        ]
+        self.assertEqual(responses[0].json(), responses[1].json())
+        
+        response = self.client.post('/api/tasks/analyze/', {**payload, 'backend': 'nope'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/tasks/suggest/', {**payload, 'backend': 'nope'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        
+        with override_settings(SCORING={'BACKEND': 'indexed'}):
+            self.assertIsInstance(backends.get_backend(), backends.IndexedBackend)
+        with override_settings(SCORING={'BACKEND': 'missing'}):
+            with self.assertRaises(ValueError):
+                PriorityScorer.analyze_and_sort_tasks(payload['tasks'])
+
+
+class MemoryProfilingTests(TestCase):
+    """
+    Test suite for the opt-in analyze memory profiler.
+    """
+    
+    payload = {
+        'tasks': [
+            {'id': f't{i}', 'title': f'Task {i}', 'estimated_hours': 2, 'importance': 5,
+             'dependencies': [f't{i - 1}'] if i else []}
+            for i in range(50)
+        ]
+    }
+    
+    def test_profile_in_response_when_enabled(self):
+        """Test that the profile is returned in the body and header on request."""
+        with override_settings(MEMORY_PROFILING={'ENABLED': True, 'TOP_SITES': 3}):
+            response = self.client.post(
+                '/api/tasks/analyze/', self.payload, content_type='application/json',
+                HTTP_X_MEMORY_PROFILE='1'
+            )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data['tasks']), 50)
+        profile = data['memory_profile']
+        self.assertEqual(
+            [stage['stage'] for stage in profile['stages']],
+            ['body', 'parse', 'validate', 'convert', 'score']
+        )
+        self.assertGreater(profile['peak_bytes'], 0)
+        self.assertGreaterEqual(profile['peak_bytes'], max(s['peak_bytes'] for s in profile['stages']))
+        self.assertTrue(any(stage['top_sites'] for stage in profile['stages']))
+        self.assertTrue(response['X-Memory-Profile'].startswith('peak_kib='))
+    
+    def test_profiled_body_read_is_capped(self):
+        """Test that the profiler reads at most the body limit from the stream and returns 413 past it."""
+        body = json.dumps(self.payload)
+        profiling = override_settings(
+            MEMORY_PROFILING={'ENABLED': True, 'TOP_SITES': 0},
+            ADMISSION_CONTROL={'MAX_BODY_BYTES': len(body) - 1}
+        )
+        # Past the declared-length check, as for a body whose Content-Length understates it
+        with profiling, mock.patch.object(admission, 'body_too_large', return_value=False):
+            response = self.client.post(
+                '/api/tasks/analyze/', body, content_type='application/json', HTTP_X_MEMORY_PROFILE='1'
+            )
+            self.assertEqual(response.status_code, 413)
+            
+            with override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=len(body) - 1, ADMISSION_CONTROL={}):
+                request = RequestFactory().post('/', body, content_type='application/json')
+                with self.assertRaises(admission.BodyTooLarge):
+                    admission.read_body(request)
+    
+    def test_profiled_validation_is_admitted(self):
+        """Test that a heavy profiled analysis is rejected before its body is validated."""
+        profiling = override_settings(
+            MEMORY_PROFILING={'ENABLED': True, 'TOP_SITES': 0},
+            ADMISSION_CONTROL={'HEAVY_TASK_THRESHOLD': 10, 'MAX_HEAVY_PER_PROCESS': 0}
+        )
+        with profiling, mock.patch.object(memprofile, 'TaskAnalyzeSerializer') as serializer:
+            response = self.client.post(
+                '/api/tasks/analyze/', self.payload, content_type='application/json', HTTP_X_MEMORY_PROFILE='1'
+            )
+        self.assertEqual(response.status_code, 429)
+        serializer.assert_not_called()
+    
+    def test_profile_ignored_when_disabled(self):
+        """Test that the header has no effect unless profiling is enabled."""
+        response = self.client.post(
+            '/api/tasks/analyze/', self.payload, content_type='application/json',
+            HTTP_X_MEMORY_PROFILE='1'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('memory_profile', response.json())
+        self.assertFalse(response.has_header('X-Memory-Profile'))
+    
+    def test_command_profiles_task_file(self):
+        """Test that the CLI profiles a bare task list from a file."""
+        from io import StringIO
+        from django.core.management import call_command
+        
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump(self.payload['tasks'], f)
+        self.addCleanup(os.unlink, f.name)
+        
+        out = StringIO()
+        call_command('profile_memory', f.name, '--json', '--top', '0', stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['task_count'], 50)
+        self.assertEqual(len(report['stages']), 6)
+
+
+@override_settings(SUGGESTION_STREAM={
+    'POLL_INTERVAL_SECONDS': 0.02, 'COALESCE_SECONDS': 0.3, 'MAX_DELAY_SECONDS': 2.0,
+    'KEEPALIVE_SECONDS': 0.05, 'MAX_STREAM_SECONDS': 30,
+})
+class SuggestionPushTests(TransactionTestCase):
+    """
+    Test suite for Server-Sent Events suggestion push.
+    
+    A TransactionTestCase, so the watcher thread sees committed writes.
+    """
+    
+    def setUp(self):
+        self.settings_override = override_settings(SHARED_SNAPSHOT={'NAME': f'sttest{os.getpid()}'})
+        self.settings_override.enable()
+        snapshot.destroy()
+        push.reset_broadcasters()
+        today = date.today()
+        self.tasks = [
+            Task.objects.create(
+                title=f'Task {i}', due_date=today + timedelta(days=i * 5),
+                estimated_hours=2, importance=8 - i
+            )
+            for i in range(5)
+        ]
+        self.streams = []
+    
+    def tearDown(self):
+        for stream in self.streams:
+            stream.close()
+        for broadcaster in list(push._broadcasters.values()):
+            if broadcaster._thread is not None:
+                broadcaster._thread.join(5)
+        push.reset_broadcasters()
+        snapshot.destroy()
+        self.settings_override.disable()
+    
+    def _open_stream(self, environ=None, **params):
+        response = self.client.get('/api/tasks/suggest/stream/', params, **(environ or {}))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = iter(response.streaming_content)
+        self.streams.append(response)
+        return stream
+    
+    def _events(self, stream, seconds):
+        """Collect suggestion events received within ``seconds``."""
+        events = []
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            chunk = next(stream).decode()
+            if 'event: suggestions' in chunk:
+                events.append(json.loads(chunk.split('data: ', 1)[1]))
+        return events
+    
+    def _next_event(self, stream, timeout=5):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            chunk = next(stream).decode()
+            if 'event: suggestions' in chunk:
+                return json.loads(chunk.split('data: ', 1)[1])
+        self.fail('No suggestion event received')
+    
+    def test_pushes_rank_changes_after_write(self):
+        """Test that a write changing the top-k is pushed with rank changes."""
+        stream = self._open_stream(k=3)
+        first = self._next_event(stream)
+        self.assertEqual([s['id'] for s in first['suggestions']], [str(t.pk) for t in self.tasks[:3]])
+        
+        urgent = Task.objects.create(
+            title='Urgent', due_date=date.today() - timedelta(days=3), estimated_hours=1, importance=10
+        )
+        event = self._next_event(stream)
+        self.assertEqual(event['suggestions'][0]['id'], str(urgent.pk))
+        self.assertIn({'id': str(urgent.pk), 'rank': 1, 'previous_rank': None}, event['changes']['moved'])
+        self.assertEqual(event['changes']['dropped'], [str(self.tasks[2].pk)])
+    
+    def test_bursts_coalesce_into_one_rescore_for_all_subscribers(self):
+        """Test that a burst of writes yields one rescore and one event per subscriber."""
+        streams = [self._open_stream(k=3), self._open_stream(k=3)]
+        for stream in streams:
+            self._next_event(stream)
+        broadcaster = push.get_broadcaster('smart_balance', 3)
+        rescores = broadcaster.rescores
+        
+        for task in self.tasks:
+            task.importance = 1 if task.pk == self.tasks[0].pk else 10
+            task.save()
+        
+        for stream in streams:
+            events = self._events(stream, 1.5)
+            self.assertEqual(len(events), 1)
+            self.assertNotIn(str(self.tasks[0].pk), [s['id'] for s in events[0]['suggestions']])
+        self.assertEqual(broadcaster.rescores, rescores + 1)
+    
+    def test_single_threaded_servers_get_short_streams(self):
+        """Test that streams end early when the server cannot serve other requests meanwhile."""
+        config = {'MAX_STREAM_SECONDS': 60, 'SINGLE_THREADED_MAX_STREAM_SECONDS': 0.3, 'KEEPALIVE_SECONDS': 0.1}
+        with override_settings(SUGGESTION_STREAM=config):
+            capped = self._open_stream(environ={'wsgi.multithread': False})
+            threaded = self._open_stream(environ={'wsgi.multithread': True})
+            started = time.monotonic()
+            self.assertGreater(len(list(capped)), 1)
+            self.assertLess(time.monotonic() - started, 5)
+            for _ in range(10):
+                next(threaded)
+            self.assertGreater(time.monotonic() - started, 0.6)
+    
+    def test_invalid_parameters(self):
+        """Test that invalid stream parameters are rejected."""
+        self.assertEqual(self.client.get('/api/tasks/suggest/stream/', {'strategy': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/tasks/suggest/stream/', {'k': 'many'}).status_code, 400)
+
+
+class WorkspaceTests(TestCase):
+    """
+    Test suite for workspace-partitioned backlogs.
+    """
+    
+    def setUp(self):
+        self.settings_override = override_settings(SHARED_SNAPSHOT={'NAME': f'sttest{os.getpid()}'})
+        self.settings_override.enable()
+        snapshot.destroy()
+        queue.reset_queues()
+        search.reset_index()
+        today = date.today()
+        self.default = Workspace.objects.get(pk=Workspace.DEFAULT_ID)
+        self.team = Workspace.objects.create(name='Team', slug='team')
+        self.ours = Task.objects.create(title='Ship release', due_date=today, estimated_hours=2, importance=8)
+        self.theirs = Task.objects.create(
+            workspace=self.team, title='Ship docs', due_date=today + timedelta(days=1), estimated_hours=1, importance=6
+        )
+        self.blocked = Task.objects.create(workspace=self.team, title='Announce', estimated_hours=1, importance=9)
+        TaskDependency.objects.create(task=self.blocked, depends_on=self.theirs)
+    
+    def tearDown(self):
+        snapshot.destroy()
+        self.settings_override.disable()
+    
+    def test_edges_cannot_cross_workspaces(self):
+        """Test that cross-workspace dependencies are rejected on every write path."""
+        with self.assertRaises(ValidationError):
+            TaskDependency.objects.create(task=self.ours, depends_on=self.theirs)
+        with self.assertRaises(ValidationError), transaction.atomic():
+            self.ours.dependencies.add(self.theirs)
+        with self.assertRaises(ValidationError):
+            TaskDependency(task=self.ours, depends_on=self.theirs).full_clean()
+        
+        self.theirs.workspace = self.default
+        with self.assertRaises(ValidationError):
+            self.theirs.full_clean()
+        self.assertFalse(TaskDependency.objects.filter(task=self.ours).exists())
+    
+    def test_task_with_edges_cannot_be_saved_into_another_workspace(self):
+        """Test that save() rejects moving a task whose edges would then cross workspaces."""
+        for task in [self.theirs, Task.objects.get(pk=self.blocked.pk)]:
+            task.workspace = self.default
+            with self.assertRaises(ValidationError):
+                task.save()
+        self.assertEqual(Task.objects.filter(workspace=self.team).count(), 2)
+        
+        # Unrelated edits and moves of tasks without edges still save
+        self.theirs.workspace = self.team
+        self.theirs.title = 'Ship release notes'
+        self.theirs.save()
+        self.ours.workspace = self.team
+        self.ours.save()
+    
+    def test_building_one_workspace_does_not_block_another(self):
+        """Test that a snapshot build holds no lock other workspaces' readers need."""
+        team_snapshot = snapshot.get_snapshot(self.team.pk)
+        build_columns = snapshot._build_columns
+        seen = {}
+        
+        def build_while_reading(workspace_id, reference_date):
+            def read():
+                seen['team'] = snapshot.get_snapshot(self.team.pk)
+                seen['generation'] = snapshot.current_generation(workspace_id)
+            reader = threading.Thread(target=read)
+            reader.start()
+            reader.join(5)
+            return build_columns(workspace_id, reference_date)
+        
+        with mock.patch.object(snapshot, '_build_columns', build_while_reading):
+            snapshot.get_snapshot(self.default.pk)
+        self.assertIs(seen['team'], team_snapshot)
+        self.assertEqual(seen['generation'], 0)
+    
+    def test_snapshots_are_invalidated_independently(self):
+        """Test that writes to one workspace leave another's snapshot current."""
+        ours = snapshot.get_snapshot(self.default.pk)
+        theirs = snapshot.get_snapshot(self.team.pk)
+        self.assertEqual([t['title'] for t in ours.page()], ['Ship release'])
+        self.assertEqual(len(theirs), 2)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(workspace=self.team, title='Write blog post', estimated_hours=3, importance=4)
+        self.assertEqual(snapshot.current_generation(self.default.pk), 0)
+        with self.assertNumQueries(0):
+            self.assertIs(snapshot.get_snapshot(self.default.pk), ours)
+        self.assertEqual(len(snapshot.get_snapshot(self.team.pk)), 3)
+    
+    def test_moving_a_task_invalidates_both_workspaces(self):
+        """Test that a task moved between workspaces leaves the old snapshot and queue."""
+        self.assertEqual(len(snapshot.get_snapshot(self.default.pk)), 1)
+        self.assertEqual(queue.get_queue(workspace_id=self.default.pk).eligible_count(), 1)
+        
+        self.ours.workspace = self.team
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ours.save()
+        
+        self.assertEqual(len(snapshot.get_snapshot(self.default.pk)), 0)
+        self.assertEqual(len(snapshot.get_snapshot(self.team.pk)), 3)
+        self.assertEqual(queue.get_queue(workspace_id=self.default.pk).eligible_count(), 0)
+    
+    def test_endpoints_are_scoped_to_workspace(self):
+        """Test the workspace parameter on backlog, queue, search and suggest."""
+        backlog = self.client.get('/api/tasks/backlog/', {'workspace': 'team'}).json()
+        self.assertEqual(backlog['workspace'], self.team.pk)
+        self.assertEqual([t['title'] for t in backlog['tasks']], ['Ship docs', 'Announce'])
+        self.assertEqual(self.client.get('/api/tasks/backlog/').json()['total_tasks'], 1)
+        
+        # The blocked task is not eligible, and the other workspace's task is not visible
+        response = self.client.get('/api/tasks/queue/', {'workspace': self.team.pk}).json()
+        self.assertEqual((response['task']['title'], response['eligible_tasks']), ('Ship docs', 1))
+        with self.captureOnCommitCallbacks(execute=True):
+            completed = self.client.post(f'/api/tasks/{self.theirs.pk}/complete/').json()
+        self.assertEqual(completed['unblocked'], [self.blocked.pk])
+        
+        results = self.client.get('/api/tasks/search/', {'q': 'ship', 'workspace': 'team'}).json()['results']
+        self.assertEqual([r['id'] for r in results], [str(self.theirs.pk)])
+        
+        suggestions = self.client.get('/api/tasks/suggest/', {'source': 'backlog', 'workspace': 'team'}).json()
+        self.assertEqual([s['task']['title'] for s in suggestions['suggestions']], ['Announce'])
+        
+        for url in ['/api/tasks/backlog/', '/api/tasks/queue/', '/api/tasks/suggest/stream/']:
+            self.assertEqual(self.client.get(url, {'workspace': 'nope'}).status_code, 404)
+        
+        # Digits int() rejects, and IDs past the column's range, are unknown workspaces too
+        for value in ['%C2%B2', '9' * 30]:
+            self.assertEqual(self.client.get(f'/api/tasks/backlog/?workspace={value}').status_code, 404)
+            self.assertEqual(self.client.get(f'/api/tasks/queue/?workspace={value}').status_code, 404)
+            self.assertEqual(self.client.post(f'/api/tasks/queue/claim/?workspace={value}').status_code, 404)
+
+
+@override_settings(ROOT_URLCONF='task_analyzer.urls_api')
+class WarmUpTests(TestCase):
+    """
+    Test the boot-time warm-up used by the API-only profile.
+    """
+    
+    def test_warm_up_serves_sample_requests(self):
+        """Test that both sample requests succeed without touching the database."""
+        with mock.patch('tasks.warmup.connections') as connections, \
+                self.assertNumQueries(0), self.assertNoLogs('tasks.warmup'):
+            timings = warmup.warm_up()
+        
+        self.assertEqual(set(timings), {'/api/tasks/suggest/', '/api/tasks/analyze/'})
+        connections.close_all.assert_called_once_with()
+    
+    def test_failed_request_is_logged_not_raised(self):
+        """Test that a broken warm-up request does not stop the server from booting."""
+        with mock.patch('tasks.warmup.connections'), \
+                mock.patch('tasks.views.PriorityScorer.analyze_and_sort_tasks', side_effect=RuntimeError), \
+                self.assertLogs('tasks.warmup', 'WARNING') as logs:
+            warmup.warm_up()
+        
+        self.assertEqual(len(logs.output), 2)
+        self.assertIn('POST /api/tasks/analyze/ returned 500', logs.output[1])
+
+
+class ScoreHistoryTests(TestCase):
+    """
+    Test suite for the daily score history and trend endpoints.
+    """
+    
+    def setUp(self):
+        self.settings_override = override_settings(SHARED_SNAPSHOT={'NAME': f'sttest{os.getpid()}'})
+        self.settings_override.enable()
+        snapshot.destroy()
+        history.reset_recorded()
+        today = date.today()
+        self.urgent = Task.objects.create(title='Urgent', due_date=today, estimated_hours=2, importance=9)
+        self.slipping = Task.objects.create(
+            title='Slipping', due_date=today - timedelta(days=1), estimated_hours=3, importance=8
+        )
+        self.later = Task.objects.create(
+            title='Later', due_date=today + timedelta(days=20), estimated_hours=8, importance=3
+        )
+        Task.objects.create(title='Someday', estimated_hours=1, importance=8)
+    
+    def tearDown(self):
+        snapshot.destroy()
+        history.reset_recorded()
+        self.settings_override.disable()
+    
+    def record_week_ago(self):
+        """Build and record the snapshot as if it were a week ago."""
+        class WeekAgo(date):
+            @classmethod
+            def today(cls):
+                return date.today() - timedelta(days=7)
+        
+        with mock.patch('tasks.snapshot.date', WeekAgo):
+            history.record_day(Workspace.DEFAULT_ID, snapshot.get_snapshot())
+    
+    def test_job_workers_record_each_day_once(self):
+        """Test that housekeeping records the day's samples and summary once, and requests never do."""
+        backlog = snapshot.get_snapshot()
+        self.assertFalse(DailyBacklogSummary.objects.exists())
+        jobs.run_housekeeping()
+        
+        samples = ScoreSample.objects.filter(day=date.today()).order_by('rank')
+        self.assertEqual([s.task_id for s in samples], [int(t['id']) for t in backlog.page(limit=10)])
+        summary = DailyBacklogSummary.objects.get(day=date.today())
+        self.assertEqual(
+            (summary.open_tasks, summary.overdue, summary.due_today, summary.due_later, summary.no_due_date),
+            (4, 1, 1, 1, 1)
+        )
+        self.assertEqual(summary.median_score, round(statistics.median(s.score for s in samples), 3))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(title='New', estimated_hours=1, importance=1)
+        self.assertEqual(len(snapshot.get_snapshot()), 5)
+        with self.assertNumQueries(1):
+            self.assertEqual(history.record_pending(), 0)
+        self.assertEqual(ScoreSample.objects.count(), 4)
+        self.assertFalse(history.record_day(Workspace.DEFAULT_ID, backlog))
+    
+    def test_disabled_history_records_nothing(self):
+        """Test that SCORE_HISTORY ENABLED=False skips recording."""
+        with override_settings(SCORE_HISTORY={'ENABLED': False}):
+            self.assertEqual(history.record_pending(), 0)
+        self.assertFalse(DailyBacklogSummary.objects.exists())
+    
+    def test_trend_endpoints(self):
+        """Test the daily series, rank changes and per-task history over two recorded days."""
+        self.record_week_ago()
+        Task.objects.filter(pk=self.slipping.pk).update(due_date=date.today() + timedelta(days=30))
+        snapshot.mark_stale()
+        history.record_pending()
+        
+        days = self.client.get('/api/tasks/history/?days=14').json()['days']
+        self.assertEqual([d['day'] for d in days], [str(date.today() - timedelta(days=7)), str(date.today())])
+        self.assertEqual([d['overdue'] for d in days], [0, 0])
+        self.assertEqual([d['due_this_week'] for d in days], [2, 0])
+        self.assertEqual([d['due_later'] for d in days], [1, 2])
+        self.assertEqual(len(self.client.get('/api/tasks/history/?days=3').json()['days']), 1)
+        
+        with self.assertNumQueries(4):
+            changes = self.client.get('/api/tasks/history/rank-changes/', {'days': 8, 'limit': 1}).json()
+        self.assertEqual(changes['compared'], 4)
+        self.assertEqual(changes['slipping'][0]['title'], 'Slipping')
+        self.assertEqual((changes['slipping'][0]['from_rank'], changes['slipping'][0]['to_rank']), (2, 3))
+        self.assertEqual(changes['climbing'][0]['title'], 'Someday')
+        
+        task = self.client.get(f'/api/tasks/{self.slipping.pk}/history/?days=14').json()
+        self.assertEqual(len(task['samples']), 2)
+        self.assertEqual(task['due_date_slips'], 1)
+        
+        self.assertEqual(self.client.get('/api/tasks/999999/history/').status_code, 404)
+        self.assertEqual(self.client.get('/api/tasks/history/?days=x').status_code, 400)
+
+
+class ExplanationTests(TestCase):
+    """
+    Test suite for reason codes and rendered explanations.
+    """
+    
+    def test_reasons_use_reference_date(self):
+        """Test that overdue days count from the scoring date, not today."""
+        pinned = date(2026, 1, 15)
+        task = {'title': 'Late', 'due_date': '2026-01-12', 'estimated_hours': 1, 'importance': 9}
+        result = PriorityScorer.calculate_priority_score(task, [task], current_date=pinned)
+        
+        self.assertEqual(result['reasons'], [
+            {'code': 'overdue', 'days': 3},
+            {'code': 'high_importance', 'rating': 9},
+            {'code': 'quick_win', 'hours': 1},
+        ])
+        self.assertEqual(
+            explanations.render(result['reasons']),
+            'Overdue by 3 day(s); High importance (9/10); Quick win (1h estimated)'
+        )
+    
+    def test_reason_thresholds(self):
+        """Test due-soon, blocking and standard reasons."""
+        self.assertEqual(explanations.reasons(1.0, 0.5, 0.5, 0.6, 5, 4), [
+            {'code': 'due_soon'}, {'code': 'blocks_others'}
+        ])
+        self.assertEqual(explanations.render(explanations.reasons(0.1, 0.5, 0.5, 0.0, 5, 4)), 'Standard priority task')
+    
+    def test_text_only_when_requested(self):
+        """Test that endpoints add explanation strings only for ?explain=text."""
+        payload = {'tasks': [{'title': 'Ship', 'due_date': str(date.today()), 'estimated_hours': 2, 'importance': 8}]}
+        plain = self.client.post('/api/tasks/analyze/', payload, content_type='application/json').json()
+        self.assertNotIn('explanation', plain['tasks'][0])
+        self.assertEqual(plain['tasks'][0]['reasons'][0], {'code': 'due_soon'})
+        
+        explained = self.client.post(
+            '/api/tasks/analyze/?explain=text&lang=xx', payload, content_type='application/json'
+        ).json()
+        self.assertTrue(explained['tasks'][0]['explanation'].startswith('Due very soon; High importance (8/10)'))
+        
+        suggestion = self.client.get('/api/tasks/suggest/').json()['suggestions'][0]
+        self.assertEqual(suggestion['why_this_task'], explanations.render(suggestion['reasons']))
+    
+    def test_api_profile_renders_requested_language(self):
+        """Test that the API-only profile translates explanations into ?lang=."""
+        from django.utils import translation
+        from task_analyzer import settings_api
+        
+        def tagged(message):
+            return f'[{translation.get_language()}] {message}'
+        
+        payload = {'tasks': [{'title': 'Ship', 'estimated_hours': 2, 'importance': 8}]}
+        explanations.templates.cache_clear()
+        self.addCleanup(explanations.templates.cache_clear)
+        # Django picks its translation backend once per process, so check the profile's flag directly
+        self.assertTrue(settings_api.USE_I18N)
+        with override_settings(ROOT_URLCONF='task_analyzer.urls_api'), \
+                mock.patch.object(explanations.translation, 'gettext', side_effect=tagged):
+            response = self.client.post(
+                '/api/tasks/analyze/?explain=text&lang=de', payload, content_type='application/json'
+            )
+        self.assertTrue(response.json()['tasks'][0]['explanation'].startswith('[de] High importance (8/10); [de] '))
+    
+    def test_rendering_does_not_modify_queue_state(self):
+        """Test that explained queue responses leave the queue's scored tasks untouched."""
+        Task.objects.create(title='Next', estimated_hours=1, importance=7)
+        queue.invalidate_queues()
+        
+        explained = self.client.get('/api/tasks/queue/?explain=text').json()['task']
+        self.assertEqual(explained['explanation'], 'Quick win (1.0h estimated)')
+        self.assertNotIn('explanation', self.client.get('/api/tasks/queue/').json()['task'])
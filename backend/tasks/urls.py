@@ -5,7 +5,22 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
+    path('tasks/', views.create_task, name='create_task'),
+    path('tasks/<int:task_id>/', views.update_task, name='update_task'),
     path('tasks/analyze/', views.analyze_tasks, name='analyze_tasks'),
     path('tasks/suggest/', views.suggest_tasks, name='suggest_tasks'),
+    path('tasks/suggest/stream/', views.suggest_stream, name='suggest_stream'),
+    path('tasks/forecast/', views.forecast_tasks, name='forecast_tasks'),
+    path('tasks/admission/', views.admission_stats, name='admission_stats'),
+    path('tasks/jobs/', views.submit_job, name='submit_job'),
+    path('tasks/jobs/<uuid:job_id>/', views.job_status, name='job_status'),
+    path('tasks/backlog/', views.backlog_tasks, name='backlog_tasks'),
+    path('tasks/search/', views.search_tasks, name='search_tasks'),
+    path('tasks/queue/', views.queue_next, name='queue_next'),
+    path('tasks/queue/claim/', views.queue_claim, name='queue_claim'),
+    path('tasks/<int:task_id>/complete/', views.complete_task, name='complete_task'),
+    path('tasks/<int:task_id>/history/', views.task_score_history, name='task_score_history'),
+    path('tasks/history/', views.score_history, name='score_history'),
+    path('tasks/history/rank-changes/', views.rank_changes, name='rank_changes'),
 ]
 
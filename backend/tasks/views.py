@@ -3,11 +3,93 @@ API views for task analysis endpoints.
 """
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import serializers, status
+from rest_framework.exceptions import ParseError
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET
 from .scoring import PriorityScorer
-from .serializers import TaskSerializer, TaskAnalyzeSerializer
+from .serializers import (
+    TaskSerializer, TaskAnalyzeSerializer, ForecastSerializer,
+    JobSubmitSerializer, AnalysisJobSerializer, PersistedTaskSerializer, STRATEGY_CHOICES, to_task_dicts
+)
+from .models import AnalysisJob, Task, TaskDependency, Workspace
+from . import admission, backends, caching, capture, explanations, graph, history, jobs, memprofile, push, search
+from .queue import get_queue
+from .snapshot import get_snapshot
 from datetime import date, timedelta
+import json
+import time
+
+
+def _payload_too_large_response():
+    """Build the response for request bodies over the admission limit."""
+    return Response(
+        {
+            'error': 'Payload too large',
+            'max_bytes': admission.get_config()['MAX_BODY_BYTES']
+        },
+        status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    )
+
+
+def _overloaded_response(exc):
+    """Build a fast 429 response for a rejected heavy analysis."""
+    return Response(
+        {
+            'error': 'Too many heavy analyses in progress',
+            'reason': exc.reason,
+            'retry_after': exc.retry_after
+        },
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={'Retry-After': str(exc.retry_after)}
+    )
+
+
+def _explain_language(request):
+    """
+    Language to render explanation text in, or None if it was not requested.
+    
+    Scored tasks always carry structured ``reasons``; ``?explain=text``
+    adds an ``explanation`` string, in ``lang`` if that is supported.
+    """
+    if request.query_params.get('explain') != 'text':
+        return None
+    return explanations.get_language(request.query_params.get('lang'))
+
+
+MAX_WORKSPACE_ID = 2 ** 63 - 1  # Largest value a 64-bit primary key column holds
+
+
+def _workspace_id(params):
+    """
+    Resolve the ``workspace`` query parameter (an ID or slug) to a workspace ID.
+    
+    The default workspace is used, without a query, when the parameter is
+    absent. Returns None if no such workspace exists, including for IDs
+    no database column could hold.
+    """
+    value = params.get('workspace')
+    if not value:
+        return Workspace.DEFAULT_ID
+    if value.isdecimal():
+        try:
+            workspace_id = int(value)
+        except ValueError:
+            return None
+        if workspace_id > MAX_WORKSPACE_ID:
+            return None
+        lookup = {'pk': workspace_id}
+    else:
+        lookup = {'slug': value}
+    return Workspace.objects.filter(**lookup).values_list('pk', flat=True).first()
+
+
+def _workspace_not_found_response():
+    return Response({'error': 'Workspace not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
 @csrf_exempt
@@ -32,43 +114,127 @@ def analyze_tasks(request):
         "strategy": "smart_balance"  // optional
     }
     
-    Returns sorted tasks with priority scores.
+    Returns sorted tasks with priority scores and reason codes; pass
+    ?explain=text (and optionally lang=) for explanation strings.
+    Heavy analyses may be rejected with 429 when the server is busy.
+    
+    With memory profiling enabled, send "X-Memory-Profile: 1" to get a
+    per-stage allocation report in the body and response header.
     """
+    # Reject oversized bodies before DRF parses them
+    if admission.body_too_large(request):
+        return _payload_too_large_response()
+    
+    if memprofile.requested(request):
+        return _profiled_analysis(request)
+    
     try:
-        # Validate input
-        serializer = TaskAnalyzeSerializer(data=request.data)
-        if not serializer.is_valid():
-            return Response(
-                {'error': 'Invalid input', 'details': serializer.errors},
-                status=status.HTTP_400_BAD_REQUEST
+        # Admitted before validation, which is itself heavy for large lists
+        with admission.admit(admission.task_count(request.data)):
+            # Validate input
+            serializer = TaskAnalyzeSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(
+                    {'error': 'Invalid input', 'details': serializer.errors},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            tasks = serializer.validated_data['tasks']
+            strategy = serializer.validated_data.get('strategy', 'smart_balance')
+            backend = serializer.validated_data.get('backend')
+            
+            # Convert serialized tasks to dictionaries
+            task_dicts = to_task_dicts(tasks)
+            
+            # Pin the reference date so captured requests replay identically
+            today = date.today()
+            sampled = capture.should_sample()
+            
+            # Analyze and sort tasks
+            started = time.perf_counter()
+            result = PriorityScorer.analyze_and_sort_tasks(
+                task_dicts, strategy=strategy, current_date=today, backend=backend
             )
+            elapsed = time.perf_counter() - started
         
-        tasks = serializer.validated_data['tasks']
-        strategy = serializer.validated_data.get('strategy', 'smart_balance')
-        
-        # Convert serialized tasks to dictionaries
-        task_dicts = []
-        for task in tasks:
-            task_dict = {
-                'id': task.get('id') or task.get('title'),
-                'title': task['title'],
-                'due_date': task.get('due_date'),
-                'estimated_hours': task.get('estimated_hours', 4),
-                'importance': task.get('importance', 5),
-                'dependencies': task.get('dependencies', [])
-            }
-            task_dicts.append(task_dict)
-        
-        # Analyze and sort tasks
-        result = PriorityScorer.analyze_and_sort_tasks(task_dicts, strategy=strategy)
+        if sampled:
+            capture.record('analyze', task_dicts, strategy, today, result, elapsed, backend)
         
+        language = _explain_language(request)
+        if language:
+            result['tasks'] = explanations.with_text(result['tasks'], language)
         return Response(result, status=status.HTTP_200_OK)
     
+    except admission.AdmissionRejected as e:
+        return _overloaded_response(e)
+    
+    except Exception as e:
+        return Response(
+            {'error': 'Internal server error', 'message': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+def _profiled_analysis(request):
+    """
+    Run analyze_tasks under the memory profiler (see memprofile.py).
+    
+    The profile ends after scoring: the Response below is the only
+    rendering of the result. Use the profile_memory command to measure
+    rendering too.
+    """
+    try:
+        result, report = memprofile.profile_analysis(
+            lambda: admission.read_body(request), admit=admission.admit, render=False
+        )
+    except admission.BodyTooLarge:
+        return _payload_too_large_response()
+    except memprofile.ProfilerBusy:
+        return Response(
+            {'error': 'A memory profile is already running'},
+            status=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={'Retry-After': '1'}
+        )
+    except ParseError as e:
+        return Response({'error': 'Invalid input', 'details': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except serializers.ValidationError as e:
+        return Response({'error': 'Invalid input', 'details': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+    except admission.AdmissionRejected as e:
+        return _overloaded_response(e)
     except Exception as e:
         return Response(
             {'error': 'Internal server error', 'message': str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+    
+    language = _explain_language(request)
+    if language:
+        result['tasks'] = explanations.with_text(result['tasks'], language)
+    return Response(
+        {**result, 'memory_profile': report},
+        status=status.HTTP_200_OK,
+        headers={'X-Memory-Profile': memprofile.header_value(report)}
+    )
+
+
+def _format_suggestions(top_tasks, language=None):
+    """Format scored tasks as ranked suggestions with explanations."""
+    suggestions = []
+    for i, task in enumerate(top_tasks, 1):
+        suggestions.append({
+            'rank': i,
+            'task': {
+                'title': task['title'],
+                'due_date': task.get('due_date'),
+                'estimated_hours': task.get('estimated_hours'),
+                'importance': task.get('importance'),
+            },
+            'priority_score': task['priority_score'],
+            'why_this_task': explanations.render(task['reasons'], language),
+            'reasons': task['reasons'],
+            'component_scores': task.get('component_scores', {})
+        })
+    return suggestions
 
 
 @csrf_exempt
@@ -78,23 +244,38 @@ def suggest_tasks(request):
     Get top 3 task suggestions for today.
     
     GET /api/tasks/suggest/?strategy=smart_balance
+    GET /api/tasks/suggest/?source=backlog for persisted open tasks
     POST /api/tasks/suggest/ with tasks in body
     
     Query parameters (GET) or body (POST):
     - strategy: Sorting strategy (optional, default: smart_balance)
+    - source: "backlog" to suggest from persisted tasks (GET only)
+    - workspace: Workspace ID or slug for source=backlog (default workspace if omitted)
     - tasks: List of tasks (POST only)
+    - lang: Language for why_this_task (optional, default: LANGUAGE_CODE)
     
-    Returns top 3 tasks with explanations.
+    Returns top 3 tasks with explanations. GET responses carry a strong
+    ETag and honour If-None-Match with 304 Not Modified.
     """
+    if admission.body_too_large(request):
+        return _payload_too_large_response()
+    
     try:
         strategy = request.query_params.get('strategy') or (request.data.get('strategy') if hasattr(request, 'data') and request.data else 'smart_balance')
         
+        today = date.today()
+        language = explanations.get_language(request.query_params.get('lang'))
+        
+        backend = request.query_params.get('backend') or (request.data.get('backend') if request.method == 'POST' and request.data else None)
+        if backend is not None and backend not in backends.backend_names():
+            return Response({'error': 'Invalid backend'}, status=status.HTTP_400_BAD_REQUEST)
+        
         # Sample tasks for demonstration if none provided
         sample_tasks = [
             {
                 'id': 'task_1',
                 'title': 'Review pull requests',
-                'due_date': str(date.today()),
+                'due_date': str(today),
                 'estimated_hours': 2,
                 'importance': 7,
                 'dependencies': []
@@ -102,7 +283,7 @@ def suggest_tasks(request):
             {
                 'id': 'task_2',
                 'title': 'Fix critical bug',
-                'due_date': str(date.today() - timedelta(days=1)),  # Yesterday
+                'due_date': str(today - timedelta(days=1)),  # Yesterday
                 'estimated_hours': 4,
                 'importance': 9,
                 'dependencies': []
@@ -110,7 +291,7 @@ def suggest_tasks(request):
             {
                 'id': 'task_3',
                 'title': 'Update documentation',
-                'due_date': str(date.today() + timedelta(days=7)),  # Next week
+                'due_date': str(today + timedelta(days=7)),  # Next week
                 'estimated_hours': 1,
                 'importance': 5,
                 'dependencies': []
@@ -122,45 +303,716 @@ def suggest_tasks(request):
         if request.method == 'POST' and hasattr(request, 'data') and request.data:
             tasks = request.data.get('tasks')
         
-        if not tasks:
+        use_backlog = request.method == 'GET' and request.query_params.get('source') == 'backlog'
+        
+        if use_backlog:
+            # Persisted backlog, read from the workspace's shared snapshot without rescoring
+            workspace_id = _workspace_id(request.query_params)
+            if workspace_id is None:
+                return _workspace_not_found_response()
+            backlog = get_snapshot(workspace_id)
+            message = f"Suggested from {len(backlog)} open backlog tasks."
+        elif not tasks:
             # Use sample tasks for demonstration
             tasks = sample_tasks
             message = "Using sample tasks. Provide tasks via POST body for real analysis."
         else:
             message = "Analyzed provided tasks."
         
-        # Analyze tasks
-        result = PriorityScorer.analyze_and_sort_tasks(tasks, strategy=strategy)
-        
-        # Get top 3
-        top_tasks = result['tasks'][:3]
+        # Output depends only on the inputs, strategy and date, so GETs
+        # can be revalidated without rescoring
+        headers = {}
+        if request.method == 'GET':
+            inputs = backlog.fingerprint if use_backlog else tasks
+            etag = caching.compute_etag({'inputs': inputs, 'language': language}, strategy, today)
+            headers = caching.cache_headers(etag)
+            if caching.etag_matches(request, etag):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
         
-        # Format response with explanations
-        suggestions = []
-        for i, task in enumerate(top_tasks, 1):
-            suggestions.append({
-                'rank': i,
-                'task': {
-                    'title': task['title'],
-                    'due_date': task.get('due_date'),
-                    'estimated_hours': task.get('estimated_hours'),
-                    'importance': task.get('importance'),
-                },
-                'priority_score': task['priority_score'],
-                'why_this_task': task.get('explanation', 'High priority based on multiple factors'),
-                'component_scores': task.get('component_scores', {})
-            })
+        if use_backlog:
+            # Cycles are rejected when dependencies are written
+            top_tasks = backlog.top(strategy if strategy in STRATEGY_CHOICES else 'smart_balance', 3)
+            circular_dependencies = []
+        else:
+            # Analyze tasks
+            sampled = capture.should_sample()
+            with admission.admit(len(tasks)):
+                started = time.perf_counter()
+                result = PriorityScorer.analyze_and_sort_tasks(
+                    tasks, strategy=strategy, current_date=today, backend=backend
+                )
+                elapsed = time.perf_counter() - started
+            
+            if sampled:
+                capture.record('suggest', tasks, strategy, today, result, elapsed, backend)
+            
+            # Get top 3
+            top_tasks = result['tasks'][:3]
+            circular_dependencies = result.get('circular_dependencies', [])
         
         return Response({
-            'suggestions': suggestions,
+            'suggestions': _format_suggestions(top_tasks, language),
             'strategy_used': strategy,
             'message': message,
-            'circular_dependencies_detected': len(result.get('circular_dependencies', [])) > 0
+            'circular_dependencies_detected': len(circular_dependencies) > 0
+        }, status=status.HTTP_200_OK, headers=headers)
+    
+    except admission.AdmissionRejected as e:
+        return _overloaded_response(e)
+    
+    except Exception as e:
+        return Response(
+            {'error': 'Internal server error', 'message': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+
+@csrf_exempt
+@api_view(['POST'])
+def forecast_tasks(request):
+    """
+    Forecast task scores and ranks for each of the next N days.
+    
+    POST /api/tasks/forecast/
+    
+    Request body:
+    {
+        "tasks": [...],
+        "strategy": "smart_balance",  // optional
+        "days": 14,                   // optional, 1-90
+        "start_date": "2025-11-30"    // optional, defaults to today
+    }
+    
+    Returns per-task score and rank series plus the days on which
+    leading tasks overtake each other.
+    """
+    if admission.body_too_large(request):
+        return _payload_too_large_response()
+    
+    try:
+        with admission.admit(admission.task_count(request.data)):
+            serializer = ForecastSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(
+                    {'error': 'Invalid input', 'details': serializer.errors},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            data = serializer.validated_data
+            task_dicts = to_task_dicts(data['tasks'])
+            
+            result = PriorityScorer.forecast_scores(
+                task_dicts,
+                days=data.get('days', 14),
+                strategy=data.get('strategy', 'smart_balance'),
+                start_date=data.get('start_date')
+            )
+        
+        return Response(result, status=status.HTTP_200_OK)
+    
+    except admission.AdmissionRejected as e:
+        return _overloaded_response(e)
+    
+    except Exception as e:
+        return Response(
+            {'error': 'Internal server error', 'message': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+def admission_stats(request):
+    """
+    Report admission control counters for the worker serving the request.
+    
+    GET /api/tasks/admission/
+    """
+    return Response({
+        **admission.get_stats(),
+        'config': admission.get_config()
+    }, status=status.HTTP_200_OK)
+
+
+@csrf_exempt
+@api_view(['POST'])
+def submit_job(request):
+    """
+    Submit an analysis to run asynchronously.
+    
+    POST /api/tasks/jobs/
+    
+    Request body:
+    {
+        "kind": "analyze",           // or "sweep"
+        "tasks": [...],
+        "strategy": "smart_balance", // analyze jobs
+        "strategies": [...]          // sweep jobs, optional
+    }
+    
+    Returns 202 with the job ID. Identical submissions return the
+    existing job instead of queueing a new one.
+    """
+    if admission.body_too_large(request):
+        return _payload_too_large_response()
+    
+    serializer = JobSubmitSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(
+            {'error': 'Invalid input', 'details': serializer.errors},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    data = serializer.validated_data
+    kind = data.get('kind', AnalysisJob.KIND_ANALYZE)
+    payload = {'tasks': to_task_dicts(data['tasks'])}
+    if kind == AnalysisJob.KIND_SWEEP:
+        payload['strategies'] = data.get('strategies') or []
+    else:
+        payload['strategy'] = data.get('strategy', 'smart_balance')
+    if data.get('backend'):
+        payload['backend'] = data['backend']
+    
+    job, created = jobs.submit_job(kind, payload)
+    
+    return Response(
+        {**AnalysisJobSerializer(job).data, 'deduplicated': not created},
+        status=status.HTTP_202_ACCEPTED,
+        headers={'Location': f'/api/tasks/jobs/{job.id}/'}
+    )
+
+
+@api_view(['GET'])
+def job_status(request, job_id):
+    """
+    Poll an asynchronous analysis job.
+    
+    GET /api/tasks/jobs/<job_id>/
+    
+    Returns status and progress, plus the result once the job has
+    succeeded. Expired jobs return 410.
+    """
+    job = AnalysisJob.objects.filter(id=job_id).first()
+    if job is None:
+        return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    if jobs.is_expired(job):
+        return Response({'error': 'Job result has expired'}, status=status.HTTP_410_GONE)
+    
+    data = AnalysisJobSerializer(job).data
+    language = _explain_language(request)
+    if language and data.get('result'):
+        # A sweep holds one analysis per strategy
+        for analysis in [data['result'], *data['result'].get('strategies', {}).values()]:
+            if 'tasks' in analysis:
+                analysis['tasks'] = explanations.with_text(analysis['tasks'], language)
+    return Response(data, status=status.HTTP_200_OK)
+
+
+def _queue_strategy(request):
+    """Read and validate the queue strategy from the query string."""
+    strategy = request.query_params.get('strategy', 'smart_balance')
+    return strategy if strategy in STRATEGY_CHOICES else None
+
+
+@api_view(['GET'])
+def queue_next(request):
+    """
+    Peek at the next eligible persisted task without claiming it.
+    
+    GET /api/tasks/queue/?strategy=smart_balance&workspace=default
+    
+    A task is eligible when it is pending and all its dependencies are done.
+    """
+    strategy = _queue_strategy(request)
+    if strategy is None:
+        return Response({'error': 'Invalid strategy'}, status=status.HTTP_400_BAD_REQUEST)
+    workspace_id = _workspace_id(request.query_params)
+    if workspace_id is None:
+        return _workspace_not_found_response()
+    
+    queue = get_queue(strategy, workspace_id)
+    task = queue.peek()
+    language = _explain_language(request)
+    if task is not None and language:
+        task = explanations.with_text([task], language)[0]
+    return Response({
+        'task': task,
+        'eligible_tasks': queue.eligible_count(),
+        'strategy': strategy,
+        'workspace': workspace_id
+    }, status=status.HTTP_200_OK)
+
+
+@csrf_exempt
+@api_view(['POST'])
+def queue_claim(request):
+    """
+    Claim the next eligible persisted task, marking it in progress.
+    
+    POST /api/tasks/queue/claim/?strategy=smart_balance&workspace=default
+    
+    Returns 204 when no task is eligible.
+    """
+    strategy = _queue_strategy(request)
+    if strategy is None:
+        return Response({'error': 'Invalid strategy'}, status=status.HTTP_400_BAD_REQUEST)
+    workspace_id = _workspace_id(request.query_params)
+    if workspace_id is None:
+        return _workspace_not_found_response()
+    
+    task = get_queue(strategy, workspace_id).claim()
+    if task is None:
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    language = _explain_language(request)
+    if language:
+        task = explanations.with_text([task], language)[0]
+    return Response({'task': task, 'strategy': strategy, 'workspace': workspace_id}, status=status.HTTP_200_OK)
+
+
+@csrf_exempt
+@api_view(['POST'])
+def complete_task(request, task_id):
+    """
+    Mark a persisted task done, unblocking its dependents.
+    
+    POST /api/tasks/<task_id>/complete/?strategy=smart_balance
+    
+    Returns the IDs of dependents that became eligible. The task's own
+    workspace's queue is updated.
+    """
+    strategy = _queue_strategy(request)
+    if strategy is None:
+        return Response({'error': 'Invalid strategy'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    workspace_id = Task.objects.filter(pk=task_id).values_list('workspace_id', flat=True).first()
+    if workspace_id is None:
+        return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
+    result = get_queue(strategy, workspace_id).complete(task_id)
+    if result is None:
+        return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(result, status=status.HTTP_200_OK)
+
+
+def _unknown_dependencies(workspace_id, dependency_ids):
+    """IDs in ``dependency_ids`` that are not tasks in the workspace."""
+    found = set(Task.objects.filter(workspace_id=workspace_id, pk__in=dependency_ids).values_list('pk', flat=True))
+    return sorted(set(dependency_ids) - found)
+
+
+def _replace_dependencies(task, dependency_ids):
+    """
+    Make ``dependency_ids`` the task's dependencies, checking new edges for cycles.
+    
+    Callers run this in a transaction and roll it back on error. Removed
+    edges are deleted before new ones are checked, since removing an edge
+    can only break cycles. Each check searches only the graph around the
+    new edge (see graph.find_cycle).
+    
+    Returns:
+        None on success, or an error Response
+    """
+    if task.pk in dependency_ids:
+        return Response({'error': 'A task cannot depend on itself'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    graph.lock_workspace_graph(task.workspace_id)
+    current = set(task.dependency_edges.values_list('depends_on_id', flat=True))
+    for edge in TaskDependency.objects.filter(task=task, depends_on_id__in=current - set(dependency_ids)):
+        edge.delete()
+    
+    for depends_on_id in sorted(set(dependency_ids) - current):
+        try:
+            # TaskDependency.save() rejects edges that close a cycle
+            TaskDependency.objects.create(task=task, depends_on_id=depends_on_id)
+        except ValidationError as e:
+            if e.code != 'circular_dependency':
+                raise
+            return Response({
+                'error': 'Circular dependency',
+                'message': f'Depending on task {depends_on_id} would create a cycle: {e.params["cycle"]}',
+                'cycle': e.params['path']
+            }, status=status.HTTP_400_BAD_REQUEST)
+    return None
+
+
+@csrf_exempt
+@api_view(['POST'])
+def create_task(request):
+    """
+    Create a persisted task.
+    
+    POST /api/tasks/?workspace=default
+    
+    Request body:
+    {
+        "title": "Write release notes",
+        "due_date": "2025-11-30",
+        "estimated_hours": 2,
+        "importance": 6,
+        "dependencies": [12, 15]  // optional, IDs of tasks in the same workspace
+    }
+    
+    A new task has no dependents yet, so it cannot close a cycle.
+    """
+    serializer = PersistedTaskSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(
+            {'error': 'Invalid input', 'details': serializer.errors},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        workspace_id = _workspace_id(request.query_params)
+        if workspace_id is None:
+            return _workspace_not_found_response()
+        dependency_ids = serializer.validated_data.pop('dependencies', [])
+        unknown = _unknown_dependencies(workspace_id, dependency_ids)
+        if unknown:
+            return Response(
+                {'error': 'Unknown dependencies', 'task_ids': unknown},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        with transaction.atomic():
+            task = serializer.save(workspace_id=workspace_id)
+            error = _replace_dependencies(task, dependency_ids)
+            if error is not None:
+                transaction.set_rollback(True)
+                return error
+        return Response(PersistedTaskSerializer(task).data, status=status.HTTP_201_CREATED)
+    except Exception as e:
+        return Response(
+            {'error': 'Internal server error', 'message': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@csrf_exempt
+@api_view(['PATCH'])
+def update_task(request, task_id):
+    """
+    Update a persisted task's fields and/or replace its dependencies.
+    
+    PATCH /api/tasks/<task_id>/
+    
+    Takes any fields create_task accepts. A new dependency that would
+    close a cycle is rejected with 400 and the cycle's task IDs, and
+    nothing is changed.
+    """
+    task = Task.objects.filter(pk=task_id).first()
+    if task is None:
+        return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    serializer = PersistedTaskSerializer(task, data=request.data, partial=True)
+    if not serializer.is_valid():
+        return Response(
+            {'error': 'Invalid input', 'details': serializer.errors},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        dependency_ids = serializer.validated_data.pop('dependencies', None)
+        if dependency_ids is not None:
+            unknown = _unknown_dependencies(task.workspace_id, dependency_ids)
+            if unknown:
+                return Response(
+                    {'error': 'Unknown dependencies', 'task_ids': unknown},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        with transaction.atomic():
+            if dependency_ids is not None:
+                error = _replace_dependencies(task, dependency_ids)
+                if error is not None:
+                    transaction.set_rollback(True)
+                    return error
+            if serializer.validated_data:
+                serializer.save()
+        return Response(PersistedTaskSerializer(task).data, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response(
+            {'error': 'Internal server error', 'message': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+def backlog_tasks(request):
+    """
+    Page through the persisted open backlog in priority order.
+    
+    GET /api/tasks/backlog/?strategy=smart_balance&offset=0&limit=20&workspace=default
+    
+    Served from the workspace's shared snapshot, so no database query or
+    rescoring is needed unless the workspace's backlog changed.
+    """
+    strategy = _queue_strategy(request)
+    if strategy is None:
+        return Response({'error': 'Invalid strategy'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        offset = max(0, int(request.query_params.get('offset', 0)))
+        limit = max(1, min(100, int(request.query_params.get('limit', 20))))
+    except ValueError:
+        return Response({'error': 'offset and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    workspace_id = _workspace_id(request.query_params)
+    if workspace_id is None:
+        return _workspace_not_found_response()
+    
+    backlog = get_snapshot(workspace_id)
+    page = backlog.page(strategy, offset, limit)
+    language = _explain_language(request)
+    if language:
+        page = explanations.with_text(page, language)
+    return Response({
+        'tasks': page,
+        'total_tasks': len(backlog),
+        'offset': offset,
+        'limit': limit,
+        'strategy': strategy,
+        'workspace': workspace_id,
+        'snapshot_version': backlog.version
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def search_tasks(request):
+    """
+    Search persisted task titles.
+    
+    GET /api/tasks/search/?q=report&prefix=true&limit=20&strategy=smart_balance
+    
+    Query params:
+        q: Search text; every word must match
+        prefix: Match the last word as a prefix, for autocomplete
+        limit: Maximum results (1-100)
+        strategy: Strategy whose priority scores boost the ranking
+        workspace: Workspace ID or slug to search (default workspace if omitted)
+    
+    Results are ranked by relevance * (1 + priority_score). Uses Postgres
+    full-text search when available, otherwise an in-process index.
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    strategy = _queue_strategy(request)
+    if strategy is None:
+        return Response({'error': 'Invalid strategy'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        limit = max(1, min(100, int(request.query_params.get('limit', 20))))
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    prefix = request.query_params.get('prefix', '').lower() in ('1', 'true', 'yes')
+    
+    try:
+        workspace_id = _workspace_id(request.query_params)
+        if workspace_id is None:
+            return _workspace_not_found_response()
+        results = search.search_tasks(
+            query, prefix=prefix, limit=limit, strategy=strategy, workspace_id=workspace_id
+        )
+        return Response({
+            'query': query,
+            'prefix': prefix,
+            'strategy': strategy,
+            'results': results
         }, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response(
+            {'error': 'Internal server error', 'message': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+MAX_HISTORY_DAYS = 366
+
+
+def _history_window(params):
+    """
+    The (start, end) dates covered by the ``days`` query param, ending today.
+    
+    Raises:
+        ValueError: If days is not an integer
+    """
+    days = max(1, min(MAX_HISTORY_DAYS, int(params.get('days', 30))))
+    end = date.today()
+    return end - timedelta(days=days - 1), end
+
+
+@api_view(['GET'])
+def score_history(request):
+    """
+    Daily trend of the persisted backlog.
     
+    GET /api/tasks/history/?days=30&workspace=default
+    
+    Returns one entry per recorded day: open and overdue task counts,
+    due-date bands and score percentiles. Reads one summary row per day,
+    never the per-task history.
+    """
+    try:
+        start, end = _history_window(request.query_params)
+    except ValueError:
+        return Response({'error': 'days must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        workspace_id = _workspace_id(request.query_params)
+        if workspace_id is None:
+            return _workspace_not_found_response()
+        return Response({
+            'workspace': workspace_id,
+            'from': start,
+            'to': end,
+            'days': history.daily_summaries(workspace_id, start, end)
+        }, status=status.HTTP_200_OK)
     except Exception as e:
         return Response(
             {'error': 'Internal server error', 'message': str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+
+@api_view(['GET'])
+def rank_changes(request):
+    """
+    Tasks whose rank moved most over a window.
+    
+    GET /api/tasks/history/rank-changes/?days=7&limit=10&workspace=default
+    
+    Compares the first and last recorded days in the window: ``slipping``
+    lists the largest rank drops and ``climbing`` the largest rises.
+    """
+    try:
+        start, end = _history_window({'days': 7, **request.query_params.dict()})
+        limit = max(1, min(100, int(request.query_params.get('limit', 10))))
+    except ValueError:
+        return Response({'error': 'days and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        workspace_id = _workspace_id(request.query_params)
+        if workspace_id is None:
+            return _workspace_not_found_response()
+        result = history.rank_changes(workspace_id, start, end, limit)
+        result['workspace'] = workspace_id
+        return Response(result, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response(
+            {'error': 'Internal server error', 'message': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+def task_score_history(request, task_id):
+    """
+    One task's daily rank, score and due date.
+    
+    GET /api/tasks/<task_id>/history/?days=30
+    
+    The task's own workspace is used. History outlives deleted tasks; for
+    those, pass ``workspace`` if it is not the default one.
+    """
+    try:
+        start, end = _history_window(request.query_params)
+    except ValueError:
+        return Response({'error': 'days must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        workspace_id = Task.objects.filter(pk=task_id).values_list('workspace_id', flat=True).first()
+        if workspace_id is None:
+            workspace_id = _workspace_id(request.query_params)
+            if workspace_id is None:
+                return _workspace_not_found_response()
+        result = history.task_history(workspace_id, task_id, start, end)
+        if not result['samples']:
+            return Response({'error': 'No history for this task'}, status=status.HTTP_404_NOT_FOUND)
+        result.update({'id': task_id, 'workspace': workspace_id})
+        return Response(result, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response(
+            {'error': 'Internal server error', 'message': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+def _suggestion_events(broadcaster, max_seconds):
+    """Yield Server-Sent Events for one subscriber for up to ``max_seconds``."""
+    config = push.get_config()
+    deadline = time.monotonic() + max_seconds
+    broadcaster.subscribe()
+    try:
+        yield f"retry: {config['RETRY_MILLISECONDS']}\n\n"
+        sequence = 0
+        previous = None
+        while time.monotonic() < deadline:
+            state = broadcaster.wait(sequence, min(config['KEEPALIVE_SECONDS'], deadline - time.monotonic()))
+            if state is None:
+                yield ': keepalive\n\n'
+                continue
+            
+            data = json.dumps({
+                'suggestions': [
+                    {'id': task['id'], **suggestion}
+                    for task, suggestion in zip(state['tasks'], _format_suggestions(state['tasks']))
+                ],
+                'changes': push.rank_changes(previous, state['tasks']),
+                'strategy_used': broadcaster.strategy,
+                'workspace': broadcaster.workspace_id,
+                'reference_date': state['reference_date'],
+                'total_tasks': state['total_tasks'],
+                'snapshot_version': state['snapshot_version']
+            }, cls=DjangoJSONEncoder)
+            yield f"id: {state['sequence']}\nevent: suggestions\ndata: {data}\n\n"
+            sequence = state['sequence']
+            previous = state['tasks']
+    finally:
+        broadcaster.unsubscribe()
+
+
+@require_GET
+def suggest_stream(request):
+    """
+    Stream top-k backlog suggestions as Server-Sent Events.
+    
+    GET /api/tasks/suggest/stream/?strategy=smart_balance&k=3&workspace=default
+    
+    Sends the current suggestions immediately, then a "suggestions" event
+    whenever the workspace's tasks change the top-k or the date rolls over, with
+    rank changes since the previous event. Write bursts are coalesced, and
+    every subscriber in a worker shares one rescore per change.
+    
+    Each stream holds a server thread, so on single-threaded servers it
+    ends after SINGLE_THREADED_MAX_STREAM_SECONDS; clients reconnect.
+    
+    A plain Django view: DRF content negotiation would reject the
+    text/event-stream Accept header EventSource sends.
+    """
+    strategy = request.GET.get('strategy', 'smart_balance')
+    if strategy not in STRATEGY_CHOICES:
+        return JsonResponse({'error': 'Invalid strategy'}, status=400)
+    try:
+        k = int(request.GET.get('k', 3))
+    except ValueError:
+        return JsonResponse({'error': 'k must be an integer'}, status=400)
+    if not 1 <= k <= 20:
+        return JsonResponse({'error': 'k must be between 1 and 20'}, status=400)
+    workspace_id = _workspace_id(request.GET)
+    if workspace_id is None:
+        return JsonResponse({'error': 'Workspace not found'}, status=404)
+    
+    config = push.get_config()
+    if request.META.get('wsgi.multithread'):
+        max_seconds = config['MAX_STREAM_SECONDS']
+    else:
+        max_seconds = min(config['MAX_STREAM_SECONDS'], config['SINGLE_THREADED_MAX_STREAM_SECONDS'])
+    
+    response = StreamingHttpResponse(
+        _suggestion_events(push.get_broadcaster(strategy, k, workspace_id), max_seconds),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (nginx)
+    return response
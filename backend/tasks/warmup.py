@@ -0,0 +1,106 @@
+"""
+Boot-time warm-up for API servers.
+
+Django loads the URLconf, and with it the views, DRF and the scoring
+code, on the first request. After a scale-to-zero cold start that
+request pays for all of it. warm_up() sends a sample suggest and a small
+analyze through the application in-process at boot instead, so that:
+- Every module the API needs is imported, and DRF's settings, the
+  default scoring backend and the serializer fields are initialized
+- With gunicorn's ``preload_app``, this happens once in the master and
+  forked workers share the loaded modules copy-on-write
+
+The sample requests only use request-body tasks, so no database
+connection is opened before workers fork.
+"""
+import io
+import json
+import logging
+import time
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+
+from .serializers import STRATEGY_CHOICES
+
+logger = logging.getLogger(__name__)
+
+
+def _sample_body() -> bytes:
+    today = date.today()
+    tasks = [
+        {
+            'id': f'warm_{i}',
+            'title': f'Warm-up task {i}',
+            'due_date': str(today + timedelta(days=offset)),
+            'estimated_hours': hours,
+            'importance': importance,
+            'dependencies': [f'warm_{i - 1}'] if i else [],
+        }
+        for i, (offset, hours, importance) in enumerate([(-1, 2, 8), (3, 1, 5), (10, 6, 3)])
+    ]
+    return json.dumps({'tasks': tasks, 'strategy': STRATEGY_CHOICES[0]}).encode()
+
+
+def _host() -> str:
+    """A host name the deployment accepts."""
+    hosts = [host for host in settings.ALLOWED_HOSTS if host != '*']
+    return hosts[0].lstrip('.') if hosts else 'localhost'
+
+
+def _environ(method: str, path: str, body: bytes = b'') -> Dict[str, object]:
+    host = _host()
+    return {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': host,
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': host,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': io.StringIO(),
+        'wsgi.url_scheme': 'http',
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+
+
+def warm_up(application: Optional[WSGIHandler] = None) -> Dict[str, float]:
+    """
+    Send warm-up requests through ``application`` (a new handler if omitted).
+
+    A failed warm-up request is logged rather than raised: the server
+    still starts, it just serves its first requests cold.
+
+    Returns:
+        Milliseconds taken per warm-up request, keyed by path
+    """
+    application = application or WSGIHandler()
+    timings = {}
+    for method, path, body in [
+        ('GET', '/api/tasks/suggest/', b''),
+        ('POST', '/api/tasks/analyze/', _sample_body()),
+    ]:
+        statuses = []
+        started = time.perf_counter()
+        response = application(_environ(method, path, body), lambda status, headers: statuses.append(status))
+        try:
+            b''.join(response)
+        finally:
+            if hasattr(response, 'close'):
+                response.close()
+        timings[path] = round((time.perf_counter() - started) * 1000, 3)
+        if not statuses[0].startswith('200'):
+            logger.warning('Warm-up %s %s returned %s', method, path, statuses[0])
+
+    # Nothing above should touch the database, but connections must never
+    # be inherited by forked workers
+    connections.close_all()
+    return timings
@@ -197,7 +197,7 @@ async function analyzeTasks() {
     hideError();
     
     try {
-        const response = await fetch(`${API_BASE_URL}/tasks/analyze/`, {
+        const response = await fetch(`${API_BASE_URL}/tasks/analyze/?explain=text`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',